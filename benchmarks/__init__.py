@@ -0,0 +1,10 @@
+"""Benchmarks for fancy_dict
+
+Every benchmark module can be run on its own, e.g.
+python -m benchmarks.loader
+
+The suite runs scenarios of all subsystems with fixed parameters
+and saves or compares machine-readable results:
+python -m benchmarks.suite --save benchmarks.json
+python -m benchmarks.suite --compare benchmarks.json
+"""
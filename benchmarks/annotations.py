@@ -0,0 +1,78 @@
+"""Benchmarks annotated keys
+
+Measures decoding and encoding annotated keys
+and the memory of the Annotations in a tree with many annotated keys.
+"""
+import tracemalloc
+
+from fancy_dict import FancyDict
+from fancy_dict.conditions import if_not_existing
+from fancy_dict.loader import KeyAnnotationsConverter
+from fancy_dict.merger import add
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+KEYS = ["key{}".format(index) for index in range(1000)]
+ANNOTATED_KEYS = ["+(key{})[add]".format(index) for index in range(1000)]
+
+
+def bench_decode(keys, rounds=100):
+    """Decodes keys several times and returns decoded keys per second"""
+    def decode():
+        for _ in range(rounds):
+            for key in keys:
+                KeyAnnotationsConverter.decode(key=key)
+    return len(keys) * rounds / best_of(decode)
+
+
+def bench_encode(keys, rounds=100):
+    """Encodes annotations and returns encoded keys per second"""
+    annotations = [KeyAnnotationsConverter.decode(key=key)["annotations"]
+                   for key in keys]
+
+    def encode():
+        for _ in range(rounds):
+            for annotation in annotations:
+                KeyAnnotationsConverter.encode(annotation, key="key")
+    return len(keys) * rounds / best_of(encode)
+
+
+def annotate_all(fancy_dict):
+    """Annotates every key with one of a few combinations of annotations"""
+    combinations = ({"merge_method": add}, {"finalized": True},
+                    {"condition": if_not_existing, "merge_method": add})
+    for index, (key, value) in enumerate(fancy_dict.items()):
+        if isinstance(value, FancyDict):
+            annotate_all(value)
+        fancy_dict.annotate(key, **combinations[index % len(combinations)])
+
+
+def bench_memory(width, depth):
+    """Annotates every key of a tree and returns the allocated MiB"""
+    fancy_dict = FancyDict(nested_config(width, depth))
+    tracemalloc.start()
+    annotate_all(fancy_dict)
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated / 2**20
+
+
+def main():
+    """Prints throughput of the KeyAnnotationsConverter
+
+    and the memory of 500k annotated keys.
+    """
+    print_table(("keys", "decode keys/s", "encode keys/s"), [
+        ("plain", int(bench_decode(KEYS)), int(bench_encode(KEYS))),
+        ("annotated", int(bench_decode(ANNOTATED_KEYS)),
+         int(bench_encode(ANNOTATED_KEYS))),
+    ])
+    print()
+    print_table(("annotated keys", "MiB"), [
+        (count_nodes(80, 3), "{:.1f}".format(bench_memory(80, 3))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
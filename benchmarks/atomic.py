@@ -0,0 +1,94 @@
+"""Benchmarks reading from many threads while a thread updates
+
+Compares reads of AtomicFancyDict snapshots (no lock)
+with reads of a FancyDict protected by a lock,
+which the writer holds while it updates.
+"""
+import threading
+import time
+
+from fancy_dict import AtomicFancyDict, FancyDict
+
+from benchmarks.utils import nested_config, print_table
+
+READERS = 4
+SECONDS = 1.0
+
+
+class LockedFancyDict:
+    """FancyDict with a lock for readers and writers"""
+    def __init__(self, data):
+        self._lock = threading.Lock()
+        self._data = FancyDict(data)
+
+    def read(self, *keys):
+        """Reads a nested value"""
+        with self._lock:
+            value = self._data
+            for key in keys:
+                value = value[key]
+            return value
+
+    def update(self, data):
+        """Updates the FancyDict"""
+        with self._lock:
+            self._data.update(data)
+
+
+def read_atomic(atomic):
+    """Reads a nested value of the current snapshot"""
+    return atomic.snapshot()["key1"]["key2"]["key3"]
+
+
+def bench_reads(read, update):
+    """Reads from READERS threads while one thread updates
+
+    Returns:
+        tuple of reads and updates per second
+    """
+    done = threading.Event()
+    counts = []
+    updates = [0]
+
+    def reader():
+        count = 0
+        while not done.is_set():
+            read()
+            count += 1
+        counts.append(count)
+
+    def writer():
+        while not done.is_set():
+            update({"key1": {"key2": {"key3": updates[0]}}})
+            updates[0] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(SECONDS)
+    done.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / SECONDS, updates[0] / SECONDS
+
+
+def main():
+    """Prints reads and updates per second"""
+    data = nested_config(10, 4)
+    atomic = AtomicFancyDict(data)
+    locked = LockedFancyDict(data)
+    rows = []
+    for name, read, update in (
+            ("AtomicFancyDict", lambda: read_atomic(atomic), atomic.update),
+            ("locked FancyDict",
+             lambda: locked.read("key1", "key2", "key3"), locked.update),
+    ):
+        reads, updates = bench_reads(read, update)
+        rows.append((name, "{:.0f}".format(reads), "{:.0f}".format(updates)))
+    print("{} reader threads, 1 writer thread".format(READERS))
+    print_table(("container", "reads/s", "updates/s"), rows)
+
+
+if __name__ == "__main__":
+    main()
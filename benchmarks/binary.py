@@ -0,0 +1,96 @@
+"""Benchmarks the startup of processes loading a config
+
+Compares loading a YAML config with annotated keys
+to mapping the same config compiled into a binary file,
+reading a single value and reading all values.
+Mapping the binary file decodes only the dicts on the path to the value,
+so the time to read a single value does not grow with the config size.
+"""
+import os
+import tempfile
+
+from fancy_dict import FancyDict
+from fancy_dict.binary import MappedFile, compile_binary
+from fancy_dict.loader import FileLoader, KeyAnnotationsConverter
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+WIDTH = 10
+DEPTHS = (3, 4, 5)
+
+
+def annotated(config):
+    """Annotates every second key with the add merge method"""
+    if not isinstance(config, dict):
+        return config
+    return {
+        "{}[add]".format(key) if index % 2 else key: annotated(value)
+        for index, (key, value) in enumerate(config.items())
+    }
+
+
+def walk(fancy_dict):
+    """Reads all values"""
+    for value in fancy_dict.values():
+        if isinstance(value, dict):
+            walk(value)
+
+
+def read(fancy_dict, path):
+    """Reads the value at a path of keys"""
+    value = fancy_dict
+    for key in path:
+        value = value[key]
+    return value
+
+
+def main():
+    """Prints the time to load a YAML and a binary config"""
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for depth in DEPTHS:
+            yaml_path = os.path.join(directory, "config{}.yml".format(depth))
+            binary_path = os.path.join(directory,
+                                       "config{}.fdb".format(depth))
+            with open(yaml_path, "w") as yaml_file:
+                FancyDict(annotated(nested_config(WIDTH, depth))).dump(
+                    yaml_file
+                )
+            loader = FileLoader(FancyDict, cache=None)
+            config = loader.load(yaml_path,
+                                 annotations_decoder=KeyAnnotationsConverter)
+            compile_binary(config, binary_path,
+                           annotations_encoder=KeyAnnotationsConverter)
+            path = ("key0",) * depth
+
+            def load_yaml():
+                loaded = loader.load(
+                    yaml_path, annotations_decoder=KeyAnnotationsConverter
+                )
+                read(loaded, path)
+
+            def map_binary():
+                read(MappedFile(binary_path, FancyDict,
+                                annotations_decoder=KeyAnnotationsConverter)
+                     .root(), path)
+
+            def walk_binary():
+                walk(MappedFile(binary_path, FancyDict,
+                                annotations_decoder=KeyAnnotationsConverter)
+                     .root())
+
+            rows.append((
+                count_nodes(WIDTH, depth),
+                "{:.0f}".format(os.path.getsize(yaml_path) / 1024),
+                "{:.0f}".format(os.path.getsize(binary_path) / 1024),
+                "{:.2f}".format(best_of(load_yaml) * 1e3),
+                "{:.3f}".format(best_of(map_binary) * 1e3),
+                "{:.2f}".format(best_of(walk_binary) * 1e3),
+            ))
+    print_table(("keys", "yaml KiB", "binary KiB", "yaml load ms",
+                 "binary read one ms", "binary read all ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmarks the Dumpers
+
+Compares dumping a FancyDict directly with converting it
+to a plain dict first and dumping it with yaml/json.
+"""
+import io
+import json
+
+import yaml
+
+from fancy_dict import FancyDict
+from fancy_dict.dumper import YamlDumper, JsonDumper
+from fancy_dict.loader import KeyAnnotationsConverter
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+SAFE_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+
+def annotated_config(width, depth):
+    """Generated config with every second leaf annotated"""
+    config = nested_config(width, depth)
+    dicts = [config]
+    while dicts:
+        dct = dicts.pop()
+        for index, key in enumerate(list(dct)):
+            if isinstance(dct[key], dict):
+                dicts.append(dct[key])
+            elif index % 2:
+                dct["+({})[add]".format(key)] = dct.pop(key)
+    return FancyDict.load(config, annotations_decoder=KeyAnnotationsConverter)
+
+
+def plain_dict(fancy_dict):
+    """Converts a FancyDict into a plain dict with encoded annotations"""
+    dct = {}
+    for key, value in fancy_dict.items():
+        annotations = fancy_dict.get_annotations(key)
+        if annotations is not None:
+            key = KeyAnnotationsConverter.encode(annotations, key=key)["key"]
+        dct[key] = plain_dict(value) if isinstance(value, dict) else value
+    return dct
+
+
+def bench_dumper(dumper, fancy_dict):
+    """Dumps with a Dumper and returns milliseconds per dump"""
+    return best_of(lambda: dumper.dump(
+        fancy_dict, io.StringIO(), annotations_encoder=KeyAnnotationsConverter
+    )) * 1e3
+
+
+def bench_plain(dump, fancy_dict):
+    """Dumps a converted plain dict and returns milliseconds per dump"""
+    return best_of(lambda: dump(plain_dict(fancy_dict), io.StringIO())) * 1e3
+
+
+def main():
+    """Prints the dump time of the Dumpers and of plain dicts"""
+    fancy_dict = annotated_config(10, 4)
+    print("{} keys".format(count_nodes(10, 4)))
+    print_table(("format", "dumper ms", "plain dict ms"), [
+        ("yaml",
+         "{:.1f}".format(bench_dumper(YamlDumper(), fancy_dict)),
+         "{:.1f}".format(bench_plain(
+             lambda data, stream: yaml.dump(data, stream, Dumper=SAFE_DUMPER,
+                                            sort_keys=False),
+             fancy_dict
+         ))),
+        ("json",
+         "{:.1f}".format(bench_dumper(JsonDumper(), fancy_dict)),
+         "{:.1f}".format(bench_plain(json.dump, fancy_dict))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Benchmarks filtering a few matches out of a large FancyDict
+
+Compares the eager filter() with iter_filter() and filter_view(),
+which only keep the current path in memory.
+"""
+import tracemalloc
+
+from fancy_dict import FancyDict
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+
+def is_match(key, value):
+    """Matches the leaves of the first key of every dict"""
+    return key == "key0" and not isinstance(value, dict)
+
+
+def peak_kib(method):
+    """Peak memory allocated by method in KiB"""
+    tracemalloc.start()
+    method()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    """Prints time and peak memory of the filter methods"""
+    fancy_dict = FancyDict.load(nested_config(10, 4))
+    methods = (
+        ("filter", lambda: fancy_dict.filter(is_match, recursive=True)),
+        ("filter flat",
+         lambda: fancy_dict.filter(is_match, recursive=True, flat=True)),
+        ("iter_filter",
+         lambda: sum(1 for _ in fancy_dict.iter_filter(is_match,
+                                                       recursive=True))),
+        ("filter_view first",
+         lambda: next(iter(fancy_dict.filter_view(is_match, recursive=True,
+                                                  flat=True)))),
+    )
+    rows = []
+    for name, method in methods:
+        rows.append((name, "{:.1f}".format(best_of(method) * 1e3),
+                     "{:.1f}".format(peak_kib(method))))
+    print("{} keys".format(count_nodes(10, 4)))
+    print_table(("method", "ms", "peak KiB"), rows)
+
+
+if __name__ == "__main__":
+    main()
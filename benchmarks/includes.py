@@ -0,0 +1,116 @@
+"""Benchmarks loading files with includes by the FileLoader"""
+import json
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from pathlib import Path
+
+from fancy_dict import FancyDict
+from fancy_dict.loader import FileLoader
+from fancy_dict.cache import ParsedFileCache, DirectoryIndex
+
+from benchmarks.utils import nested_config, best_of, print_table
+
+
+def write_environments(directory, environments, base_width=10):
+    """Writes environment files which all include the same base file
+
+    Returns:
+        list of the environment file names
+    """
+    base = nested_config(base_width, 3)
+    Path(directory, "base.yml").write_text(json.dumps(base))
+    names = []
+    for index in range(environments):
+        name = "env{}.yml".format(index)
+        Path(directory, name).write_text(json.dumps(
+            {"include": ["base.yml"], "env": index}
+        ))
+        names.append(name)
+    return names
+
+
+def bench_environments(directory, names, cache, include_paths=()):
+    """Loads all environments and returns milliseconds per environment"""
+    loader = FileLoader(FancyDict, include_paths=include_paths + (directory,),
+                        include_key="include", cache=cache)
+
+    def load_all():
+        for name in names:
+            loader.load(str(Path(directory, name)))
+    return best_of(load_all) / len(names) * 1e3
+
+
+def bench_include_paths(directory, count, lookups=1000):
+    """Resolves a file in the last of many include paths
+
+    Compares the DirectoryIndex with checking every candidate path.
+
+    Returns:
+        microseconds per lookup with stat() calls and with the index
+    """
+    include_paths = [str(Path(directory, "dir{}".format(index)))
+                     for index in range(count)]
+    for path in include_paths:
+        Path(path).mkdir()
+    include_paths.append(directory)
+
+    def find_with_stat():
+        for _ in range(lookups):
+            next(Path(path, "base.yml") for path in include_paths
+                 if Path(path, "base.yml").exists())
+
+    def find_with_index():
+        index = DirectoryIndex(include_paths)
+        for _ in range(lookups):
+            index.find("base.yml")
+
+    return (best_of(find_with_stat) / lookups * 1e6,
+            best_of(find_with_index) / lookups * 1e6)
+
+
+def bench_concurrent_includes(directory, executor, includes=400):
+    """Loads a file with many includes without cache
+
+    Returns:
+        milliseconds per load
+    """
+    names = []
+    for index in range(includes):
+        name = "part{}.yml".format(index)
+        Path(directory, name).write_text(
+            json.dumps({"part{}".format(index): nested_config(5, 3)})
+        )
+        names.append(name)
+    Path(directory, "parts.yml").write_text(json.dumps({"include": names}))
+    loader = FileLoader(FancyDict, include_paths=(directory,),
+                        include_key="include", cache=None, executor=executor)
+    return best_of(lambda: loader.load(str(Path(directory, "parts.yml")))) \
+        * 1e3
+
+
+def main():
+    """Prints load times of environments sharing a base file"""
+    with tempfile.TemporaryDirectory() as directory:
+        names = write_environments(directory, 200, base_width=3)
+        print_table(("cache", "ms/environment"), [
+            ("none", "{:.2f}".format(
+                bench_environments(directory, names, None))),
+            ("ParsedFileCache", "{:.2f}".format(
+                bench_environments(directory, names, ParsedFileCache()))),
+        ])
+        print()
+        print_table(("include paths", "stat us/lookup", "index us/lookup"),
+                    [(30, *("{:.1f}".format(timing) for timing
+                            in bench_include_paths(directory, 30)))])
+        print()
+        rows = [("sequential", "{:.0f}".format(
+            bench_concurrent_includes(directory, None)))]
+        for executor_type in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with executor_type(max_workers=4) as executor:
+                rows.append((executor_type.__name__, "{:.0f}".format(
+                    bench_concurrent_includes(directory, executor))))
+        print_table(("400 includes", "ms/load"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmarks the overhead of the instrumentation
+
+Loads environment files including an annotated base file
+with the instrumentation disabled and enabled
+and prints the collected metrics of one load.
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from fancy_dict import FancyDict, instrumentation
+from fancy_dict.loader import FileLoader, KeyAnnotationsConverter
+
+from benchmarks.binary import annotated
+from benchmarks.utils import nested_config, best_of, print_table
+
+ENVIRONMENTS = 20
+
+
+def write_environments(directory):
+    """Writes environment files which include an annotated base file
+
+    Returns:
+        list of the environment file paths
+    """
+    Path(directory, "base.yml").write_text(
+        json.dumps(annotated(nested_config(10, 3)))
+    )
+    paths = []
+    for index in range(ENVIRONMENTS):
+        path = str(Path(directory, "env{}.yml".format(index)))
+        Path(path).write_text(json.dumps(
+            {"include": ["base.yml"], "key0": {"key0": {"key0[add]": index}}}
+        ))
+        paths.append(path)
+    return paths
+
+
+def main():
+    """Prints load times with and without instrumentation"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_environments(directory)
+
+        def load_all():
+            for path in paths:
+                FancyDict.load(path, include_paths=(directory,),
+                               include_key="include", cache=None,
+                               annotations_decoder=KeyAnnotationsConverter)
+
+        disabled = best_of(load_all, repeat=5)
+        with instrumentation.enabled():
+            enabled = best_of(load_all, repeat=5)
+        with instrumentation.enabled() as metrics:
+            FileLoader(FancyDict, include_paths=(directory,),
+                       include_key="include", cache=None).load(
+                paths[0], annotations_decoder=KeyAnnotationsConverter
+            )
+            exported = metrics.to_dict()
+
+    print_table(("instrumentation", "ms/environment"), [
+        ("disabled", "{:.2f}".format(disabled / ENVIRONMENTS * 1e3)),
+        ("enabled", "{:.2f}".format(enabled / ENVIRONMENTS * 1e3)),
+    ])
+    print()
+    print_table(("timing", "key", "count", "ms"), [
+        (name, Path(key).name, timing["count"],
+         "{:.2f}".format(timing["seconds"] * 1e3))
+        for name, timings in exported["timings"].items()
+        for key, timing in timings.items()
+    ])
+    print()
+    print_table(("counter", "key", "count"), [
+        (name, key, count)
+        for name, counters in exported["counters"].items()
+        for key, count in counters.items()
+    ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Benchmarks loading a large config and using a fraction of it
+
+Loads a config with annotated keys from a parsed dict
+eagerly and lazily and reads all values below a fraction
+of the top level keys.
+The lazy loader only converts the read sub-trees,
+so time and memory grow with the read fraction, not with the config size.
+"""
+import tracemalloc
+
+from fancy_dict import FancyDict
+from fancy_dict.loader import DictLoader, KeyAnnotationsConverter
+
+from benchmarks.binary import annotated, walk
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+SERVICES = 100
+WIDTH = 10
+DEPTH = 3
+FRACTIONS = (0.01, 0.05, 0.25, 1.0)
+
+
+def load_and_read(config, lazy, fraction):
+    """Loads the config and reads a fraction of its top level keys"""
+    loaded = DictLoader(FancyDict, lazy=lazy).load(
+        config, annotations_decoder=KeyAnnotationsConverter
+    )
+    for key in list(loaded)[:round(len(loaded) * fraction)]:
+        walk(loaded[key])
+    return loaded
+
+
+def allocated(method):
+    """Memory allocated by method and kept by its result in MiB"""
+    tracemalloc.start()
+    result = method()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return memory / 2**20
+
+
+def main():
+    """Prints time and memory of eager and lazy loads per read fraction"""
+    config = annotated({"service{}".format(index): nested_config(WIDTH, DEPTH)
+                        for index in range(SERVICES)})
+    keys = SERVICES * (count_nodes(WIDTH, DEPTH) + 1)
+    rows = []
+    for fraction in FRACTIONS:
+        row = ["{:.0%}".format(fraction)]
+        for lazy in (False, True):
+            def method(lazy=lazy):
+                return load_and_read(config, lazy, fraction)
+            row.append("{:.1f}".format(best_of(method) * 1e3))
+            row.append("{:.1f}".format(allocated(method)))
+        rows.append(row)
+    print("{} keys".format(keys))
+    print_table(("read", "eager ms", "eager MiB", "lazy ms", "lazy MiB"),
+                rows)
+
+
+if __name__ == "__main__":
+    main()
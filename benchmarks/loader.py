@@ -0,0 +1,94 @@
+"""Benchmarks the DictLoader
+
+Load time per key should stay constant when the number of keys or the
+depth of the document grows.
+Peak memory for multi-document YAML streams should not grow
+with the number of documents.
+"""
+import json
+import tracemalloc
+from io import StringIO
+
+import yaml
+
+from fancy_dict import FancyDict
+from fancy_dict.loader import DictLoader, IoLoader
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+SHAPES = [
+    # (width, depth)
+    (10, 2), (10, 3), (10, 4), (10, 5),
+    (2, 8), (2, 12), (2, 16),
+    (50000, 1), (4, 8),
+]
+
+
+def bench_dict_loader(width, depth):
+    """Loads a generated config and returns microseconds per key"""
+    config = nested_config(width, depth)
+    loader = DictLoader(FancyDict)
+    seconds = best_of(lambda: loader.load(config))
+    return seconds / count_nodes(width, depth) * 1e6
+
+
+def bench_list_items(items):
+    """Loads a list of dicts and returns microseconds per list item"""
+    config = {"list": [nested_config(3, 2) for _ in range(items)]}
+    loader = DictLoader(FancyDict)
+    return best_of(lambda: loader.load(config)) / items * 1e6
+
+
+def bench_io_loader(yaml_loader, as_json=False):
+    """Parses a generated document and returns milliseconds per load"""
+    class _IoLoader(IoLoader):
+        YAML_LOADER = yaml_loader
+
+    config = nested_config(10, 4)
+    loader = _IoLoader(FancyDict)
+    if as_json:
+        content = json.dumps(config).encode()
+        return best_of(lambda: loader.load(content)) * 1e3
+    text = yaml.safe_dump(config)
+    return best_of(lambda: loader.load(StringIO(text))) * 1e3
+
+
+def bench_yaml_stream(documents):
+    """Loads a multi-document stream and returns the peak memory in KiB"""
+    record = yaml.safe_dump(nested_config(10, 2))
+    stream = StringIO("---\n".join([record] * documents))
+    tracemalloc.start()
+    IoLoader(FancyDict).load(stream)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    """Prints the load time per key for different document shapes"""
+    rows = []
+    for width, depth in SHAPES:
+        rows.append((width, depth, count_nodes(width, depth),
+                     "{:.3f}".format(bench_dict_loader(width, depth))))
+    print_table(("width", "depth", "keys", "us/key"), rows)
+    print()
+    print_table(("list items", "us/item"),
+                [(items, "{:.3f}".format(bench_list_items(items)))
+                 for items in (1000, 10000, 100000)])
+    print()
+    parsers = [("yaml.SafeLoader", yaml.SafeLoader, False),
+               ("json", yaml.SafeLoader, True)]
+    if yaml.__with_libyaml__:
+        parsers.insert(1, ("yaml.CSafeLoader", yaml.CSafeLoader, False))
+    print_table(("parser", "ms/load"),
+                [(name, "{:.1f}".format(bench_io_loader(loader, as_json)))
+                 for name, loader, as_json in parsers])
+    print()
+    print_table(("documents", "peak KiB"),
+                [(documents, "{:.0f}".format(bench_yaml_stream(documents)))
+                 for documents in (10, 100, 1000)])
+
+
+if __name__ == "__main__":
+    main()
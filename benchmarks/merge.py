@@ -0,0 +1,83 @@
+"""Benchmarks FancyDict.update and FancyDict.update_many
+
+Merges generated configs into each other,
+with and without annotated keys.
+Merges a stack of layers with update() per layer and with update_many().
+"""
+from fancy_dict import FancyDict
+from fancy_dict.merger import add
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+SHAPES = [
+    # (width, depth)
+    (10, 4), (2, 14), (50000, 1),
+]
+LAYERS = 30
+
+
+def annotate_leaves(fancy_dict, **annotations):
+    """Annotates every key which does not contain a dict"""
+    for key, value in fancy_dict.items():
+        if isinstance(value, FancyDict):
+            annotate_leaves(value, **annotations)
+        else:
+            fancy_dict.annotate(key, **annotations)
+
+
+def bench_update(width, depth, annotated=False):
+    """Merges two configs and returns microseconds per key"""
+    base = FancyDict(nested_config(width, depth, leaf=0))
+    layer = FancyDict(nested_config(width, depth, leaf=1))
+    if annotated:
+        annotate_leaves(layer, merge_method=add)
+    seconds = best_of(lambda: base.update(layer))
+    return seconds / count_nodes(width, depth) * 1e6
+
+
+def layer_stack(width, depth):
+    """Layers which all set every leaf, like environment specific configs"""
+    return [FancyDict(nested_config(width, depth, leaf=index))
+            for index in range(LAYERS)]
+
+
+def bench_layers(width, depth):
+    """Merges a layer stack and returns ms for update() and update_many()
+
+    The merged FancyDicts are derived,
+    so merging copies the layers instead of changing them.
+    """
+    layers = layer_stack(width, depth)
+
+    def update():
+        base = FancyDict().derive()
+        for layer in layers:
+            base.update(layer)
+
+    return (best_of(update) * 1e3,
+            best_of(lambda: FancyDict().derive().update_many(layers)) * 1e3)
+
+
+def main():
+    """Prints the merge time per key for different document shapes"""
+    rows = []
+    for width, depth in SHAPES:
+        rows.append((width, depth, count_nodes(width, depth),
+                     "{:.3f}".format(bench_update(width, depth)),
+                     "{:.3f}".format(bench_update(width, depth,
+                                                  annotated=True))))
+    print_table(("width", "depth", "keys", "us/key", "annotated us/key"),
+                rows)
+    print()
+    rows = []
+    for width, depth in SHAPES[:2]:
+        update, update_many = bench_layers(width, depth)
+        rows.append((width, depth, LAYERS, "{:.1f}".format(update),
+                     "{:.1f}".format(update_many)))
+    print_table(("width", "depth", "layers", "update ms", "update_many ms"),
+                rows)
+
+
+if __name__ == "__main__":
+    main()
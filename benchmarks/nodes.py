@@ -0,0 +1,34 @@
+"""Benchmarks the memory per FancyDict node
+
+Builds a tree of about 1M FancyDicts without annotations
+and measures the allocated memory per node with tracemalloc.
+"""
+import time
+import tracemalloc
+
+from fancy_dict import FancyDict
+
+from benchmarks.utils import nested_config, count_nodes, print_table
+
+WIDTH = 100
+DEPTH = 3
+
+
+def main():
+    """Prints the memory per node and the time to build the tree"""
+    config = nested_config(WIDTH, DEPTH, leaf={})
+    nodes = count_nodes(WIDTH, DEPTH) + 1
+    tracemalloc.start()
+    start = time.perf_counter()
+    fancy_dict = FancyDict(config)
+    seconds = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del fancy_dict
+    print_table(("nodes", "bytes/node", "build s"), [
+        (nodes, "{:.0f}".format(allocated / nodes), "{:.2f}".format(seconds)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
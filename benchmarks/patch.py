@@ -0,0 +1,46 @@
+"""Benchmarks diff() and apply_patch()
+
+Compares the size of a patch for a few changed leaves
+with the size of the whole document
+and the time to diff plain, derived and frozen FancyDicts.
+"""
+import json
+
+from fancy_dict import FancyDict
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+CHANGES = {"key1": {"key2": {"key3": {"key4": 1}}},
+           "key5": {"key5": {"key5": {"key5": 1}}}}
+
+
+def main():
+    """Prints patch size and the time to diff and apply"""
+    old = FancyDict(nested_config(10, 4))
+    new = old.derive()
+    new.update(CHANGES)
+    frozen_old, frozen_new = old.freeze(), new.freeze()
+    plain_new = FancyDict(nested_config(10, 4))
+    plain_new.update(CHANGES)
+
+    patch = old.diff(new)
+    print("{} keys, document {} bytes, patch {} bytes".format(
+        count_nodes(10, 4), len(json.dumps(new)),
+        len(json.dumps(patch.to_dict()))
+    ))
+    rows = []
+    for name, old_dict, new_dict in (("diff plain", old, plain_new),
+                                     ("diff derived", old, new),
+                                     ("diff frozen", frozen_old, frozen_new)):
+        rows.append((name, "{:.3f}".format(
+            best_of(lambda: old_dict.diff(new_dict)) * 1e3
+        )))
+    rows.append(("apply_patch", "{:.3f}".format(
+        best_of(lambda: old.derive().apply_patch(patch)) * 1e3
+    )))
+    print_table(("operation", "ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmarks queries
+
+Compiled path queries should be close to chained lookups,
+recursive descent with a KeyIndex should not walk the tree.
+"""
+from fancy_dict import FancyDict
+from fancy_dict.query import KeyIndex
+
+from benchmarks.utils import nested_config, count_nodes, best_of, \
+    print_table
+
+ROUNDS = 10000
+
+
+def bench(method, rounds=ROUNDS):
+    """Runs method several times and returns runs per second"""
+    def run():
+        for _ in range(rounds):
+            method()
+    return rounds / best_of(run)
+
+
+def main():
+    """Prints lookups per second for different queries"""
+    fancy_dict = FancyDict.load(nested_config(10, 4))
+    index = KeyIndex(fancy_dict)
+    print("{} keys".format(count_nodes(10, 4)))
+    print_table(("lookup", "lookups/s"), [
+        ("chained []", int(bench(
+            lambda: fancy_dict["key1"]["key2"]["key3"]["key4"]
+        ))),
+        ("a.b.c.d", int(bench(
+            lambda: fancy_dict.query("key1.key2.key3.key4")
+        ))),
+        ("a.*.c.d", int(bench(
+            lambda: fancy_dict.query("key1.*.key3.key4"), rounds=1000
+        ))),
+        ("..d", int(bench(
+            lambda: fancy_dict.query("..key4"), rounds=10
+        ))),
+        ("..d indexed", int(bench(
+            lambda: fancy_dict.query("..key4", index=index), rounds=1000
+        ))),
+    ])
+
+
+if __name__ == "__main__":
+    main()
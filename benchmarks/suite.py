@@ -0,0 +1,326 @@
+"""Runs reproducible benchmark scenarios and compares them to a baseline
+
+Every scenario measures one subsystem on a synthetic config
+with fixed parameters (width, depth, annotation density, include fan-out),
+so results of different commits can be compared.
+
+Usage::
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json --threshold 0.1
+    python -m benchmarks.suite --filter update --list
+
+Results are saved as JSON. Comparing prints the ratio of every scenario
+to the baseline and exits with 1 if a scenario got slower than threshold.
+"""
+import argparse
+import io
+import json
+import platform
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from fancy_dict import FancyDict
+from fancy_dict.binary import MappedFile, compile_binary
+from fancy_dict.cache import ParsedFileCache
+from fancy_dict.dumper import YamlDumper
+from fancy_dict.loader import DictLoader, FileLoader, KeyAnnotationsConverter
+
+from benchmarks.binary import walk, read
+from benchmarks.filter import is_match
+from benchmarks.utils import nested_config, annotated_config, \
+    write_include_tree, best_of, print_table
+
+SCENARIOS = {}
+
+
+def scenario(name, **params):
+    """Registers a scenario
+
+    The decorated generator function gets the params as keyword arguments,
+    prepares the data and yields the callable to measure.
+    Code after the yield cleans up.
+
+    Args:
+        name: unique name of the scenario, prefixed by the subsystem
+        params: parameters of the synthetic config
+    """
+    def register(prepare):
+        SCENARIOS[name] = (contextmanager(prepare), params)
+        return prepare
+    return register
+
+
+def load_annotated(width, depth, density, leaf=0):
+    """Loads a config generated by annotated_config"""
+    return FancyDict.load(annotated_config(width, depth, density, leaf),
+                          annotations_decoder=KeyAnnotationsConverter)
+
+
+@scenario("update.plain", width=10, depth=4)
+def update_plain(width, depth):
+    """Merges a config into a config of the same shape"""
+    base = FancyDict(nested_config(width, depth))
+    layer = FancyDict(nested_config(width, depth, leaf=1))
+    yield lambda: base.update(layer)
+
+
+@scenario("update.annotated", width=10, depth=4, density=0.5)
+def update_annotated(width, depth, density):
+    """Merges a config with annotated keys"""
+    base = FancyDict(nested_config(width, depth))
+    layer = load_annotated(width, depth, density, leaf=1)
+    yield lambda: base.update(layer)
+
+
+@scenario("update.many", width=10, depth=3, layers=30)
+def update_many(width, depth, layers):
+    """Merges a stack of layers into a derived FancyDict"""
+    stack = [FancyDict(nested_config(width, depth, leaf=index))
+             for index in range(layers)]
+    yield lambda: FancyDict().derive().update_many(stack)
+
+
+@scenario("dict_loader.eager", width=10, depth=4, density=0.5)
+def dict_loader_eager(width, depth, density):
+    """Loads a parsed config with annotated keys"""
+    config = annotated_config(width, depth, density)
+    loader = DictLoader(FancyDict)
+    yield lambda: loader.load(config,
+                              annotations_decoder=KeyAnnotationsConverter)
+
+
+@scenario("dict_loader.lazy", width=10, depth=4, density=0.5)
+def dict_loader_lazy(width, depth, density):
+    """Loads a parsed config lazily and reads one top level key"""
+    config = annotated_config(width, depth, density)
+    loader = DictLoader(FancyDict, lazy=True)
+    yield lambda: walk(loader.load(
+        config, annotations_decoder=KeyAnnotationsConverter
+    )["key0"])
+
+
+@contextmanager
+def include_tree(fan_out, depth, width):
+    """Writes an include tree to a temporary directory
+
+    Yields:
+        path of the root file and the directory
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        write_include_tree(directory, fan_out, depth, width)
+        yield str(Path(directory, "root.yml")), directory
+
+
+@scenario("file_loader.includes", fan_out=4, depth=2, width=10)
+def file_loader_includes(fan_out, depth, width):
+    """Loads a file including a tree of files without cache"""
+    with include_tree(fan_out, depth, width) as (path, directory):
+        loader = FileLoader(FancyDict, include_paths=(directory,),
+                            include_key="include", cache=None)
+        yield lambda: loader.load(path)
+
+
+@scenario("file_loader.cached", fan_out=4, depth=2, width=10)
+def file_loader_cached(fan_out, depth, width):
+    """Loads a file including a tree of files from the ParsedFileCache"""
+    with include_tree(fan_out, depth, width) as (path, directory):
+        loader = FileLoader(FancyDict, include_paths=(directory,),
+                            include_key="include", cache=ParsedFileCache())
+        loader.load(path)
+        yield lambda: loader.load(path)
+
+
+@scenario("annotations.decode", keys=1000, density=0.5)
+def annotations_decode(keys, density):
+    """Decodes plain and annotated keys which were not decoded before"""
+    config = annotated_config(keys, 1, density)
+
+    def decode():
+        # pylint: disable=protected-access
+        KeyAnnotationsConverter._parse.cache_clear()
+        for key in config:
+            KeyAnnotationsConverter.decode(key=key)
+    yield decode
+
+
+@scenario("annotations.decode_memorized", keys=1000, density=0.5)
+def annotations_decode_memorized(keys, density):
+    """Decodes plain and annotated keys which were decoded before"""
+    config = annotated_config(keys, 1, density)
+
+    def decode():
+        for key in config:
+            KeyAnnotationsConverter.decode(key=key)
+    decode()
+    yield decode
+
+
+@scenario("annotations.encode", keys=1000, density=0.5)
+def annotations_encode(keys, density):
+    """Encodes the annotations of annotated keys"""
+    fancy_dict = load_annotated(keys, 1, density)
+    annotations = [fancy_dict.get_annotations(key) for key in fancy_dict]
+    annotations = [annotation for annotation in annotations if annotation]
+
+    def encode():
+        for annotation in annotations:
+            KeyAnnotationsConverter.encode(annotation, key="key")
+    yield encode
+
+
+@scenario("filter.filter", width=10, depth=4)
+def filter_filter(width, depth):
+    """Filters a few leaves out of a config"""
+    fancy_dict = FancyDict(nested_config(width, depth))
+    yield lambda: fancy_dict.filter(is_match, recursive=True)
+
+
+@scenario("filter.iter_filter", width=10, depth=4)
+def filter_iter_filter(width, depth):
+    """Iterates over a few filtered leaves of a config"""
+    fancy_dict = FancyDict(nested_config(width, depth))
+    yield lambda: sum(1 for _ in fancy_dict.iter_filter(is_match,
+                                                        recursive=True))
+
+
+@scenario("dumper.yaml", width=10, depth=3, density=0.5)
+def dumper_yaml(width, depth, density):
+    """Dumps a config with annotated keys as YAML"""
+    fancy_dict = load_annotated(width, depth, density)
+    yield lambda: YamlDumper().dump(
+        fancy_dict, io.StringIO(), annotations_encoder=KeyAnnotationsConverter
+    )
+
+
+@scenario("binary.read_one", width=10, depth=4, density=0.5)
+def binary_read_one(width, depth, density):
+    """Maps a binary config and reads a single value"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = str(Path(directory, "config.fdb"))
+        compile_binary(load_annotated(width, depth, density), path,
+                       annotations_encoder=KeyAnnotationsConverter)
+        yield lambda: read(MappedFile(
+            path, FancyDict, annotations_decoder=KeyAnnotationsConverter
+        ).root(), ("key0",) * depth)
+
+
+def run(names, repeat=5):
+    """Measures scenarios
+
+    Args:
+        names: names of the scenarios to run
+        repeat: number of runs, the fastest gets reported
+    Returns:
+        JSON serializable dict with the environment and the results
+    """
+    results = {}
+    for name in names:
+        prepare, params = SCENARIOS[name]
+        with prepare(**params) as method:
+            results[name] = {"seconds": best_of(method, repeat=repeat),
+                             "params": params}
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold):
+    """Compares results to a baseline
+
+    Scenarios with other params than in the baseline are not comparable.
+
+    Args:
+        baseline: results of run() to compare to
+        current: results of run()
+        threshold: relative change which counts as slower or faster
+    Returns:
+        table rows and list of the names of slower scenarios
+    """
+    rows, slower = [], []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or base["params"] != result["params"]:
+            rows.append((name, "-", "{:.3f}".format(result["seconds"] * 1e3),
+                         "-", "new" if base is None else "changed params"))
+            continue
+        ratio = result["seconds"] / base["seconds"]
+        status = ""
+        if ratio > 1 + threshold:
+            status = "slower"
+            slower.append(name)
+        elif ratio < 1 - threshold:
+            status = "faster"
+        rows.append((name, "{:.3f}".format(base["seconds"] * 1e3),
+                     "{:.3f}".format(result["seconds"] * 1e3),
+                     "{:.2f}".format(ratio), status))
+    return rows, slower
+
+
+def parse_args(args):
+    """Parses the command line arguments"""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.suite",
+        description="Runs the benchmark scenarios"
+    )
+    parser.add_argument("--filter", default="",
+                        help="run only scenarios containing this string")
+    parser.add_argument("--list", action="store_true",
+                        help="list the scenarios without running them")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per scenario, the fastest is reported")
+    parser.add_argument("--save", metavar="PATH",
+                        help="save the results as JSON")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="compare to results saved before")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative change counted as slower or faster")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    """Runs the scenarios and saves or compares the results
+
+    Returns:
+        exit code, 1 if a scenario got slower than the baseline
+    """
+    args = parse_args(args)
+    names = [name for name in SCENARIOS if args.filter in name]
+    if args.list:
+        print_table(("scenario", "params"),
+                    [(name, json.dumps(SCENARIOS[name][1])) for name in names])
+        return 0
+    current = run(names, repeat=args.repeat)
+    if args.save:
+        Path(args.save).write_text(json.dumps(current, indent=2) + "\n")
+    if not args.compare:
+        print_table(("scenario", "params", "ms"), [
+            (name, json.dumps(result["params"]),
+             "{:.3f}".format(result["seconds"] * 1e3))
+            for name, result in current["results"].items()
+        ])
+        return 0
+    baseline = json.loads(Path(args.compare).read_text())
+    for key in ("python", "implementation", "machine"):
+        if baseline[key] != current[key]:
+            print("baseline {} {} differs from {}".format(
+                key, baseline[key], current[key]
+            ))
+    rows, slower = compare(baseline, current, args.threshold)
+    print_table(("scenario", "baseline ms", "ms", "ratio", ""), rows)
+    if slower:
+        print("slower by more than {:.0%}: {}".format(
+            args.threshold, ", ".join(slower)
+        ))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""Benchmarks deriving many tenant configs from one base config
+
+Compares loading every tenant from the plain base config
+with derive() (copy-on-write).
+Memory of derived configs should only grow with the size of the
+overrides, not with the size of the base.
+"""
+import time
+import tracemalloc
+
+from fancy_dict import FancyDict
+
+from benchmarks.utils import nested_config, count_nodes, print_table
+
+TENANTS = 200
+
+
+def overrides(tenant):
+    """Overrides a single leaf and adds a tenant key"""
+    return {"key{}".format(tenant % 10): {"key0": {"key0": {"key0": tenant}}},
+            "tenant": tenant}
+
+
+def build_tenants(base, derive):
+    """Builds all tenant configs
+
+    Returns:
+        tuple of allocated KiB and seconds
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    tenants = []
+    for tenant in range(TENANTS):
+        config = derive(base)
+        config.update(overrides(tenant))
+        tenants.append(config)
+    seconds = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return allocated / 1024, seconds
+
+
+def main():
+    """Prints memory and time to build the tenant configs"""
+    config = nested_config(10, 4)
+    base = FancyDict.load(config)
+    rows = []
+    for name, derive in (("load", lambda _: FancyDict.load(config)),
+                         ("derive", FancyDict.derive)):
+        kib, seconds = build_tenants(base, derive)
+        rows.append((name, "{:.0f}".format(kib / TENANTS),
+                     "{:.2f}".format(seconds / TENANTS * 1e3)))
+    print("{} tenants, {} keys in base".format(TENANTS, count_nodes(10, 4)))
+    print_table(("copy", "KiB/tenant", "ms/tenant"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Helpers to generate data and measure benchmarks"""
+import gc
+import json
+import time
+from pathlib import Path
+
+
+def nested_config(width, depth, leaf=0):
+    """Generates a plain nested dict
+
+    Args:
+        width: number of keys per level
+        depth: number of nested levels
+        leaf: value stored in the deepest level
+    Returns:
+        dict with width**depth leaves
+    """
+    if depth == 0:
+        return leaf
+    return {"key{}".format(index): nested_config(width, depth - 1, leaf)
+            for index in range(width)}
+
+
+def annotated_config(width, depth, density=0.5, leaf=0):
+    """Generates a nested dict with annotated keys
+
+    Leaves get annotated with the add merge method,
+    dicts with the always condition.
+
+    Args:
+        width: number of keys per level
+        depth: number of nested levels
+        density: fraction of the keys per level to annotate
+        leaf: value stored in the deepest level
+    Returns:
+        dict with width**depth leaves to be loaded with the
+        KeyAnnotationsConverter
+    """
+    if depth == 0:
+        return leaf
+    config = {}
+    for index in range(width):
+        key = "key{}".format(index)
+        if int((index + 1) * density) > int(index * density):
+            key = key + "[add]" if depth == 1 else "#" + key
+        config[key] = annotated_config(width, depth - 1, density, leaf)
+    return config
+
+
+def write_include_tree(directory, fan_out, depth, width=10, name="root"):
+    """Writes files including fan_out other files down to depth levels
+
+    Every file sets its own key and overwrites the shared key,
+    so merging the included files overwrites the same keys again.
+
+    Args:
+        directory: directory to write the files to
+        fan_out: number of files included by every file above the leaves
+        depth: number of include levels below the written file
+        width: width of the nested configs in every file
+        name: name of the written file without suffix
+    Returns:
+        number of written files
+    """
+    includes = ["{}_{}".format(name, index) for index in range(fan_out)] \
+        if depth else []
+    Path(directory, name + ".yml").write_text(json.dumps({
+        "include": [include + ".yml" for include in includes],
+        name: nested_config(width, 2),
+        "shared": nested_config(width, 2, leaf=depth),
+    }))
+    return 1 + sum(write_include_tree(directory, fan_out, depth - 1, width,
+                                      include)
+                   for include in includes)
+
+
+def count_nodes(width, depth):
+    """Number of keys in a config generated by nested_config"""
+    return sum(width ** level for level in range(1, depth + 1))
+
+
+def best_of(method, repeat=3):
+    """Measures the fastest of several runs of method
+
+    Args:
+        method: callable without arguments
+        repeat: number of runs
+    Returns:
+        fastest runtime in seconds
+    """
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        method()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def print_table(header, rows):
+    """Prints rows as aligned table"""
+    widths = [max(len(str(cell)) for cell in column)
+              for column in zip(header, *rows)]
+    for row in [header] + rows:
+        print("  ".join(str(cell).rjust(width)
+                        for cell, width in zip(row, widths)))
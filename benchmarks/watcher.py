@@ -0,0 +1,78 @@
+"""Benchmarks updating loaded configs after a file changed
+
+Loads environment configs which include a shared base and a shared
+defaults file. Compares loading all configs again with a Watcher,
+which only loads the configs depending on the changed file again
+and only parses and merges the changed files.
+"""
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fancy_dict import FancyDict
+from fancy_dict.loader import FileLoader
+from fancy_dict.watcher import Watcher
+
+from benchmarks.utils import nested_config, print_table
+
+ENVIRONMENTS = 20
+CHANGES = 5
+
+
+def write_environments(directory):
+    """Writes environment files including a base and a defaults file
+
+    Returns:
+        list of the environment file paths
+    """
+    Path(directory, "base.yml").write_text(json.dumps(nested_config(10, 3)))
+    Path(directory, "defaults.yml").write_text(json.dumps(
+        {"include": ["base.yml"], "defaults": nested_config(10, 2)}
+    ))
+    paths = []
+    for index in range(ENVIRONMENTS):
+        path = str(Path(directory, "env{}.yml".format(index)))
+        write_environment(path, index)
+        paths.append(path)
+    return paths
+
+
+def write_environment(path, value):
+    """Writes an environment file with a value"""
+    Path(path).write_text(json.dumps(
+        {"include": ["defaults.yml"], "env": value}
+    ))
+
+
+def main():
+    """Prints the time to update all configs after a change"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_environments(directory)
+        loader = FileLoader(FancyDict, include_paths=(directory,),
+                            include_key="include")
+        watcher = Watcher(include_paths=(directory,), include_key="include")
+        watched = [watcher.load(path) for path in paths]
+
+        reload_seconds = poll_seconds = 0
+        for change in range(CHANGES):
+            write_environment(paths[0], "changed{}".format(change))
+            start = time.perf_counter()
+            for path in paths:
+                loader.load(path)
+            reload_seconds += time.perf_counter() - start
+
+            start = time.perf_counter()
+            watcher.poll()
+            poll_seconds += time.perf_counter() - start
+            assert "changed{}".format(change) == watched[0]["env"]
+
+    print("{} environments, 1 changed".format(ENVIRONMENTS))
+    print_table(("update", "ms"), [
+        ("load all", "{:.1f}".format(reload_seconds / CHANGES * 1e3)),
+        ("watcher poll", "{:.1f}".format(poll_seconds / CHANGES * 1e3)),
+    ])
+
+
+if __name__ == "__main__":
+    main()
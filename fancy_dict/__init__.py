@@ -1,6 +1,9 @@
 """FancyDict main package"""
 
-from .fancy_dict import FancyDict
+from .fancy_dict import FancyDict, FrozenFancyDict, FrozenList, FilterView, \
+    LazyFancyDict
+from .patch import Patch
+from .atomic import AtomicFancyDict
 from . import conditions
 from . import errors
 from . import merger
@@ -1,4 +1,7 @@
 """Annotations for FancyDict keys"""
+# pylint: disable=no-member
+import weakref
+
 from .conditions import always
 from .merger import overwrite
 
@@ -14,18 +17,43 @@ class Annotations:
     A conditions can block merging two values based on the old and new value.
 
     If a key is finalized, the value cannot be updated anymore.
+
+    Annotations are immutable and interned:
+    creating Annotations with the same values returns the same instance,
+    so all keys with the same annotations share one instance.
     """
+    __slots__ = ("merge_method", "condition", "finalized",
+                 "_values", "__weakref__")
     DEFAULTS = {
         "merge_method": overwrite,
         "condition": always,
         "finalized": False
     }
+    _instances = weakref.WeakValueDictionary()
 
-    def __init__(self, **values):
-        self._values = {}
-        for annotation, value in values.items():
-            if annotation in self.DEFAULTS:
-                self._values[annotation] = value
+    def __new__(cls, **values):
+        values = tuple(map(values.get, cls.DEFAULTS))
+        try:
+            return cls._instances[(cls, values)]
+        except KeyError:
+            return cls._instances.setdefault((cls, values),
+                                             cls._create(values))
+        except TypeError:
+            return cls._create(values)
+
+    @classmethod
+    def _create(cls, values):
+        annotations = super().__new__(cls)
+        for annotation, value in zip(cls.DEFAULTS, values):
+            object.__setattr__(annotations, annotation,
+                               cls.DEFAULTS[annotation] if value is None
+                               else value)
+        object.__setattr__(annotations, "_values", {
+            annotation: value
+            for annotation, value in zip(cls.DEFAULTS, values)
+            if value is not None
+        })
+        return annotations
 
     def get(self, key):
         """get the value of an annotation
@@ -35,23 +63,48 @@ class Annotations:
         """
         return self._values.get(key)
 
-    def __getattr__(self, item):
-        if item in self.DEFAULTS:
-            default = self.DEFAULTS[item]
-            value = self._values.get(item, default)
-            return default if value is None else value
-        return super().__getattribute__(item)
-
-    def update(self, new_annotations):
-        """Updates annotations.
+    def merge(self, new_annotations):
+        """Merges annotations.
 
-        Updates only values which are set in the new annotations
+        Takes only values which are set in the new annotations
         and keeps the other values.
 
         Args:
             new_annotations: Annotations with value to update
+        Returns:
+            Annotations with the merged values
         """
-        for key in self.DEFAULTS:
-            if new_annotations.get(key) is not None:
-                value = getattr(new_annotations, key)
-                self._values[key] = value
+        # pylint: disable=protected-access
+        values = dict(self._values)
+        values.update(new_annotations._values)
+        return type(self)(**values)
+
+    def __setattr__(self, key, value):
+        raise AttributeError(
+            "'{}' object is immutable".format(type(self).__name__)
+        )
+
+    def __delattr__(self, key):
+        raise AttributeError(
+            "'{}' object is immutable".format(type(self).__name__)
+        )
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, _memo):
+        return self
+
+    def __reduce__(self):
+        return _annotations, (type(self), self._values)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join(
+            "{}={!r}".format(annotation, value)
+            for annotation, value in self._values.items()
+        ))
+
+
+def _annotations(annotations_type, values):
+    """Creates Annotations when unpickled"""
+    return annotations_type(**values)
@@ -0,0 +1,153 @@
+"""Loaders which load FancyDicts without blocking an asyncio event loop
+
+The async loaders mirror the loaders in fancy_dict.loader,
+their load() methods are coroutines.
+Blocking I/O and parsing run in an executor
+(the default executor of the event loop if none is given),
+decoding annotations and merging runs in the event loop.
+"""
+# pylint: disable=invalid-overridden-method
+import asyncio
+import time
+from pathlib import Path
+
+from fancy_dict import instrumentation
+from fancy_dict.loader import CompositeLoader, DictLoader, IoLoader, \
+    BinaryLoader, FileLoader, HttpLoader
+from fancy_dict.connection import HTTP_CLIENT
+
+
+class AsyncDictLoader(DictLoader):
+    """Loads a dict as FancyDict
+
+    A dict needs no I/O, it gets loaded directly in the event loop.
+    """
+    def __init__(self, output_type, executor=None, lazy=False):
+        super().__init__(output_type, lazy=lazy)
+        self._executor = executor
+
+    async def load(self, source, annotations_decoder=None):
+        return super().load(source, annotations_decoder=annotations_decoder)
+
+
+class AsyncIoLoader(IoLoader):
+    """Loads a FancyDict from an IO-like object
+
+    The documents of the object are read, parsed and merged
+    in the executor.
+    """
+    def __init__(self, output_type, executor=None, lazy=False):
+        super().__init__(output_type, lazy=lazy)
+        self._executor = executor
+
+    async def load(self, source, annotations_decoder=None):
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, IoLoader.load, self, source, annotations_decoder
+        )
+
+
+class AsyncBinaryLoader(BinaryLoader):
+    """Loads a FancyDict from a binary file (*.fdb)
+
+    The file is mapped (and decoded unless lazy) in the executor.
+    """
+    def __init__(self, output_type, lazy=False, executor=None,
+                 **_loader_args):
+        super().__init__(output_type, lazy=lazy)
+        self._executor = executor
+
+    async def load(self, source, annotations_decoder=None):
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, BinaryLoader.load, self, source,
+            annotations_decoder
+        )
+
+
+class AsyncFileLoader(FileLoader):
+    """Loads a FancyDict from a YAML/JSON file
+
+    All files in the include tree are read and parsed concurrently
+    in the executor, as soon as the including file is parsed.
+    The included files are merged in the declared order,
+    the result is the same as with the FileLoader.
+    """
+    async def load(self, source, annotations_decoder=None):
+        if self._refresh_index:
+            self._index.refresh()
+        return await self._load_file_async(source, annotations_decoder, ())
+
+    async def _load_file_async(self, source, annotations_decoder, ancestors):
+        ancestors += (Path(source).resolve(),)
+        documents = [
+            (self._pop_includes(dct), dct)
+            for dct in self._load_fancy_dicts(
+                await self._read_file_async(source), annotations_decoder
+            )
+        ]
+        includes = tuple(full_path for document_includes, _ in documents
+                         for full_path in document_includes)
+        self._record_dependencies(source, includes)
+        for full_path in includes:
+            if Path(full_path).resolve() in ancestors:
+                raise RecursionError("{} includes itself".format(full_path))
+        included_dicts = iter(await asyncio.gather(*(
+            self._load_file_async(full_path, annotations_decoder, ancestors)
+            for full_path in includes
+        )))
+        base_dict = self.type()
+        for document_includes, dct in documents:
+            for full_path in document_includes:
+                self._merge(base_dict, next(included_dicts), full_path)
+            self._merge(base_dict, dct, source)
+        return base_dict
+
+    def _read_file_async(self, full_path):
+        if self._executor is None:
+            return asyncio.get_event_loop().run_in_executor(
+                None, self._read_file, full_path
+            )
+        return asyncio.wrap_future(self._submit_read(full_path))
+
+
+class AsyncHttpLoader(HttpLoader):
+    """Loads YAML/JSON files from an URL
+
+    The blocking HttpClient runs in the executor,
+    so requests to different URLs are sent concurrently
+    on separate pooled connections.
+    """
+    def __init__(self, output_type, http_client=HTTP_CLIENT, executor=None,
+                 lazy=False):
+        super().__init__(output_type, http_client=http_client, lazy=lazy)
+        self._executor = executor
+
+    async def load(self, source, annotations_decoder=None):
+        documents = await asyncio.get_event_loop().run_in_executor(
+            self._executor, self._http_client.get, source,
+            self._parse_documents
+        )
+        return self._merge_documents(documents, annotations_decoder)
+
+
+class AsyncCompositeLoader(CompositeLoader):
+    """Composition of different async Loader
+
+    Selects the right Loader for the source.
+
+    Can load from dicts, yaml/json files and binary files.
+    """
+    LOADER = [
+        AsyncDictLoader,
+        AsyncIoLoader,
+        AsyncBinaryLoader,
+        AsyncFileLoader,
+        AsyncHttpLoader,
+    ]
+
+    async def load(self, source, annotations_decoder=None):
+        start = instrumentation.ENABLED and time.perf_counter()
+        loaded = await self._dispatch(source).load(source,
+                                                   annotations_decoder)
+        if start:
+            instrumentation.record("load", self._source_name(source), start)
+        return loaded
@@ -0,0 +1,80 @@
+"""FancyDict container for concurrent readers and writers
+
+Updating a FancyDict changes nested dicts one key at a time,
+so threads reading while another thread updates
+can see a partially merged tree.
+
+An AtomicFancyDict keeps the current version as FrozenFancyDict.
+Writers build the next version on a derived copy of the current version,
+which only copies the changed paths, and publish its snapshot
+by replacing a single reference.
+Readers get the current snapshot without taking a lock
+and keep reading a consistent version, even if a new one gets published.
+"""
+import threading
+from contextlib import contextmanager
+
+from fancy_dict.fancy_dict import FancyDict
+
+
+class AtomicFancyDict:
+    """Publishes consistent snapshots of a FancyDict
+
+    Writes are serialized by a lock and are all-or-nothing:
+    if a write raises an exception, the current version stays published.
+
+    Args:
+        data: initial data
+        output_type: FancyDict type of the versions
+    """
+    def __init__(self, data=None, output_type=FancyDict):
+        self._lock = threading.Lock()
+        self._snapshot = output_type(data).freeze()
+        self._version = 0
+
+    def snapshot(self):
+        """Returns the current version
+
+        Returns:
+            FrozenFancyDict which never changes
+        """
+        return self._snapshot
+
+    @property
+    def version(self):
+        """Number of published versions after the initial version"""
+        return self._version
+
+    @contextmanager
+    def edit(self):
+        """Builds and publishes the next version
+
+        Yields a FancyDict derived from the current version,
+        which gets published when the block is left without an exception.
+
+        Yields:
+            FancyDict with the data of the current version
+        """
+        with self._lock:
+            next_version = self._snapshot.derive()
+            yield next_version
+            self._snapshot = next_version.freeze()
+            self._version += 1
+
+    def update(self, __dct=None, **kwargs):
+        """Publishes a new version updated like FancyDict.update()"""
+        with self.edit() as next_version:
+            next_version.update(__dct, **kwargs)
+
+    def update_many(self, sources):
+        """Publishes a new version updated like FancyDict.update_many()"""
+        with self.edit() as next_version:
+            next_version.update_many(sources)
+
+    def apply_patch(self, patch):
+        """Publishes a new version patched like FancyDict.apply_patch()"""
+        with self.edit() as next_version:
+            next_version.apply_patch(patch)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, dict(self._snapshot))
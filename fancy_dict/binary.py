@@ -0,0 +1,338 @@
+"""Binary snapshots of merged FancyDicts
+
+Loading a FancyDict from YAML files parses the files,
+resolves the includes, decodes the annotations and merges everything
+every time a process starts.
+compile_binary() writes a loaded (fully merged) FancyDict,
+including its annotations, into a binary file once.
+MappedFile maps such a file into memory and decodes the dicts lazily:
+a dict gets decoded on the first access,
+its sub-dicts stay encoded until they get accessed themselves.
+Opening a binary file costs the same for every size
+and processes mapping the same file share its pages.
+Lazily decoded dicts look empty to functions reading dicts
+on the C level (like json.dumps), see LazyFancyDict.
+FancyDict.load() decodes binary files eagerly, unless lazy is True.
+
+File layout (little endian)::
+
+    magic | records ... | offset of the root dict (u64) | magic
+
+* a string record is its length (u32) followed by the UTF-8 bytes,
+  strings are written once and referenced by offset
+* a value is a tag (u8) and a payload (8 bytes):
+  the value itself (int, float) or the offset of its record
+* a list record is the number of items (u32) followed by the item values
+* a dict record is the number of keys (u32) followed by entries
+  of the key (value), the offset of the annotated key (u64, 0 if none)
+  and the value
+
+Annotations are stored as keys encoded by an AnnotationsEncoder
+(like fancy_dict.loader.KeyAnnotationsConverter)
+and decoded with the matching AnnotationsDecoder when a dict gets decoded.
+
+Supported values are dicts, lists, tuples, strings, bytes,
+ints, floats, booleans and None.
+"""
+import mmap
+import os
+import struct
+import tempfile
+
+from fancy_dict.dumper import DumperInterface
+
+MAGIC = b"FDB1"
+
+_NONE, _FALSE, _TRUE, _INT, _BIG_INT, _FLOAT, _STR, _BYTES, _LIST, _DICT = \
+    range(10)
+_NO_PAYLOAD = bytes(8)
+_COUNT = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+_INT_PAYLOAD = struct.Struct("<q")
+_FLOAT_PAYLOAD = struct.Struct("<d")
+_VALUE = struct.Struct("<B8s")
+_ENTRY = struct.Struct("<B8sQB8s")
+_TRAILER = struct.Struct("<Q4s")
+
+
+def _read_umask():
+    """Umask of the process, it can only be read by setting it"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# read once, setting the umask later would race with other threads
+_UMASK = _read_umask()
+
+
+class BinaryDumper(DumperInterface):
+    """Dumps a FancyDict into the binary format
+
+    The target must be a binary file object.
+    Records are written in chunks of CHUNK_SIZE parts,
+    a dict is written after all its values,
+    so the target is never seeked.
+    """
+    CHUNK_SIZE = 2**14
+
+    def dump(self, fancy_dict, target, annotations_encoder=None):
+        writer = _Writer(target, annotations_encoder, self.CHUNK_SIZE)
+        writer.write(MAGIC)
+        root = writer.dict(fancy_dict)
+        writer.write(_TRAILER.pack(root, MAGIC))
+        writer.flush()
+
+
+def compile_binary(fancy_dict, path, annotations_encoder=None):
+    """Writes a FancyDict into a binary file
+
+    The file gets written next to the path and replaces it when complete,
+    so a process never maps a partially written file.
+    It gets the permissions of a newly created file (0o666 & ~umask),
+    so other users can map it like any other config file.
+
+    Args:
+        fancy_dict: FancyDict to write
+        path: path of the binary file
+        annotations_encoder: Encoder used for annotations
+    """
+    directory = os.path.dirname(os.path.abspath(str(path)))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as target:
+            BinaryDumper().dump(fancy_dict, target,
+                                annotations_encoder=annotations_encoder)
+        os.chmod(temporary, 0o666 & ~_UMASK)
+        os.replace(temporary, str(path))
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class _Writer:
+    """Writes records and remembers their offsets"""
+    def __init__(self, target, annotations_encoder, chunk_size):
+        self._target = target
+        self._annotations_encoder = annotations_encoder
+        self._chunk_size = chunk_size
+        self._chunks = []
+        self._offset = 0
+        self._strings = {}
+
+    def write(self, data):
+        """Writes data
+
+        Returns:
+            offset of the data
+        """
+        offset = self._offset
+        self._chunks.append(data)
+        self._offset += len(data)
+        if len(self._chunks) > self._chunk_size:
+            self.flush()
+        return offset
+
+    def flush(self):
+        """Writes the pending chunks to the target"""
+        self._target.write(b"".join(self._chunks))
+        self._chunks.clear()
+
+    def string(self, string):
+        """Writes a string once
+
+        Returns:
+            offset of the string record
+        """
+        offset = self._strings.get((type(string), string))
+        if offset is None:
+            data = string.encode("utf-8") if isinstance(string, str) \
+                else bytes(string)
+            offset = self.write(_COUNT.pack(len(data)) + data)
+            self._strings[(type(string), string)] = offset
+        return offset
+
+    def value(self, value):
+        """Writes the records of a value
+
+        Returns:
+            tuple of tag and payload
+        """
+        # pylint: disable=too-many-return-statements
+        if isinstance(value, str):
+            return _STR, _OFFSET.pack(self.string(value))
+        if value is None:
+            return _NONE, _NO_PAYLOAD
+        if isinstance(value, bool):
+            return (_TRUE if value else _FALSE), _NO_PAYLOAD
+        if isinstance(value, int):
+            try:
+                return _INT, _INT_PAYLOAD.pack(value)
+            except struct.error:
+                return _BIG_INT, _OFFSET.pack(self.string(str(value)))
+        if isinstance(value, float):
+            return _FLOAT, _FLOAT_PAYLOAD.pack(value)
+        if isinstance(value, dict):
+            return _DICT, _OFFSET.pack(self.dict(value))
+        if isinstance(value, (list, tuple)):
+            return _LIST, _OFFSET.pack(self.list(value))
+        if isinstance(value, (bytes, bytearray)):
+            return _BYTES, _OFFSET.pack(self.string(value))
+        raise TypeError("cannot dump {!r}".format(value))
+
+    def list(self, lst):
+        """Writes a list record after the records of its items"""
+        values = [self.value(item) for item in lst]
+        return self.write(_COUNT.pack(len(values)) + b"".join(
+            _VALUE.pack(tag, payload) for tag, payload in values
+        ))
+
+    def dict(self, dct):
+        """Writes a dict record after the records of its keys and values"""
+        get_annotations = getattr(dct, "get_annotations", None)
+        entries = []
+        for key, value in dct.items():
+            if isinstance(key, (dict, list, tuple, bytes, bytearray)):
+                raise TypeError("cannot dump key {!r}".format(key))
+            key_tag, key_payload = self.value(key)
+            annotated_key = 0
+            if self._annotations_encoder is not None \
+                    and get_annotations is not None:
+                annotations = get_annotations(key)
+                if annotations is not None:
+                    annotated_key = self.string(
+                        self._annotations_encoder.encode(
+                            annotations, key=key, value=value
+                        )["key"]
+                    )
+            tag, payload = self.value(value)
+            entries.append(_ENTRY.pack(key_tag, key_payload, annotated_key,
+                                       tag, payload))
+        return self.write(_COUNT.pack(len(entries)) + b"".join(entries))
+
+
+class MappedFile:
+    """Binary file mapped into memory
+
+    If lazy is True, root() returns the root dict as LazyFancyDict,
+    which gets decoded on the first access like all its sub-dicts.
+    The mapping stays open as long as a dict of the file is not decoded.
+    Otherwise root() decodes all dicts at once.
+
+    Args:
+        path: path of the binary file
+        output_type: FancyDict type of the decoded dicts
+        annotations_decoder: Decoder used for annotations
+        lazy: decode the dicts on their first access
+    Raises:
+        ValueError if the file is not a binary FancyDict file
+    """
+    def __init__(self, path, output_type, annotations_decoder=None,
+                 lazy=True):
+        with open(str(path), "rb") as binary_file:
+            self._map = mmap.mmap(binary_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        if len(self._map) < len(MAGIC) + _TRAILER.size \
+                or self._map[:len(MAGIC)] != MAGIC \
+                or self._map[-len(MAGIC):] != MAGIC:
+            raise ValueError(
+                "{} is not a binary FancyDict file".format(path)
+            )
+        self._root = _TRAILER.unpack_from(self._map,
+                                          len(self._map) - _TRAILER.size)[0]
+        self._type = output_type
+        self._annotations_decoder = annotations_decoder
+        self._lazy = lazy
+        self._strings = {}
+        self._annotations = {}
+
+    def root(self):
+        """Returns the root dict
+
+        Returns:
+            LazyFancyDict if lazy, else FancyDict of the output type
+        """
+        return self._node(self._root)
+
+    def decode(self, offset):
+        """Decodes a dict record
+
+        Sub-dicts are returned as LazyFancyDicts if lazy.
+
+        Returns:
+            tuple of list of key/value-pairs and dict of Annotations or None
+        """
+        count = _COUNT.unpack_from(self._map, offset)[0]
+        start = offset + _COUNT.size
+        items = []
+        annotations = None
+        for key_tag, key_payload, annotated_key, tag, payload \
+                in _ENTRY.iter_unpack(
+                    self._map[start:start + count * _ENTRY.size]):
+            key = self._value(key_tag, key_payload)
+            items.append((key, self._value(tag, payload)))
+            if annotated_key and self._annotations_decoder is not None:
+                if annotations is None:
+                    annotations = {}
+                annotations[key] = self._decode_annotations(annotated_key)
+        return items, annotations
+
+    def _node(self, offset):
+        # pylint: disable=protected-access
+        if self._lazy:
+            return self._type.lazy(self.decode, offset)
+        items, annotations = self.decode(offset)
+        node = self._type()
+        dict.update(node, items)
+        node._annotations = annotations
+        return node
+
+    def _value(self, tag, payload):
+        # pylint: disable=too-many-return-statements
+        if tag == _STR:
+            return self._string(_OFFSET.unpack(payload)[0])
+        if tag == _DICT:
+            return self._node(_OFFSET.unpack(payload)[0])
+        if tag == _INT:
+            return _INT_PAYLOAD.unpack(payload)[0]
+        if tag == _FLOAT:
+            return _FLOAT_PAYLOAD.unpack(payload)[0]
+        if tag == _LIST:
+            return self._list(_OFFSET.unpack(payload)[0])
+        if tag == _NONE:
+            return None
+        if tag in (_TRUE, _FALSE):
+            return tag == _TRUE
+        if tag == _BIG_INT:
+            return int(self._string(_OFFSET.unpack(payload)[0]))
+        if tag == _BYTES:
+            return self._record(_OFFSET.unpack(payload)[0])
+        raise ValueError("unknown tag {}".format(tag))
+
+    def _list(self, offset):
+        count = _COUNT.unpack_from(self._map, offset)[0]
+        start = offset + _COUNT.size
+        return [self._value(tag, payload) for tag, payload
+                in _VALUE.iter_unpack(
+                    self._map[start:start + count * _VALUE.size])]
+
+    def _record(self, offset):
+        length = _COUNT.unpack_from(self._map, offset)[0]
+        start = offset + _COUNT.size
+        return self._map[start:start + length]
+
+    def _string(self, offset):
+        string = self._strings.get(offset)
+        if string is None:
+            string = self._record(offset).decode("utf-8")
+            self._strings[offset] = string
+        return string
+
+    def _decode_annotations(self, offset):
+        annotations = self._annotations.get(offset)
+        if annotations is None:
+            annotations = self._annotations_decoder.decode(
+                key=self._string(offset)
+            )["annotations"]
+            self._annotations[offset] = annotations
+        return annotations
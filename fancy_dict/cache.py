@@ -0,0 +1,156 @@
+"""Caches used by the Loaders"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class ParsedFileCache:
+    """Caches the parsed content of files
+
+    Entries are keyed by the resolved path of a file and the parse method
+    (Loaders with different parsers get their own entries)
+    and are only valid as long as modification time, size and inode
+    of the file are unchanged.
+    If more than maxsize files are cached,
+    the least recently used entries are dropped.
+
+    The cached content is shared between all users of the cache
+    and must not be modified.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, path, parse):
+        """Returns the parsed content of a file
+
+        Args:
+            path: path of the file
+            parse: method which parses an opened file, used on cache misses,
+                part of the key (must be hashable)
+        Returns:
+            parsed content of the file
+        """
+        resolved_path = os.path.realpath(str(path))
+        key = (resolved_path, parse)
+        stat = os.stat(resolved_path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[1]
+            self._misses += 1
+
+        with open(str(path), "r") as data_file:
+            content = parse(data_file)
+
+        with self._lock:
+            self._entries[key] = (signature, content)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return content
+
+    def invalidate(self, path=None):
+        """Removes a file from the cache
+
+        Args:
+            path: file to remove (parsed by any parse method),
+                if None all files are removed
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                resolved_path = os.path.realpath(str(path))
+                for key in [key for key in self._entries
+                            if key[0] == resolved_path]:
+                    del self._entries[key]
+
+    def stats(self):
+        """Statistics about the cache usage
+
+        Returns:
+            dict with hits, misses, number of cached files and maxsize
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+class DirectoryIndex:
+    """Resolves file names in a list of base directories
+
+    The content of a directory is listed once, when the first file in it
+    gets resolved, and reused for all further lookups.
+    Lookups need no stat() call per candidate file
+    and resolved file names are remembered.
+
+    After refresh() every listed directory is checked once
+    for changes (by its modification time) and listed again if it changed.
+    """
+    def __init__(self, base_dirs):
+        self._base_dirs = tuple(base_dirs)
+        self._listings = {}
+        self._unchecked = set()
+        self._resolved = {}
+        self._lock = threading.Lock()
+
+    def find(self, filename):
+        """Finds the first base directory which contains a file
+
+        Args:
+            filename: name of the file, relative to the base directories
+        Returns:
+            Path of the file in the first matching base directory
+        Raises:
+            FileNotFoundError if no base directory contains the file
+        """
+        full_path = self._resolved.get(filename)
+        if full_path is None:
+            full_path = self._resolve(filename)
+            self._resolved[filename] = full_path
+        return full_path
+
+    def _resolve(self, filename):
+        for base_dir in self._base_dirs:
+            full_path = Path(Path(base_dir) / Path(filename))
+            if full_path.name in self._listing(str(full_path.parent)):
+                return full_path
+        raise FileNotFoundError(filename)
+
+    def refresh(self):
+        """Checks all listed directories for changes on their next use"""
+        with self._lock:
+            self._unchecked = set(self._listings)
+            self._resolved = {}
+
+    def _listing(self, directory):
+        with self._lock:
+            listing = self._listings.get(directory)
+            if listing is not None and directory not in self._unchecked:
+                return listing[1]
+            self._unchecked.discard(directory)
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+            if listing is not None and listing[0] == mtime:
+                return listing[1]
+            listing = (mtime, frozenset(os.listdir(directory)))
+        except OSError:
+            listing = (None, frozenset())
+        with self._lock:
+            self._listings[directory] = listing
+        return listing[1]
+
+
+PARSED_FILES = ParsedFileCache()
@@ -0,0 +1,235 @@
+"""HTTP connections and response cache used by the HttpLoader"""
+import base64
+import http.client
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+
+RETRY_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError,
+                BrokenPipeError)
+REDIRECT_STATUS = (301, 302, 303, 307, 308)
+
+
+class HttpClient:
+    """Keeps HTTP connections alive and caches parsed responses
+
+    Idle connections are pooled per scheme, host, port and proxy
+    and get reused by later requests (keep-alive).
+
+    Proxies are taken from the environment like urllib.request does
+    (http_proxy, https_proxy and no_proxy).
+    HTTP requests are sent to the proxy,
+    HTTPS requests are tunneled through it (CONNECT).
+
+    Parsed responses with an ETag or Last-Modified header are cached
+    per URL and parse method (Loaders with different parsers
+    get their own entries).
+    Further requests for the URL are sent as conditional requests,
+    and an unchanged document (304 Not Modified) is returned from the cache
+    without downloading or parsing it again.
+    The cached content is shared and must not be modified.
+
+    Args:
+        timeout: timeout in seconds for connecting and reading
+        maxsize: number of cached responses
+    """
+    MAX_IDLE_CONNECTIONS = 8
+    MAX_REDIRECTS = 5
+
+    def __init__(self, timeout=30, maxsize=256):
+        self.timeout = timeout
+        self.maxsize = maxsize
+        self._idle_connections = {}
+        self._responses = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, url, parse):
+        """Requests an URL and returns the parsed response body
+
+        Args:
+            url: URL to request
+            parse: method which parses the response body (bytes),
+                part of the cache key (must be hashable)
+        Returns:
+            parsed response body
+        Raises:
+            urllib.error.HTTPError if the server responds with an error
+        """
+        key = (url, parse)
+        with self._lock:
+            cached = self._responses.get(key)
+        headers = {}
+        if cached is not None:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        status, reason, response_headers, body = self._request(url, headers)
+        if status == 304 and cached is not None:
+            with self._lock:
+                self._responses.move_to_end(key)
+                self._hits += 1
+            return cached["content"]
+        if status >= 400:
+            raise urllib.error.HTTPError(url, status, reason,
+                                         response_headers, None)
+
+        content = parse(body)
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        with self._lock:
+            self._misses += 1
+            if etag or last_modified:
+                self._responses[key] = {"etag": etag,
+                                        "last_modified": last_modified,
+                                        "content": content}
+                self._responses.move_to_end(key)
+                while len(self._responses) > self.maxsize:
+                    self._responses.popitem(last=False)
+        return content
+
+    def invalidate(self, url=None):
+        """Removes a cached response
+
+        Args:
+            url: URL to remove (parsed by any parse method),
+                if None all responses are removed
+        """
+        with self._lock:
+            if url is None:
+                self._responses.clear()
+            else:
+                for key in [key for key in self._responses
+                            if key[0] == url]:
+                    del self._responses[key]
+
+    def close(self):
+        """Closes all idle connections"""
+        with self._lock:
+            idle_connections = self._idle_connections
+            self._idle_connections = {}
+        for connections in idle_connections.values():
+            for connection in connections:
+                connection.close()
+
+    def stats(self):
+        """Statistics about the cache usage
+
+        Returns:
+            dict with hits (not modified), misses (downloaded),
+            number of cached responses and idle connections
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "size": len(self._responses),
+                "idle_connections": sum(
+                    len(c) for c in self._idle_connections.values()
+                ),
+            }
+
+    def _request(self, url, headers):
+        for _ in range(self.MAX_REDIRECTS + 1):
+            parsed_url = urllib.parse.urlsplit(url)
+            response = self._send(parsed_url, headers)
+            status, _, response_headers, _ = response
+            location = response_headers.get("Location")
+            if status not in REDIRECT_STATUS or not location:
+                return response
+            url = urllib.parse.urljoin(url, location)
+        raise urllib.error.HTTPError(url, status, "Too many redirects",
+                                     response_headers, None)
+
+    def _send(self, parsed_url, headers):
+        proxy = _proxy(parsed_url)
+        host = (parsed_url.scheme, parsed_url.hostname, parsed_url.port,
+                proxy)
+        path = urllib.parse.urlunsplit(("", "") + parsed_url[2:]) or "/"
+        if proxy is not None and parsed_url.scheme == "http":
+            path = urllib.parse.urlunsplit(parsed_url)
+            headers = dict(headers, **_proxy_headers(proxy))
+        connection = self._idle_connection(host)
+        reused = connection is not None
+        while True:
+            if connection is None:
+                connection = self._connect(host)
+            try:
+                connection.request("GET", path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except RETRY_ERRORS:
+                connection.close()
+                if not reused:
+                    raise
+                connection, reused = None, False
+            except Exception:
+                connection.close()
+                raise
+        if response.will_close:
+            connection.close()
+        else:
+            self._release(host, connection)
+        return response.status, response.reason, response.headers, body
+
+    def _connect(self, host):
+        scheme, hostname, port, proxy = host
+        connection_type = http.client.HTTPSConnection if scheme == "https" \
+            else http.client.HTTPConnection
+        if proxy is None:
+            return connection_type(hostname, port, timeout=self.timeout)
+        connection = connection_type(proxy.hostname, proxy.port,
+                                     timeout=self.timeout)
+        if scheme == "https":
+            connection.set_tunnel(hostname, port,
+                                  headers=_proxy_headers(proxy))
+        return connection
+
+    def _idle_connection(self, host):
+        with self._lock:
+            connections = self._idle_connections.get(host)
+            if connections:
+                return connections.pop()
+        return None
+
+    def _release(self, host, connection):
+        with self._lock:
+            connections = self._idle_connections.setdefault(host, [])
+            if len(connections) < self.MAX_IDLE_CONNECTIONS:
+                connections.append(connection)
+                return
+        connection.close()
+
+
+def _proxy(parsed_url):
+    """Proxy for an URL from the environment
+
+    Returns:
+        parsed proxy URL or None if the URL is requested directly
+    """
+    proxy = urllib.request.getproxies().get(parsed_url.scheme)
+    if not proxy or urllib.request.proxy_bypass(parsed_url.hostname):
+        return None
+    if "://" not in proxy:
+        proxy = "http://" + proxy
+    return urllib.parse.urlsplit(proxy)
+
+
+def _proxy_headers(proxy):
+    """Proxy-Authorization header for the credentials in a proxy URL"""
+    if proxy.username is None:
+        return {}
+    credentials = "{}:{}".format(urllib.parse.unquote(proxy.username),
+                                 urllib.parse.unquote(proxy.password or ""))
+    return {"Proxy-Authorization": "Basic " + base64.b64encode(
+        credentials.encode("utf-8")
+    ).decode("ascii")}
+
+
+HTTP_CLIENT = HttpClient()
@@ -0,0 +1,194 @@
+"""Dumper to serialize FancyDicts
+
+Dumpers walk the FancyDict tree and write it directly to a file object,
+no intermediate plain dict gets built.
+
+If an annotations encoder is given, the annotations of every key
+get encoded into the dumped data, so loading the dumped data
+with the matching decoder reproduces the FancyDict.
+Loading merges the top level keys into an empty FancyDict,
+therefore top level keys with a condition which rejects
+new keys (like if_existing) are not loaded again.
+Annotations of dicts inside lists are not encoded,
+because the loaders do not decode annotations inside lists.
+"""
+import json
+
+import yaml
+from yaml.events import StreamStartEvent, StreamEndEvent, \
+    DocumentStartEvent, DocumentEndEvent, MappingStartEvent, \
+    MappingEndEvent, SequenceStartEvent, SequenceEndEvent, ScalarEvent
+from yaml.nodes import ScalarNode
+from yaml.representer import SafeRepresenter, RepresenterError
+from yaml.resolver import Resolver
+
+
+class DumperInterface:
+    """Interface for a FancyDict Dumper"""
+    def dump(self, fancy_dict, target, annotations_encoder=None):
+        """Dumps a FancyDict to a file object
+
+        If an annotations_encoder is given, Annotations get encoded
+        into the dumped data.
+
+        Args:
+            fancy_dict: FancyDict to dump
+            target: file object to write to
+            annotations_encoder: Encoder used for annotations
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def _items(dct, annotations_encoder):
+        """Key/value-pairs of a dict with encoded annotations"""
+        get_annotations = getattr(dct, "get_annotations", None)
+        if annotations_encoder is None or get_annotations is None:
+            yield from dct.items()
+            return
+        for key, value in dct.items():
+            annotations = get_annotations(key)
+            if annotations is not None:
+                encoded = annotations_encoder.encode(annotations,
+                                                     key=key, value=value)
+                key, value = encoded["key"], encoded["value"]
+            yield key, value
+
+
+class YamlDumper(DumperInterface):
+    """Dumps a FancyDict as YAML
+
+    The YAML events are generated while walking the FancyDict
+    and are emitted with the libyaml based emitter,
+    if PyYAML was built with libyaml.
+    """
+    YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+    def dump(self, fancy_dict, target, annotations_encoder=None):
+        dumper = self.YAML_DUMPER(target, default_flow_style=False)
+        scalars = _YamlScalars()
+        try:
+            dumper.emit(StreamStartEvent())
+            dumper.emit(DocumentStartEvent(explicit=False))
+            self._emit(dumper.emit, fancy_dict, scalars, annotations_encoder)
+            dumper.emit(DocumentEndEvent(explicit=False))
+            dumper.emit(StreamEndEvent())
+        finally:
+            dumper.dispose()
+
+    def _emit(self, emit, value, scalars, annotations_encoder):
+        if isinstance(value, dict):
+            emit(MappingStartEvent(None, None, True, flow_style=False))
+            for key, item in self._items(value, annotations_encoder):
+                emit(scalars.event(key))
+                self._emit(emit, item, scalars, annotations_encoder)
+            emit(MappingEndEvent())
+        elif isinstance(value, (list, tuple)):
+            emit(SequenceStartEvent(None, None, True, flow_style=False))
+            for item in value:
+                self._emit(emit, item, scalars, None)
+            emit(SequenceEndEvent())
+        else:
+            emit(scalars.event(value))
+
+
+class _YamlScalars:
+    """Creates and memorizes the events of scalar values
+
+    Tags and styles are the same as with yaml.safe_dump.
+    """
+    def __init__(self):
+        self._representer = SafeRepresenter()
+        self._resolver = Resolver()
+        self._events = {}
+
+    def event(self, value):
+        """Returns the ScalarEvent for a value"""
+        event_key = (type(value), value)
+        event = self._events.get(event_key)
+        if event is None:
+            node = self._representer.represent_data(value)
+            if not isinstance(node, ScalarNode):
+                raise RepresenterError("cannot dump {!r}".format(value))
+            implicit = (
+                node.tag == self._resolver.resolve(ScalarNode, node.value,
+                                                   (True, False)),
+                node.tag == self._resolver.resolve(ScalarNode, node.value,
+                                                   (False, True)),
+            )
+            event = ScalarEvent(None, node.tag, implicit, node.value,
+                                style=node.style)
+            self._events[event_key] = event
+        return event
+
+
+class JsonDumper(DumperInterface):
+    """Dumps a FancyDict as JSON
+
+    The JSON text is written in chunks of CHUNK_SIZE parts
+    while walking the FancyDict.
+    Scalars are encoded with the json module (like json.dump).
+    """
+    CHUNK_SIZE = 2**14
+
+    def dump(self, fancy_dict, target, annotations_encoder=None):
+        chunks = []
+        self._encode(fancy_dict, chunks, target, _JsonScalars(),
+                     annotations_encoder)
+        target.write("".join(chunks))
+
+    def _encode(self, value, chunks, target, scalars, annotations_encoder):
+        if isinstance(value, dict):
+            separator = "{"
+            for key, item in self._items(value, annotations_encoder):
+                chunks.append(separator)
+                chunks.append(scalars.key(key))
+                self._encode(item, chunks, target, scalars,
+                             annotations_encoder)
+                separator = ", "
+            chunks.append("}" if separator == ", " else "{}")
+        elif isinstance(value, (list, tuple)):
+            separator = "["
+            for item in value:
+                chunks.append(separator)
+                self._encode(item, chunks, target, scalars, None)
+                separator = ", "
+            chunks.append("]" if separator == ", " else "[]")
+        else:
+            chunks.append(scalars.value(value))
+            return
+        if len(chunks) > self.CHUNK_SIZE:
+            target.write("".join(chunks))
+            chunks.clear()
+
+
+class _JsonScalars:
+    """Encodes and memorizes keys and scalar values"""
+    KEY_TYPES = (str, int, float, bool, type(None))
+
+    def __init__(self):
+        self._encoder = json.JSONEncoder()
+        self._keys = {}
+        self._values = {}
+
+    def key(self, key):
+        """Encodes a key including the following colon"""
+        encoded = self._keys.get((type(key), key))
+        if encoded is None:
+            if not isinstance(key, self.KEY_TYPES):
+                raise TypeError("keys must be str, int, float, bool or None, "
+                                "not {}".format(type(key).__name__))
+            string = key if isinstance(key, str) else self._encoder.encode(key)
+            encoded = self._encoder.encode(string) + ": "
+            self._keys[(type(key), key)] = encoded
+        return encoded
+
+    def value(self, value):
+        """Encodes a scalar value"""
+        try:
+            encoded = self._values.get((type(value), value))
+        except TypeError:
+            return self._encoder.encode(value)
+        if encoded is None:
+            encoded = self._encoder.encode(value)
+            self._values[(type(value), value)] = encoded
+        return encoded
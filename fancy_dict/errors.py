@@ -21,3 +21,10 @@ class NoLoaderForSourceAvailable(FancyDictException):
     def __init__(self, source):
         super().__init__("Cannot load from source ({})".format(source))
         self.source = source
+
+
+class InvalidQuery(FancyDictException):
+    """Exception when a query string cannot be parsed"""
+    def __init__(self, query):
+        super().__init__("Cannot parse query ({})".format(query))
+        self.query = query
@@ -1,12 +1,22 @@
 """Dictionary extended load/update/filter features.
 
-Loads data from different sources using Loaders.
+Loads data from different sources using Loaders,
+optionally lazily on the first access.
 Updates data with customizeable MergeMethods.
-Queries data using Transformations.
+Queries data using compiled path queries.
+Compares data and applies the differences as patches.
 """
-from . import merger
+import copy
+import threading
+from collections.abc import Mapping
+
+from . import merger, instrumentation
 from .errors import NoMergeMethodApplies
 from .loader import CompositeLoader
+from .async_loader import AsyncCompositeLoader
+from .dumper import YamlDumper
+from .query import compile_query
+from .patch import diff
 from .annotations import Annotations
 
 
@@ -24,12 +34,19 @@ class FancyDict(dict):
 
     Loader allow it to load data from various sources.
     """
-    __slots__ = ["_annotations"]
+    __slots__ = ["_annotations", "_token", "_pending_load"]
     MERGE_METHODS = (
         merger.MergeMethod(merger.update,
                            from_types=dict, to_types=dict),
         merger.MergeMethod(merger.overwrite),
     )
+    _merge_method_table = {}
+    _overwrite_table = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._merge_method_table = {}
+        cls._overwrite_table = {}
 
     @classmethod
     def load(cls, source, annotations_decoder=None,
@@ -50,6 +67,39 @@ class FancyDict(dict):
             source, annotations_decoder=annotations_decoder
         )
 
+    @classmethod
+    async def aload(cls, source, annotations_decoder=None,
+                    loader=AsyncCompositeLoader, **loader_kwargs):
+        """Loads FancyDicts from different sources without blocking.
+
+        Coroutine version of load(), uses async loaders
+        which run blocking I/O and parsing in an executor.
+        The loaded FancyDict is the same as with load().
+
+        Args:
+            source: Source specifier
+            annotations_decoder: Decoder used for annotations
+            loader: async Loader class used to load from the given source
+            **loader_kwargs: Arguments for the Loader
+        Returns:
+            FancyDict with initialized data from given source
+        """
+        if isinstance(source, FancyDict):
+            return source
+        return await loader(cls, **loader_kwargs).load(
+            source, annotations_decoder=annotations_decoder
+        )
+
+    def dump(self, target, annotations_encoder=None, dumper=YamlDumper):
+        """Dumps the FancyDict to a file object.
+
+        Args:
+            target: file object to write to
+            annotations_encoder: Encoder used for annotations
+            dumper: Dumper class used to serialize the data
+        """
+        dumper().dump(self, target, annotations_encoder=annotations_encoder)
+
     def __new__(cls, *args, **kwargs):
         if args and isinstance(args[0], list):
             return [FancyDict(item) for item in args[0]]
@@ -57,7 +107,8 @@ class FancyDict(dict):
 
     def __init__(self, __dct=None, **kwargs):
         super().__init__()
-        self._annotations = {}
+        self._annotations = None
+        self._token = None
         self.update(__dct, **kwargs)
 
     def __setitem__(self, key, value):
@@ -79,6 +130,9 @@ class FancyDict(dict):
     def annotate(self, key, annotations=None, **kwargs):
         """Adds Annotations for specific key.
 
+        The annotations storage of a FancyDict gets allocated
+        on the first annotate(), nodes without annotations have none.
+
         Args:
             key: name of the key
             annotations: Annotations object with the annotions to add
@@ -90,8 +144,11 @@ class FancyDict(dict):
         if annotations or kwargs:
             annotations = Annotations(**kwargs) if annotations is None \
                 else annotations
+            if self._annotations is None:
+                self._annotations = {}
             if key in self._annotations:
-                self._annotations[key].update(annotations)
+                self._annotations[key] = \
+                    self._annotations[key].merge(annotations)
             else:
                 self._annotations[key] = annotations
 
@@ -107,8 +164,26 @@ class FancyDict(dict):
         Returns:
             Annotations for this key or default.
         """
+        if self._annotations is None:
+            return default
         return self._annotations.get(key, default)
 
+    def query(self, query, index=None):
+        """Finds all values matching a query
+
+        Query strings are compiled once and memorized,
+        see fancy_dict.query for the syntax.
+
+        Args:
+            query: query string like "a.b", "a.*.c" or "..c"
+            index: KeyIndex of this FancyDict, used for recursive descent
+        Returns:
+            list of matching values in document order
+        Raises:
+            InvalidQuery if the query string cannot be parsed
+        """
+        return compile_query(query).find(self, index=index)
+
     def filter(self, filter_method, recursive=False, flat=False):
         """Returns a filtered FancyDict
 
@@ -125,17 +200,50 @@ class FancyDict(dict):
         Returns:
             FancyDict with filtered content
         """
-        result = FancyDict()
-        for key, value in self.items():
-            if isinstance(value, FancyDict) and recursive:
-                if flat:
-                    result.update(value.filter(filter_method,
-                                               recursive=True, flat=True))
-                else:
-                    result[key] = value.filter(filter_method, recursive=True)
-            elif filter_method(key, value):
-                result[key] = value
-        return result
+        return self.filter_view(filter_method, recursive=recursive,
+                                flat=flat).materialize()
+
+    def filter_view(self, filter_method, recursive=False, flat=False):
+        """Returns a read-only view of the filtered content
+
+        Same as filter(), but nothing gets copied
+        until the view is read or materialized.
+
+        Args:
+            filter_method: determines if key/value pair gets into return
+            recursive: searches recursive into sub dicts
+            flat: if recursive, flattens the result
+
+        Returns:
+            FilterView of this FancyDict
+        """
+        return FilterView(self, filter_method, recursive=recursive,
+                          flat=flat)
+
+    def iter_filter(self, filter_method, recursive=False):
+        """Yields the matches of filter_method one at a time
+
+        Sub-FancyDicts are searched, if recursive is True.
+        Only the current path is kept in memory.
+
+        Args:
+            filter_method: determines if key/value pair is a match
+            recursive: searches recursive into sub dicts
+
+        Yields:
+            tuples of path (tuple of keys to the dict), key and value
+        """
+        stack = [((), iter(self.items()))]
+        while stack:
+            path, items = stack[-1]
+            for key, value in items:
+                if recursive and isinstance(value, FancyDict):
+                    stack.append((path + (key,), iter(value.items())))
+                    break
+                if filter_method(key, value):
+                    yield path, key, value
+            else:
+                stack.pop()
 
     def update(self, __dct=None, **kwargs):
         """Updates the data using MergeMethods and Annotations
@@ -174,26 +282,717 @@ class FancyDict(dict):
         if kwargs:
             self._update_with_fancy_dict(self.load(kwargs))
 
+    def update_many(self, sources):
+        """Updates the data with several sources in one pass
+
+        Same result as calling update() with every source in order,
+        but every key is resolved from the last source backwards:
+        Sources before the last value which overwrites the key
+        regardless of the old value are skipped,
+        so their values are neither merged nor changed.
+        Runs of dicts merged with merger.update are merged
+        with a nested update_many().
+        Keys annotated in this FancyDict or in any source
+        are updated with every source in order.
+
+        Args:
+            sources: iterable of source dicts, later sources win
+        Raises:
+            NoMergeMethodApplies if no valid MergeStrategy was found.
+        """
+        # pylint: disable=protected-access
+        layers = [self.load(source) for source in sources
+                  if isinstance(source, dict)]
+        key_layers = {}
+        for layer in layers:
+            if self._token is not None and layer._token is not None \
+                    and layer._token is not _FROZEN:
+                layer._token = object()
+            for key in layer:
+                key_layers.setdefault(key, []).append(layer)
+
+        new_keys = []
+        inserted_late = {}
+        for key, from_dicts in key_layers.items():
+            missing = key not in self
+            if missing:
+                new_keys.append(key)
+            if self.get_annotations(key) is None and all(
+                    from_dict.get_annotations(key) is None
+                    for from_dict in from_dicts):
+                self._update_layered_value(key, from_dicts)
+                continue
+            for from_dict in from_dicts:
+                self._update_value(key, from_dict)
+                if missing and key in self:
+                    missing = False
+                    if from_dict is not from_dicts[0]:
+                        inserted_late[key] = from_dict
+        if inserted_late:
+            self._restore_insertion_order(layers, new_keys, key_layers,
+                                          inserted_late)
+
+    def diff(self, other):
+        """Compares this FancyDict with another dict
+
+        Sub-dicts which are identical or frozen with equal hashes
+        are skipped, see fancy_dict.patch.
+
+        Args:
+            other: dict with the new data
+        Returns:
+            Patch which changes this FancyDict into other
+        """
+        return diff(self, other)
+
+    def apply_patch(self, patch):
+        """Applies a Patch in place
+
+        Changed and added values overwrite the old values like update()
+        with overwrite annotated sources,
+        so finalized keys and conditions are respected.
+        The annotations of the patched keys are kept.
+        Paths with a finalized key on the way are skipped.
+
+        The values of the patch are copied,
+        shared sub-FancyDicts (see derive()) are copied on write.
+
+        Args:
+            patch: Patch created by diff()
+        """
+        # pylint: disable=protected-access
+        for path in patch.removed:
+            parent = self._patch_parent(path, create=False)
+            if parent is not None and path[-1] in parent:
+                annotations = parent.get_annotations(path[-1])
+                if annotations is None or not annotations.finalized:
+                    del parent[path[-1]]
+        for path, value in patch.added + patch.changed:
+            parent = self._patch_parent(path, create=True)
+            if parent is not None:
+                parent._patch_value(path[-1], value)
+
+    def derive(self):
+        """Returns a FancyDict which shares all values with this FancyDict
+
+        Both FancyDicts use copy-on-write afterwards.
+        A shared sub-FancyDict gets copied by update(),
+        when a merge method writes into it
+        (all merge methods except merger.overwrite).
+        Untouched sub-FancyDicts stay shared,
+        so they must only be changed through update().
+
+        Returns:
+            derived FancyDict
+        """
+        self._token = object()
+        return self._copy(object())
+
+    def freeze(self):
+        """Returns an immutable and hashable snapshot of this FancyDict
+
+        Sub-dicts get frozen recursively, lists become FrozenLists.
+        The snapshot keeps the annotations
+        and can be used as source for update().
+
+        Returns:
+            FrozenFancyDict with the same type specific behavior
+        """
+        return _frozen_type(type(self))(self)
+
+    @classmethod
+    def lazy(cls, load, source):
+        """Creates a FancyDict which gets loaded on the first access
+
+        Args:
+            load: called with the source on the first access,
+                returns a tuple of a dict (or key/value-pairs)
+                and a dict of their Annotations (or None)
+            source: data passed to load
+        Returns:
+            LazyFancyDict which turns into this type when loaded
+        """
+        # pylint: disable=protected-access
+        lazy_type = _lazy_type(cls)
+        lazy_fancy_dict = lazy_type.__new__(lazy_type)
+        lazy_fancy_dict._annotations = None
+        lazy_fancy_dict._token = None
+        lazy_fancy_dict._pending_load = (load, source)
+        return lazy_fancy_dict
+
+    def _copy(self, token):
+        # pylint: disable=protected-access
+        copied = type(self)()
+        dict.update(copied, self)
+        copied._annotations = _copy_annotations(self._annotations)
+        copied._token = token
+        return copied
+
     def _update_with_fancy_dict(self, fancy_dict):
+        # pylint: disable=protected-access
+        # a frozen source never changes, so its values stay shared
+        if self._token is not None and fancy_dict._token is not None \
+                and fancy_dict._token is not _FROZEN:
+            fancy_dict._token = object()
         for key in fancy_dict:
             self._update_value(key, fancy_dict)
 
+    def _update_layered_value(self, key, from_dicts):
+        """Updates a key without annotations with the values of from_dicts
+
+        Skips the values before the last overwriting value
+        and merges runs of dicts with a nested update_many().
+        """
+        for start in range(len(from_dicts) - 1, -1, -1):
+            if self._overwrites(from_dicts[start], from_dicts[start][key]):
+                self._update_value(key, from_dicts[start])
+                from_dicts = from_dicts[start + 1:]
+                break
+        value = self.get(key)
+        if not isinstance(value, FancyDict) and len(from_dicts) > 2:
+            self._update_value(key, from_dicts[0])
+            from_dicts = from_dicts[1:]
+            value = self.get(key)
+        if len(from_dicts) > 1 and isinstance(value, FancyDict) and all(
+                getattr(self._find_merge_method(from_dict, value,
+                                                from_dict[key]),
+                        "method", None) is merger.update
+                for from_dict in from_dicts):
+            value = self._writable(value, merger.update)
+            self[key] = value
+            value.update_many(from_dict[key] for from_dict in from_dicts)
+            return
+        for from_dict in from_dicts:
+            self._update_value(key, from_dict)
+
+    def _overwrites(self, from_dict, new_value):
+        """Checks if new_value gets merged with merger.overwrite
+
+        True only if this follows from the merge methods
+        without knowing the old value.
+        The result is cached per class like the merge method lookup.
+        """
+        try:
+            return self._overwrite_table[(type(from_dict), type(new_value))]
+        except KeyError:
+            pass
+        overwrites = False
+        for method in from_dict.MERGE_METHODS + self.MERGE_METHODS:
+            if not isinstance(method, merger.MergeMethod) \
+                    or type(method).applies is not merger.MergeMethod.applies:
+                break
+            if method.to_types is None \
+                    or isinstance(new_value, method.to_types):
+                overwrites = method.from_types is None \
+                    and method.method is merger.overwrite
+                break
+        self._overwrite_table[(type(from_dict), type(new_value))] = overwrites
+        return overwrites
+
+    def _restore_insertion_order(self, layers, new_keys, key_layers,
+                                 inserted_late):
+        """Moves new keys to the position sequential updates insert them at
+
+        A key gets inserted by the first source accepted by its condition,
+        which can be a later source than the first source with the key.
+        """
+        indices = {id(layer): index for index, layer in enumerate(layers)}
+        layer_positions = {}
+
+        def insertion(key):
+            layer = inserted_late.get(key, key_layers[key][0])
+            if id(layer) not in layer_positions:
+                layer_positions[id(layer)] = {
+                    layer_key: position
+                    for position, layer_key in enumerate(layer)
+                }
+            return indices[id(layer)], layer_positions[id(layer)][key]
+
+        for key in sorted((key for key in new_keys if key in self),
+                          key=insertion):
+            dict.__setitem__(self, key, dict.pop(self, key))
+
+    def _patch_parent(self, path, create):
+        """Looks up the FancyDict containing the last key of a path
+
+        Shared FancyDicts on the way get copied,
+        missing FancyDicts get created if create is True.
+
+        Returns:
+            FancyDict or None if the path is missing or finalized
+        """
+        # pylint: disable=protected-access
+        parent = self
+        for key in path[:-1]:
+            annotations = parent.get_annotations(key)
+            if annotations is not None and annotations.finalized:
+                return None
+            value = parent.get(key)
+            if not isinstance(value, FancyDict):
+                if not create:
+                    return None
+                parent._patch_value(key, {})
+                value = parent.get(key)
+                if not isinstance(value, FancyDict):
+                    return None
+            value = parent._writable(value, merger.update)
+            dict.__setitem__(parent, key, value)
+            parent = value
+        return parent
+
+    def _patch_value(self, key, value):
+        """Overwrites the value of a key, keeps its annotations"""
+        # pylint: disable=protected-access
+        source = type(self)()
+        source[key] = _copy_value(value)
+        source.annotate(key, merge_method=merger.overwrite)
+        annotations = self.get_annotations(key)
+        self._update_value(key, source)
+        if annotations is None:
+            self._annotations.pop(key, None)
+        else:
+            self._annotations[key] = annotations
+
     def _update_value(self, key, from_dict):
-        if self.get_annotations(key, Annotations()).finalized:
+        annotations = self.get_annotations(key)
+        from_annotations = from_dict.get_annotations(key)
+        if annotations is None and from_annotations is None:
+            old_value = self.get(key)
+            new_value = from_dict[key]
+            method = self._find_merge_method(from_dict, old_value, new_value)
+            if instrumentation.ENABLED:
+                instrumentation.count("merge_method",
+                                      instrumentation.name_of(method))
+            # only derived FancyDicts and frozen values are shared
+            if self._token is not None \
+                    or isinstance(old_value, FrozenFancyDict):
+                old_value = self._writable(old_value, method)
+            self[key] = method(old_value, new_value)
+            return
+
+        if annotations is not None and annotations.finalized:
+            if instrumentation.ENABLED:
+                instrumentation.count(
+                    "finalized_skipped",
+                    self._skipped_merge_method_name(key, from_dict,
+                                                    annotations)
+                )
             return
 
         old_value = self.get(key)
-        new_value = from_dict.get(key)
-        self.annotate(key, from_dict.get_annotations(key))
-        annotations = self.get_annotations(key, Annotations())
+        new_value = from_dict[key]
+        self.annotate(key, from_annotations)
+        annotations = self.get_annotations(key)
         if annotations.condition(old_value, new_value):
-            if annotations.get("merge_method") is not None:
-                self[key] = annotations.merge_method(old_value, new_value)
-            else:
-                methods = from_dict.MERGE_METHODS + self.MERGE_METHODS
-                for method in methods:
-                    if method.applies(old_value, new_value):
-                        self[key] = method(old_value, new_value)
-                        break
-                else:
-                    raise NoMergeMethodApplies(old_value, new_value)
+            method = annotations.get("merge_method")
+            if method is None:
+                method = self._find_merge_method(from_dict,
+                                                 old_value, new_value)
+            if instrumentation.ENABLED:
+                instrumentation.count("merge_method",
+                                      instrumentation.name_of(method))
+            self[key] = method(self._writable(old_value, method), new_value)
+        elif instrumentation.ENABLED:
+            instrumentation.count(
+                "condition_rejected",
+                instrumentation.name_of(annotations.condition)
+            )
+
+    def _skipped_merge_method_name(self, key, from_dict, annotations):
+        """Instrumentation label, "none" if no merge method applies"""
+        method = annotations.get("merge_method")
+        if method is None:
+            try:
+                method = self._find_merge_method(from_dict, self.get(key),
+                                                 from_dict[key])
+            except NoMergeMethodApplies:
+                return "none"
+        return instrumentation.name_of(method)
+
+    def _writable(self, value, method):
+        """Copies a shared FancyDict before method merges into it
+
+        A FancyDict is shared, if it was not copied with the token
+        of this FancyDict (see derive()).
+        FrozenFancyDicts are always shared and get thawed.
+        """
+        # pylint: disable=protected-access
+        if isinstance(value, FancyDict) and value._token is not self._token \
+                and getattr(method, "method", method) is not merger.overwrite:
+            return value._copy(self._token)
+        return value
+
+    def _find_merge_method(self, from_dict, old_value, new_value):
+        """Looks up the first MergeMethod which applies
+
+        The result only depends on the types involved and is cached
+        per class in a table keyed by the type of the source dict,
+        the type of the old value and the type of the new value.
+        """
+        try:
+            method = self._merge_method_table[type(from_dict)][
+                type(old_value)][type(new_value)]
+        except KeyError:
+            method = next(
+                (method
+                 for method in from_dict.MERGE_METHODS + self.MERGE_METHODS
+                 if method.applies(old_value, new_value)),
+                None
+            )
+            self._merge_method_table.setdefault(type(from_dict), {}) \
+                .setdefault(type(old_value), {})[type(new_value)] = method
+        if method is None:
+            raise NoMergeMethodApplies(old_value, new_value)
+        return method
+
+
+class FrozenFancyDict(FancyDict):
+    """Immutable and hashable snapshot of a FancyDict
+
+    Created by FancyDict.freeze(),
+    all sub-dicts are FrozenFancyDicts and all lists are FrozenLists.
+
+    Equal to FancyDicts and dicts with the same items.
+    The hash is computed once over the items, annotations are ignored.
+
+    Reading a missing attribute raises an AttributeError
+    instead of adding an empty FancyDict.
+
+    When a FancyDict gets updated with a FrozenFancyDict,
+    sub-FrozenFancyDicts are shared and thawed (copied),
+    when a merge method writes into them.
+
+    FrozenFancyDict adds no instance layout, so it can be combined
+    with FancyDict subclasses declaring their own __slots__.
+    Instances are created as the concrete frozen type
+    of the FancyDict type, which stores the hash.
+    """
+    __slots__ = ()
+    _mutable_type = FancyDict
+
+    def __new__(cls, *_args, **_kwargs):
+        return dict.__new__(_frozen_type(cls))
+
+    def __init__(self, __dct=None, **kwargs):
+        # pylint: disable=super-init-not-called,protected-access
+        source = __dct if isinstance(__dct, FancyDict) and not kwargs \
+            else self._mutable_type(__dct, **kwargs)
+        dict.update(self, ((key, _freeze_value(value))
+                           for key, value in source.items()))
+        super().__setattr__("_annotations",
+                            _copy_annotations(source._annotations))
+        super().__setattr__("_token", _FROZEN)
+        super().__setattr__("_hash", hash(frozenset(self.items())))
+
+    def __hash__(self):
+        return self._hash
+
+    def _immutable(self, *_args, **_kwargs):
+        raise TypeError(
+            "'{}' object is immutable".format(type(self).__name__)
+        )
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = __ior__ = \
+        clear = pop = popitem = setdefault = update = update_many = \
+        annotate = _immutable
+
+    def __getattr__(self, item):
+        if item not in self:
+            raise AttributeError(item)
+        return self[item]
+
+    def freeze(self):
+        return self
+
+    def thaw(self):
+        """Returns a mutable copy of this snapshot
+
+        Sub-dicts and lists are thawed recursively.
+
+        Returns:
+            FancyDict of the type which was frozen
+        """
+        thawed = self._copy(None)
+        for key, value in thawed.items():
+            dict.__setitem__(thawed, key, _thaw_value(value))
+        return thawed
+
+    def derive(self):
+        return self._copy(object())
+
+    def _copy(self, token):
+        # pylint: disable=protected-access
+        copied = self._mutable_type()
+        dict.update(copied, self)
+        copied._annotations = _copy_annotations(self._annotations)
+        copied._token = token
+        return copied
+
+
+class FrozenList(tuple):
+    """Immutable list in a FrozenFancyDict
+
+    Equal to lists with the same items.
+    Adding a list or a FrozenList returns a list.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            other = tuple(other)
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
+
+    def __add__(self, other):
+        return list(self) + list(other)
+
+    def __radd__(self, other):
+        return list(other) + list(self)
+
+
+_FROZEN = object()
+_FROZEN_TYPES = {}
+
+
+def _frozen_type(fancy_dict_type):
+    """Concrete FrozenFancyDict type for a FancyDict type
+
+    Created once per type, only the concrete type adds the slot
+    of the hash, so the bases do not combine two instance layouts.
+    """
+    # pylint: disable=protected-access
+    if hasattr(fancy_dict_type, "_hash"):
+        return fancy_dict_type
+    if fancy_dict_type is FrozenFancyDict:
+        fancy_dict_type = FancyDict
+    frozen_type = _FROZEN_TYPES.get(fancy_dict_type)
+    if frozen_type is None:
+        if issubclass(fancy_dict_type, FrozenFancyDict):
+            name, bases = fancy_dict_type.__name__, (fancy_dict_type,)
+            mutable_type = fancy_dict_type._mutable_type
+        else:
+            name = "Frozen" + fancy_dict_type.__name__
+            bases = (FrozenFancyDict,) if fancy_dict_type is FancyDict \
+                else (FrozenFancyDict, fancy_dict_type)
+            mutable_type = fancy_dict_type
+        frozen_type = type(name, bases, {"__slots__": ("_hash",),
+                                         "_mutable_type": mutable_type})
+        _FROZEN_TYPES[fancy_dict_type] = frozen_type
+    return frozen_type
+
+
+def _copy_annotations(annotations):
+    return None if annotations is None else dict(annotations)
+
+
+def _freeze_value(value):
+    if isinstance(value, FancyDict):
+        return value.freeze()
+    if isinstance(value, dict):
+        return FrozenFancyDict(value)
+    if isinstance(value, list):
+        return FrozenList(_freeze_value(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _thaw_value(value):
+    if isinstance(value, FrozenFancyDict):
+        return value.thaw()
+    if isinstance(value, FrozenList):
+        return [_thaw_value(item) for item in value]
+    return value
+
+
+def _copy_value(value):
+    """Deep copy of a value, frozen values are thawed"""
+    # pylint: disable=protected-access
+    if isinstance(value, FancyDict):
+        copied = value._copy(None)
+        for key, item in copied.items():
+            dict.__setitem__(copied, key, _copy_value(item))
+        return copied
+    if isinstance(value, dict):
+        return {key: _copy_value(item) for key, item in value.items()}
+    if isinstance(value, (list, FrozenList)):
+        return [_copy_value(item) for item in value]
+    return copy.deepcopy(value)
+
+
+class LazyFancyDict(FancyDict):
+    """FancyDict which is not loaded yet
+
+    Created by FancyDict.lazy(), which keeps the load function
+    and its source in the _pending_load slot until the first access.
+    Every dict method and every method of the FancyDict type
+    loads the data first, which turns the LazyFancyDict
+    into an instance of the FancyDict type.
+    Sub-dicts can be LazyFancyDicts again,
+    so only the accessed and merged paths get loaded.
+
+    Functions reading dicts on the C level without calling methods
+    (like dict.__getitem__(lazy, key), json.dumps or PyDict_* functions)
+    see a LazyFancyDict as empty.
+    """
+    __slots__ = ()
+    _loaded_type = FancyDict
+
+
+_LAZY_METHODS = (
+    "__contains__", "__delitem__", "__eq__", "__getitem__", "__ior__",
+    "__iter__", "__len__", "__ne__", "__or__", "__reduce__",
+    "__reduce_ex__", "__repr__", "__reversed__", "__ror__", "__setitem__",
+    "clear", "copy", "get", "items", "keys", "pop", "popitem", "setdefault",
+    "update", "values",
+)
+_NOT_LOADING = ("__new__", "__init__", "__init_subclass__", "__setattr__",
+                "__getattr__", "__delattr__", "__hash__")
+_LAZY_TYPES = {FancyDict: LazyFancyDict}
+_LOAD_LOCK = threading.RLock()
+
+
+def _lazy_type(fancy_dict_type):
+    """LazyFancyDict type for a FancyDict type (created once per type)"""
+    lazy_type = _LAZY_TYPES.get(fancy_dict_type)
+    if lazy_type is None:
+        # the FancyDict type is the first base to keep its instance layout,
+        # which is required to assign the __class__ when loaded
+        namespace = {"__slots__": (), "_loaded_type": fancy_dict_type}
+        for name in _loading_methods(fancy_dict_type):
+            namespace[name] = _loading(name)
+        lazy_type = type("Lazy" + fancy_dict_type.__name__,
+                         (fancy_dict_type, LazyFancyDict), namespace)
+        _LAZY_TYPES[fancy_dict_type] = lazy_type
+    return lazy_type
+
+
+def _loading_methods(fancy_dict_type):
+    """Names of the methods which load a LazyFancyDict first"""
+    names = {name for name in _LAZY_METHODS if hasattr(dict, name)}
+    for cls in fancy_dict_type.__mro__:
+        if issubclass(cls, FancyDict) and not issubclass(cls, LazyFancyDict):
+            names.update(name for name, attribute in vars(cls).items()
+                         if callable(attribute)
+                         and not isinstance(attribute, type)
+                         and not isinstance(attribute,
+                                            (classmethod, staticmethod)))
+    return sorted(names.difference(_NOT_LOADING))
+
+
+def _loading(name):
+    def method(self, *args, **kwargs):
+        _load(self)
+        for arg in args:
+            _load(arg)
+        return getattr(self, name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+def _load(lazy_fancy_dict):
+    """Loads a LazyFancyDict in place
+
+    Arguments of loading methods get loaded as well,
+    because dict methods (like dict.__eq__) read them on the C level.
+    """
+    # pylint: disable=protected-access
+    if not isinstance(lazy_fancy_dict, LazyFancyDict):
+        return
+    with _LOAD_LOCK:
+        if not isinstance(lazy_fancy_dict, LazyFancyDict):
+            return
+        load, source = lazy_fancy_dict._pending_load
+        items, annotations = load(source)
+        lazy_fancy_dict.__class__ = lazy_fancy_dict._loaded_type
+        dict.update(lazy_fancy_dict, items)
+        lazy_fancy_dict._annotations = annotations
+        lazy_fancy_dict._pending_load = None
+
+
+for _name in _loading_methods(FancyDict):
+    setattr(LazyFancyDict, _name, _loading(_name))
+
+
+class FilterView(Mapping):
+    """Read-only view of the filtered content of a FancyDict
+
+    Created by FancyDict.filter_view(),
+    contains the same keys and values as FancyDict.filter().
+    Keys and values are filtered when they get read,
+    nested sub-dicts are FilterViews as well.
+    In a flat view the last match of a key wins.
+
+    The view reflects later changes of the FancyDict.
+    """
+    def __init__(self, fancy_dict, filter_method, recursive=False,
+                 flat=False):
+        self._fancy_dict = fancy_dict
+        self._filter_method = filter_method
+        self._recursive = recursive
+        self._flat = flat and recursive
+
+    def matches(self):
+        """Yields the matches as tuples of path, key and value"""
+        return self._fancy_dict.iter_filter(self._filter_method,
+                                            recursive=self._recursive)
+
+    def materialize(self):
+        """Copies the filtered content into a FancyDict
+
+        Returns:
+            FancyDict with filtered content
+        """
+        result = FancyDict()
+        if self._flat:
+            for _, key, value in self.matches():
+                result[key] = value
+        else:
+            for key, value in self._items():
+                if isinstance(value, FilterView):
+                    value = value.materialize()
+                result[key] = value
+        return result
+
+    def _items(self):
+        for key, value in self._fancy_dict.items():
+            if self._recursive and isinstance(value, FancyDict):
+                yield key, FilterView(value, self._filter_method,
+                                      recursive=True)
+            elif self._filter_method(key, value):
+                yield key, value
+
+    def __getitem__(self, key):
+        if self._flat:
+            found = [value for _, match_key, value in self.matches()
+                     if match_key == key]
+            if not found:
+                raise KeyError(key)
+            return found[-1]
+        value = self._fancy_dict[key]
+        if self._recursive and isinstance(value, FancyDict):
+            return FilterView(value, self._filter_method, recursive=True)
+        if not self._filter_method(key, value):
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        if self._flat:
+            seen = set()
+            for _, key, _ in self.matches():
+                if key not in seen:
+                    seen.add(key)
+                    yield key
+        else:
+            for key, _ in self._items():
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, dict(self.items()))
@@ -0,0 +1,181 @@
+"""Instrumentation of loading and merging FancyDicts
+
+Shows where the time to build a FancyDict goes
+and how the keys got merged.
+Disabled by default, the instrumented code only checks ENABLED then.
+Enabled, the following timings (count and seconds per key)
+and counters get reported to the hooks:
+
+* timing "dispatch": selecting a loader in the CompositeLoader,
+  per loader type
+* timing "load": loading with the CompositeLoader, per source
+* timing "read": reading and parsing a file (or getting it from the cache),
+  per file (per document if the FileLoader streams a file without cache)
+* timing "merge": merging the data of a file into its base
+  (its own data and the merged data of included files), per file
+* timing "decode": decoding annotations, per decoder type
+* counter "merge_method": merged keys, per merge method
+* counter "condition_rejected": keys not merged, per condition
+* counter "finalized_skipped": updates of finalized keys,
+  per merge method which would have been used
+
+METRICS is registered as hook by default,
+other hooks (like a client of a metrics system)
+can be added with add_hook().
+
+Example::
+
+    with instrumentation.enabled() as metrics:
+        FancyDict.load("config.yml")
+    print(metrics.to_dict())
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+ENABLED = False
+
+
+class Metrics:
+    """Collects the timings and counters reported by the instrumentation
+
+    Thread-safe, all reports are added up until reset() gets called.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = {}
+        self._counters = {}
+
+    def add_timing(self, name, key, seconds):
+        """Adds a measured duration
+
+        Args:
+            name: name of the timing
+            key: what was measured, like a path or a type name
+            seconds: measured duration
+        """
+        with self._lock:
+            timing = self._timings.setdefault(name, {}).get(key)
+            if timing is None:
+                self._timings[name][key] = [1, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+
+    def increment(self, name, key):
+        """Increments a counter
+
+        Args:
+            name: name of the counter
+            key: what was counted, like a merge method name
+        """
+        with self._lock:
+            counter = self._counters.setdefault(name, {})
+            counter[key] = counter.get(key, 0) + 1
+
+    def reset(self):
+        """Removes all reports"""
+        with self._lock:
+            self._timings = {}
+            self._counters = {}
+
+    def to_dict(self):
+        """Exports the metrics
+
+        Returns:
+            dict with the timings (count and seconds per name and key)
+            and the counters (count per name and key)
+        """
+        with self._lock:
+            return {
+                "timings": {
+                    name: {key: {"count": count, "seconds": seconds}
+                           for key, (count, seconds) in timings.items()}
+                    for name, timings in self._timings.items()
+                },
+                "counters": {name: dict(counters)
+                             for name, counters in self._counters.items()},
+            }
+
+
+METRICS = Metrics()
+_HOOKS = [METRICS]
+
+
+def enable():
+    """Enables the instrumentation"""
+    global ENABLED  # pylint: disable=global-statement
+    ENABLED = True
+
+
+def disable():
+    """Disables the instrumentation"""
+    global ENABLED  # pylint: disable=global-statement
+    ENABLED = False
+
+
+@contextmanager
+def enabled(metrics=METRICS):
+    """Enables the instrumentation in a block
+
+    Args:
+        metrics: Metrics to reset before the block
+    Yields:
+        the Metrics
+    """
+    previous = ENABLED
+    metrics.reset()
+    enable()
+    try:
+        yield metrics
+    finally:
+        if not previous:
+            disable()
+
+
+def add_hook(hook):
+    """Reports the instrumentation to a hook
+
+    Args:
+        hook: object with the methods add_timing() and increment()
+            of Metrics
+    """
+    _HOOKS.append(hook)
+
+
+def remove_hook(hook):
+    """Stops reporting the instrumentation to a hook"""
+    _HOOKS.remove(hook)
+
+
+def record(name, key, start):
+    """Reports the time since start to the hooks
+
+    Instrumented code takes start from time.perf_counter()
+    only if ENABLED and records it only if it was taken.
+
+    Args:
+        name: name of the timing
+        key: what was measured
+        start: time.perf_counter() at the start
+    """
+    seconds = time.perf_counter() - start
+    for hook in _HOOKS:
+        hook.add_timing(name, key, seconds)
+
+
+def count(name, key):
+    """Reports an increment of a counter to the hooks
+
+    Args:
+        name: name of the counter
+        key: what was counted
+    """
+    for hook in _HOOKS:
+        hook.increment(name, key)
+
+
+def name_of(function):
+    """Name of a merge method or a condition"""
+    function = getattr(function, "method", function)
+    return getattr(function, "__name__", type(function).__name__)
@@ -1,15 +1,23 @@
-"""Loader and Dumper to serialize FancyDicts"""
+"""Loader to deserialize FancyDicts"""
 import re
-import urllib.request
+import json
+import copy
+import time
+import functools
 import urllib.parse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from io import IOBase
 
 import yaml
 
 from fancy_dict.errors import NoLoaderForSourceAvailable
-from fancy_dict import merger, conditions
+from fancy_dict import merger, conditions, instrumentation
 from fancy_dict.annotations import Annotations
+from fancy_dict.binary import MappedFile
+from fancy_dict.cache import PARSED_FILES, DirectoryIndex
+from fancy_dict.connection import HTTP_CLIENT
 
 
 class AnnotationsDecoder:
@@ -72,12 +80,10 @@ class KeyAnnotationsConverter(AnnotationsEncoder, AnnotationsDecoder):
 
     @classmethod
     def decode(cls, key=None, value=None):
-        annotations = Annotations(
-            merge_method=cls._parse_merge_method(key),
-            condition=cls._parse_condition(key),
-            finalized=cls._parse_finalized(key),
-        )
-        key = cls._parse_key(key)
+        start = instrumentation.ENABLED and time.perf_counter()
+        key, annotations = cls._parse(key)
+        if start:
+            instrumentation.record("decode", cls.__name__, start)
         return {
             "key": key,
             "value": value,
@@ -85,60 +91,82 @@ class KeyAnnotationsConverter(AnnotationsEncoder, AnnotationsDecoder):
         }
 
     @classmethod
-    def _parse_finalized(cls, annotated_key):
-        key = cls._parse_key(annotated_key)
-        locking_pattern = r"\({key}\)".format(key=key)
-        match = re.search(locking_pattern, annotated_key)
-        return bool(match)
+    @functools.lru_cache(maxsize=2**16)
+    def _parse(cls, annotated_key):
+        """Parses an annotated key in a single scan
 
-    @classmethod
-    def _parse_key(cls, annotated_key):
-        condition_marker = "".join(cls.CONDITIONS.keys())
-        key_pattern = r"^[{}]?\({{0,1}}(?P<key>[^)[]+)\){{0,1}}".format(
-            condition_marker
-        )
-        return re.match(key_pattern, annotated_key).group("key")
+        Results are memorized, because the same keys
+        repeat across many (included) files.
+        Annotations are immutable, so they can be shared.
 
-    @classmethod
-    def _parse_merge_method(cls, annotated_key):
-        method_pattern = r"\[(?P<name>.+)\]$"
-        match = re.search(method_pattern, annotated_key)
-        if match:
-            return cls.MERGE_METHODS[match.group("name")]
-        return None
+        Returns:
+            tuple of key and Annotations
+        """
+        match = cls._key_pattern().match(annotated_key)
+        if match is None:
+            raise ValueError(
+                "Cannot decode annotations from ({})".format(annotated_key)
+            )
+        merge_method = match.group("merge_method")
+        return match.group("key"), Annotations(
+            merge_method=cls.MERGE_METHODS[merge_method]
+            if merge_method else None,
+            condition=cls.CONDITIONS.get(annotated_key[:1]),
+            finalized=bool(match.group("open") and match.group("close")),
+        )
 
     @classmethod
-    def _parse_condition(cls, annotated_key):
-        for marker, condition in cls.CONDITIONS.items():
-            if annotated_key.startswith(marker):
-                return condition
-        return None
+    @functools.lru_cache(maxsize=None)
+    def _key_pattern(cls):
+        return re.compile(
+            r"^[{conditions}]?(?P<open>\()?(?P<key>[^)[]+)(?P<close>\))?"
+            r"(?:.*?\[(?P<merge_method>.+)\]$)?".format(
+                conditions=re.escape("".join(cls.CONDITIONS.keys()))
+            )
+        )
 
     @classmethod
     def encode(cls, annotation, key=None, value=None):
+        annotated_key = cls._to_string(annotation)
         return {
-            "key": cls._to_string(annotation).format(key),
+            "key": key if annotated_key == "{}" else annotated_key.format(key),
             "value": value
         }
 
     @classmethod
     def _to_string(cls, annotation):
+        return cls._format_string(annotation.get("condition"),
+                                  annotation.get("finalized"),
+                                  annotation.get("merge_method"))
+
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _format_string(cls, condition, finalized, merge_method):
+        """Format string for a key with the given annotation values
+
+        Memorized, because a dump encodes the same few
+        combinations of annotations over and over again.
+        """
+        condition_markers, merge_method_names = cls._reversed_names()
         annotated_key = ""
-        if annotation.get("condition"):
-            reversed_conditions = {v: k for k, v in cls.CONDITIONS.items()}
-            condition = reversed_conditions[annotation.condition]
-            annotated_key += condition
-        if annotation.get("finalized"):
+        if condition:
+            annotated_key += condition_markers[condition]
+        if finalized:
             annotated_key += "({})"
         else:
             annotated_key += "{}"
-        if annotation.get("merge_method"):
-            reversed_merge_methods \
-                = {v: k for k, v in cls.MERGE_METHODS.items()}
-            method_name = reversed_merge_methods[annotation.merge_method]
-            annotated_key += "[{}]".format(method_name)
+        if merge_method:
+            annotated_key += "[{}]".format(merge_method_names[merge_method])
         return annotated_key
 
+    @classmethod
+    @functools.lru_cache(maxsize=None)
+    def _reversed_names(cls):
+        return (
+            {v: k for k, v in cls.CONDITIONS.items()},
+            {v: k for k, v in cls.MERGE_METHODS.items()},
+        )
+
 
 class LoaderInterface:
     """Interface for a FancyDict Loader"""
@@ -173,7 +201,17 @@ class LoaderInterface:
 
 
 class DictLoader(LoaderInterface):
-    """Loads a dict as FancyDict"""
+    """Loads a dict as FancyDict
+
+    If lazy is True, sub-dicts are loaded as LazyFancyDicts,
+    which are converted and get their annotations decoded
+    on the first access or when something gets merged into them.
+    The loaded data must not be changed until then.
+    """
+    def __init__(self, output_type, lazy=False):
+        super().__init__(output_type)
+        self.lazy = lazy
+
     @classmethod
     def can_load(cls, source):
         return isinstance(source, dict)
@@ -184,6 +222,18 @@ class DictLoader(LoaderInterface):
         )
 
     def _load_without_running_annotations(self, dct, annotations_decoder=None):
+        if self.lazy:
+            return self.type.lazy(self._load_lazily,
+                                  (dct, annotations_decoder))
+        return self._load_level(dct, annotations_decoder)
+
+    def _load_lazily(self, source):
+        """Loads the first level of a LazyFancyDict"""
+        # pylint: disable=protected-access
+        loaded_dict = self._load_level(*source)
+        return loaded_dict, loaded_dict._annotations
+
+    def _load_level(self, dct, annotations_decoder):
         loaded_dict = self.type()
         for key, value in dct.items():
             if annotations_decoder:
@@ -193,12 +243,24 @@ class DictLoader(LoaderInterface):
                 value = self._load_without_running_annotations(
                     value, annotations_decoder=annotations_decoder
                 )
-            if isinstance(value, list):
-                value = [self.type(item) if isinstance(item, dict) else item
-                         for item in value]
+            elif isinstance(value, list):
+                value = self._load_list(value)
             loaded_dict[key] = value
         return loaded_dict
 
+    def _load_list(self, lst):
+        """Loads dicts in a list without annotations
+
+        Builds the FancyDicts directly instead of going through
+        self.type(item), which would dispatch through the CompositeLoader
+        and build each item twice.
+        Nested lists are copied, so the loaded data never shares
+        a list with the (possibly cached) source.
+        """
+        return [DictLoader.load(self, item) if isinstance(item, dict)
+                else copy.deepcopy(item) if isinstance(item, list)
+                else item for item in lst]
+
     @staticmethod
     def _annotate(dct, key, value, annotations_decoder):
         decoded = annotations_decoder.decode(key=key, value=value)
@@ -209,18 +271,61 @@ class DictLoader(LoaderInterface):
 
 
 class IoLoader(DictLoader):
-    """Loads a FancyDict from an IO-like object"""
+    """Loads a FancyDict from an IO-like object
+
+    YAML is parsed with the libyaml based safe loader,
+    if PyYAML was built with libyaml.
+    JSON files (*.json) and JSON content are parsed with the json module.
+
+    YAML streams can contain multiple documents (separated by ---).
+    The documents are parsed one at a time and merged in sequence,
+    only the current document is kept in memory besides the result.
+    """
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
     @classmethod
     def can_load(cls, source):
         return isinstance(source, IOBase)
 
-    @staticmethod
-    def _load_dict(source):
-        return yaml.load(source)
+    @classmethod
+    def _load_documents(cls, source):
+        """Parses the documents of a stream, str or bytes one at a time"""
+        if isinstance(source, (str, bytes)):
+            if source.lstrip()[:1] in ("{", "[", b"{", b"["):
+                try:
+                    return (json.loads(source),)
+                except ValueError:
+                    pass
+        elif str(getattr(source, "name", "")).endswith(".json"):
+            return (json.load(source),)
+        return yaml.load_all(source, Loader=cls.YAML_LOADER)
+
+    @classmethod
+    def _parse_documents(cls, source):
+        """Parses all documents of a source into a list, which can be cached"""
+        return list(cls._load_documents(source))
+
+    def _load_fancy_dicts(self, documents, annotations_decoder):
+        """Loads the non-empty documents one at a time
+
+        Annotations are not run, so the documents can be merged later.
+        """
+        for document in documents:
+            if document is not None:
+                yield self._load_without_running_annotations(
+                    document, annotations_decoder=annotations_decoder
+                )
 
     def load(self, source, annotations_decoder=None):
-        data = self._load_dict(source)
-        return super().load(data, annotations_decoder=annotations_decoder)
+        return self._merge_documents(self._load_documents(source),
+                                     annotations_decoder)
+
+    def _merge_documents(self, documents, annotations_decoder):
+        """Merges parsed documents in sequence into a new FancyDict"""
+        loaded_dict = self.type()
+        for dct in self._load_fancy_dicts(documents, annotations_decoder):
+            loaded_dict.update(dct)
+        return loaded_dict
 
 
 class FileLoader(IoLoader):
@@ -228,27 +333,101 @@ class FileLoader(IoLoader):
 
     Looks up files in given base directoies.
     Supports a special include key to include other files.
+
+    Parsed files are kept in a ParsedFileCache (process-wide by default),
+    so unchanged files are not read and parsed again.
+    Pass cache=None to always read the files.
+
+    The documents of a file are merged in sequence,
+    every document after the files it includes.
+    Without cache and executor the documents are parsed and merged
+    one at a time, otherwise all documents of a file are parsed at once
+    (to be cached or sent back by the executor).
+
+    Includes are resolved with a DirectoryIndex of the include paths,
+    which lists every directory once per loader.
+    With refresh_index (default) each load() checks the listed directories
+    for changes once, otherwise the listings are kept for the lifetime
+    of the loader.
+
+    If an executor (concurrent.futures.Executor) is given,
+    all included files are read and parsed concurrently
+    and get merged in the declared order afterwards.
+    A ThreadPoolExecutor shares the cache,
+    with a ProcessPoolExecutor the files are parsed without cache.
+
+    The include dependency graph gets recorded in dependencies,
+    which maps the path of every file loaded by this loader
+    to the paths of the files it includes.
+
+    If a snapshots dict is given (and no executor),
+    the merged content of every file gets stored in it
+    as frozen snapshot keyed by its path,
+    and files with a snapshot are not loaded and merged again.
+    load() returns a snapshot then.
+    The owner of the snapshots removes the snapshots of changed files
+    and of all files including them (see fancy_dict.watcher).
     """
     DEFAULT_INCLUDE_PATHS = ('.',)
 
     def __init__(self, output_type,
-                 include_paths=DEFAULT_INCLUDE_PATHS, include_key=None):
-        super().__init__(output_type)
-        self._include_paths = include_paths
+                 include_paths=DEFAULT_INCLUDE_PATHS, include_key=None,
+                 cache=PARSED_FILES, refresh_index=True, executor=None,
+                 snapshots=None, lazy=False):
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
+        super().__init__(output_type, lazy=lazy)
         self._include_key = include_key
+        self._cache = cache
+        self._index = DirectoryIndex(include_paths)
+        self._refresh_index = refresh_index
+        self._executor = executor
+        self._snapshots = snapshots
+        self.dependencies = {}
 
     @classmethod
     def can_load(cls, source):
         return cls._path_exists(source)
 
     def load(self, source, annotations_decoder=None):
-        dct = self._load_fancy_dict(source, annotations_decoder)
-        base_dict = self._build_base_dict_with_includes(
-            dct.pop(self._include_key, ()), annotations_decoder
-        )
-        base_dict.update(dct)
+        if self._refresh_index:
+            self._index.refresh()
+        if self._executor is not None:
+            return self._load_file_concurrently(source, annotations_decoder)
+        return self._load_file(source, annotations_decoder)
+
+    def _load_file(self, source, annotations_decoder):
+        if self._snapshots is not None and str(source) in self._snapshots:
+            return self._snapshots[str(source)]
+        documents = self._read_file(source) if self._cache is not None \
+            else self._stream_file(source)
+        base_dict, includes = self.type(), ()
+        for dct in self._load_fancy_dicts(documents, annotations_decoder):
+            for full_path in self._pop_includes(dct):
+                includes += (full_path,)
+                self._merge(base_dict,
+                            self._load_file(full_path, annotations_decoder),
+                            full_path)
+            self._merge(base_dict, dct, source)
+        self._record_dependencies(source, includes)
+        if self._snapshots is not None:
+            base_dict = base_dict.freeze()
+            self._snapshots[str(source)] = base_dict
         return base_dict
 
+    def _pop_includes(self, dct):
+        """Pops the includes of a document
+
+        Returns:
+            full paths of the included files
+        """
+        return tuple(self._index.find(include)
+                     for include in dct.pop(self._include_key, ()))
+
+    def _record_dependencies(self, source, includes):
+        """Records the full paths of the files included by a file"""
+        self.dependencies[str(source)] = tuple(str(full_path)
+                                               for full_path in includes)
+
     @staticmethod
     def _path_exists(path):
         """Hanldes OSError on Windows if URL is given as path"""
@@ -257,40 +436,148 @@ class FileLoader(IoLoader):
         except OSError:
             return False
 
-    @staticmethod
-    def _find_filepath(filename, include_paths):
-        for base_dir in include_paths:
-            full_path = Path(Path(base_dir) / Path(filename))
-            if FileLoader._path_exists(full_path):
-                return full_path
-        raise FileNotFoundError(filename)
-
-    def _load_fancy_dict(self, full_path, annotations_decoder):
+    def _read_file(self, full_path):
+        start = instrumentation.ENABLED and time.perf_counter()
+        if self._cache is None:
+            data = self._parse_file(full_path)
+        else:
+            data = self._cache.get(full_path, self._parse_documents)
+        if start:
+            instrumentation.record("read", str(full_path), start)
+        return data
+
+    def _stream_file(self, full_path):
+        """Parses the documents of a file one at a time (without cache)"""
         with open(full_path, "r") as data_file:
-            return super()._load_without_running_annotations(
-                super()._load_dict(data_file),
-                annotations_decoder=annotations_decoder
-            )
+            documents = iter(self._load_documents(data_file))
+            while True:
+                start = instrumentation.ENABLED and time.perf_counter()
+                try:
+                    document = next(documents)
+                except StopIteration:
+                    return
+                if start:
+                    instrumentation.record("read", str(full_path), start)
+                yield document
+
+    @classmethod
+    def _parse_file(cls, full_path):
+        with open(full_path, "r") as data_file:
+            return cls._parse_documents(data_file)
 
-    def _build_base_dict_with_includes(self, includes, annotations_decoder):
+    @staticmethod
+    def _merge(base_dict, dct, source):
+        """Merges the data of a source into its base"""
+        start = instrumentation.ENABLED and time.perf_counter()
+        base_dict.update(dct)
+        if start:
+            instrumentation.record("merge", str(source), start)
+
+    def _load_file_concurrently(self, source, annotations_decoder):
+        root = _IncludedFile(source, self._submit_read(source))
+        pending = deque([root])
+        while pending:
+            included_file = pending.popleft()
+            for dct in self._load_fancy_dicts(included_file.data.result(),
+                                              annotations_decoder):
+                includes = []
+                for full_path in self._pop_includes(dct):
+                    if Path(full_path).resolve() in included_file.ancestors():
+                        raise RecursionError(
+                            "{} includes itself".format(full_path)
+                        )
+                    includes.append(_IncludedFile(
+                        full_path, self._submit_read(full_path),
+                        parent=included_file
+                    ))
+                included_file.documents.append((includes, dct))
+                pending.extend(includes)
+            self._record_dependencies(included_file.path, (
+                include.path for includes, _ in included_file.documents
+                for include in includes
+            ))
+        return self._merge_included_files(root)
+
+    def _submit_read(self, full_path):
+        if isinstance(self._executor, ProcessPoolExecutor):
+            return self._executor.submit(type(self)._parse_file, full_path)
+        return self._executor.submit(self._read_file, full_path)
+
+    def _merge_included_files(self, included_file):
         base_dict = self.type()
-        for include in includes:
-            full_path = self._find_filepath(include, self._include_paths)
-            base_dict.update(
-                self.load(full_path, annotations_decoder=annotations_decoder)
-            )
+        for includes, dct in included_file.documents:
+            for include in includes:
+                self._merge(base_dict, self._merge_included_files(include),
+                            include.path)
+            self._merge(base_dict, dct, included_file.path)
         return base_dict
 
 
+class _IncludedFile:
+    """File in the include tree of a concurrent FileLoader"""
+    def __init__(self, path, data, parent=None):
+        self.path = path
+        self.data = data
+        self.parent = parent
+        self.documents = []
+
+    def ancestors(self):
+        """Resolved paths of this file and all files including it"""
+        included_file = self
+        while included_file is not None:
+            yield Path(included_file.path).resolve()
+            included_file = included_file.parent
+
+
 class HttpLoader(IoLoader):
-    """Loads YAML/JSON files from an URL"""
+    """Loads YAML/JSON files from an URL
+
+    Requests are sent by a HttpClient (process-wide by default),
+    which reuses connections and does not download and parse
+    unchanged documents again.
+    Multiple YAML documents in a response are merged in sequence,
+    they are parsed at once to be cached.
+    """
+    def __init__(self, output_type, http_client=HTTP_CLIENT, lazy=False):
+        super().__init__(output_type, lazy=lazy)
+        self._http_client = http_client
+
     @classmethod
     def can_load(cls, source):
         return urllib.parse.urlparse(source).scheme in ["http", "https"]
 
     def load(self, source, annotations_decoder=None):
-        content = urllib.request.urlopen(source).read()
-        return super().load(content, annotations_decoder=annotations_decoder)
+        documents = self._http_client.get(source, self._parse_documents)
+        return self._merge_documents(documents, annotations_decoder)
+
+
+class BinaryLoader(LoaderInterface):
+    """Loads a FancyDict from a binary file (*.fdb)
+
+    The file is mapped into memory and all dicts get decoded.
+    If lazy is True, the dicts get decoded on their first access
+    instead, see fancy_dict.binary.
+    Binary files are written by fancy_dict.binary.compile_binary().
+
+    Annotations get decoded with the decoder matching
+    the encoder used to write the file.
+    """
+    SUFFIX = ".fdb"
+
+    def __init__(self, output_type, lazy=False, **_loader_args):
+        super().__init__(output_type)
+        self.lazy = lazy
+
+    @classmethod
+    def can_load(cls, source):
+        return isinstance(source, (str, Path)) \
+            and str(source).endswith(cls.SUFFIX) \
+            and FileLoader.can_load(source)
+
+    def load(self, source, annotations_decoder=None):
+        return MappedFile(source, self.type,
+                          annotations_decoder=annotations_decoder,
+                          lazy=self.lazy).root()
 
 
 class CompositeLoader(LoaderInterface):
@@ -298,11 +585,12 @@ class CompositeLoader(LoaderInterface):
 
     Selects the right Loader for the source.
 
-    Can load from dicts and yaml/json files.
+    Can load from dicts, yaml/json files and binary files.
     """
     LOADER = [
         DictLoader,
         IoLoader,
+        BinaryLoader,
         FileLoader,
         HttpLoader,
     ]
@@ -316,12 +604,28 @@ class CompositeLoader(LoaderInterface):
         return cls._select_loader_type(source) is not None
 
     def load(self, source, annotations_decoder=None):
+        start = instrumentation.ENABLED and time.perf_counter()
+        loaded = self._dispatch(source).load(source, annotations_decoder)
+        if start:
+            instrumentation.record("load", self._source_name(source), start)
+        return loaded
+
+    def _dispatch(self, source):
+        """Creates the Loader for a source"""
+        start = instrumentation.ENABLED and time.perf_counter()
         loader_type = self._select_loader_type(source)
         if loader_type is None:
             raise NoLoaderForSourceAvailable(source)
-        return loader_type(self.type, **self.loader_args).load(
-            source, annotations_decoder
-        )
+        if start:
+            instrumentation.record("dispatch", loader_type.__name__, start)
+        return loader_type(self.type, **self.loader_args)
+
+    @staticmethod
+    def _source_name(source):
+        """Name of a source in the instrumentation"""
+        if isinstance(source, (str, Path)):
+            return str(source)
+        return str(getattr(source, "name", type(source).__name__))
 
     @classmethod
     def _select_loader_type(cls, source):
@@ -9,12 +9,29 @@ class MergeMethod:
 
     Method applies when the old value is an instance of from_types
     and the new value is an instance of to_types.
+    FancyDict caches the result of applies() per pair of value types,
+    so subclasses must not decide based on the values themselves.
     """
     def __init__(self, method, from_types=None, to_types=None):
         self._method = method
         self._from_types = from_types
         self._to_types = to_types
 
+    @property
+    def method(self):
+        """The wrapped merging method"""
+        return self._method
+
+    @property
+    def from_types(self):
+        """Types of old values the method applies to, None for all types"""
+        return self._from_types
+
+    @property
+    def to_types(self):
+        """Types of new values the method applies to, None for all types"""
+        return self._to_types
+
     def __call__(self, old_value, new_value):
         """Merges an old with an new value.
 
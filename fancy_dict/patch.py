@@ -0,0 +1,119 @@
+"""Patches with the differences between two dicts
+
+A Patch lists the paths (tuples of keys) which were
+removed, added or changed from an old to a new dict.
+Only dicts are compared key by key,
+all other values (like lists) are changed as a whole.
+
+diff() skips sub-dicts which are identical
+or which are hashable with the same hash and equal (like FrozenFancyDicts),
+so diffing two snapshots sharing most of their sub-dicts
+only walks the changed paths.
+"""
+from fancy_dict.query import SEQUENCE_TYPES
+
+
+class Patch:
+    """Differences between an old and a new dict
+
+    The values in a Patch are the values of the new dict, not copies.
+
+    Args:
+        removed: paths of removed keys
+        added: tuples of path and value of added keys
+        changed: tuples of path and new value of changed keys
+    """
+    def __init__(self, removed=(), added=(), changed=()):
+        self.removed = [tuple(path) for path in removed]
+        self.added = [(tuple(path), value) for path, value in added]
+        self.changed = [(tuple(path), value) for path, value in changed]
+
+    def to_dict(self):
+        """Converts the Patch into a dict which can be dumped
+
+        Returns:
+            dict with lists of removed, added and changed paths
+        """
+        return {
+            "removed": [list(path) for path in self.removed],
+            "added": [[list(path), value] for path, value in self.added],
+            "changed": [[list(path), value] for path, value in self.changed],
+        }
+
+    @classmethod
+    def from_dict(cls, dct):
+        """Creates a Patch from a dict created by to_dict()
+
+        Args:
+            dct: dict with lists of removed, added and changed paths
+        Returns:
+            Patch
+        """
+        return cls(removed=dct.get("removed", ()),
+                   added=dct.get("added", ()),
+                   changed=dct.get("changed", ()))
+
+    def __len__(self):
+        return len(self.removed) + len(self.added) + len(self.changed)
+
+    def __eq__(self, other):
+        if not isinstance(other, Patch):
+            return NotImplemented
+        return (self.removed, self.added, self.changed) \
+            == (other.removed, other.added, other.changed)
+
+    def __repr__(self):
+        return "{}(removed={}, added={}, changed={})".format(
+            type(self).__name__, self.removed, self.added, self.changed
+        )
+
+
+def diff(old, new):
+    """Compares two dicts
+
+    Args:
+        old: dict before the changes
+        new: dict after the changes
+    Returns:
+        Patch which changes old into new
+    """
+    patch = Patch()
+    _diff((), old, new, patch)
+    return patch
+
+
+def _diff(path, old, new, patch):
+    for key in old:
+        if key not in new:
+            patch.removed.append(path + (key,))
+    for key, new_value in new.items():
+        if key not in old:
+            patch.added.append((path + (key,), new_value))
+            continue
+        old_value = old[key]
+        if old_value is new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            if not _same_hashed_dicts(old_value, new_value):
+                _diff(path + (key,), old_value, new_value, patch)
+        elif _changed(old_value, new_value):
+            patch.changed.append((path + (key,), new_value))
+
+
+def _changed(old, new):
+    """Checks if a value changed, including changes of the scalar type"""
+    if old != new:
+        return True
+    if isinstance(old, SEQUENCE_TYPES) and isinstance(new, SEQUENCE_TYPES):
+        return False
+    return type(old) is not type(new)
+
+
+def _same_hashed_dicts(old, new):
+    """Checks if two hashable dicts (like snapshots) are equal
+
+    Different hashes prove a difference without comparing the items.
+    """
+    if type(old).__hash__ is None or type(new).__hash__ is None:
+        return False
+    return hash(old) == hash(new) and old == new
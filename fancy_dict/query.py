@@ -0,0 +1,231 @@
+"""Compiled queries to retrieve values deep inside FancyDicts
+
+A query is a path of keys separated by dots:
+* "a.b.c" looks up key c in b in a
+* "*" matches all values of a dict or all items of a list
+* ".." descends recursively, "a..c" matches key c at any depth below a
+  and "..c" matches key c anywhere
+  (a value is matched once per matching ancestor,
+  so nested recursive descents can match a value more than once)
+* a number indexes a list, "a.0.b" looks up key b in the first item of a
+
+Tuples (like the FrozenLists of frozen FancyDicts) are queried like lists.
+
+Query strings get parsed once by compile_query()
+and the compiled Query can be run on any number of dicts.
+"""
+import functools
+import re
+
+from fancy_dict.errors import InvalidQuery
+
+SEQUENCE_TYPES = (list, tuple)
+_TOKEN = re.compile(r"(?P<separator>\.\.|\.|^)(?P<segment>[^.]+)")
+
+
+class Query:
+    """Compiled query
+
+    Queries without wildcards and recursive descent
+    are run as a plain chain of lookups.
+
+    Args:
+        query: query string
+    Raises:
+        InvalidQuery if the query string cannot be parsed
+    """
+    def __init__(self, query):
+        self.query = query
+        self._steps = tuple(self._parse(query))
+        self._keys = None
+        if all(isinstance(step, _Key) for step in self._steps):
+            self._keys = tuple((step.key, step.position)
+                               for step in self._steps)
+
+    @staticmethod
+    def _parse(query):
+        position = 0
+        for match in _TOKEN.finditer(query):
+            separator, segment = match.group("separator", "segment")
+            if match.start() != position \
+                    or (not position and separator == "."):
+                break
+            position = match.end()
+            if separator == "..":
+                yield _Descendants(None if segment == "*" else segment)
+            elif segment == "*":
+                yield _Wildcard()
+            else:
+                yield _Key(segment)
+        if not query or position != len(query):
+            raise InvalidQuery(query)
+
+    def find(self, data, index=None):
+        """Finds all values matching the query
+
+        Args:
+            data: dict to query
+            index: KeyIndex of data, used for recursive descent
+        Returns:
+            list of matching values in document order
+        """
+        if self._keys is not None:
+            return self._lookup(data)
+        nodes = [data]
+        for step in self._steps:
+            nodes = step(nodes, index)
+        return nodes
+
+    def _lookup(self, data):
+        value = data
+        for key, position in self._keys:
+            if isinstance(value, dict):
+                if key not in value:
+                    return []
+                value = value[key]
+            elif isinstance(value, SEQUENCE_TYPES) and position is not None:
+                try:
+                    value = value[position]
+                except IndexError:
+                    return []
+            else:
+                return []
+        return [value]
+
+    def __repr__(self):
+        return "Query({!r})".format(self.query)
+
+
+@functools.lru_cache(maxsize=2**10)
+def compile_query(query):
+    """Compiles a query string
+
+    Compiled queries are memorized.
+
+    Args:
+        query: query string
+    Returns:
+        compiled Query
+    """
+    return Query(query)
+
+
+class KeyIndex:
+    """Index of the keys in a dict tree
+
+    Recursive descent (..key) looks up the values of a key
+    in the index instead of walking the tree.
+    The index of a sub-tree gets built on the first recursive descent
+    starting at it and is kept afterwards.
+
+    The index is not updated when the data changes,
+    build a new index after changes or index a frozen snapshot.
+
+    Args:
+        data: dict to index
+    """
+    def __init__(self, data):
+        self._data = data
+        self._indices = {}
+
+    def find(self, key=None, node=None):
+        """Finds all values of a key below a node
+
+        Args:
+            key: key to find, None finds the values of all keys
+            node: dict or list in the indexed tree, default is the root
+        Returns:
+            list of values in document order
+        """
+        node = self._data if node is None else node
+        entry = self._indices.get(id(node))
+        if entry is None or entry[0] is not node:
+            entry = (node, _index(node))
+            self._indices[id(node)] = entry
+        return list(entry[1].get(_ALL if key is None else key, ()))
+
+
+_ALL = object()
+_LIST_ITEM = object()
+
+
+def _index(node):
+    index = {_ALL: []}
+    for key, value in _walk(node):
+        index.setdefault(key, []).append(value)
+        index[_ALL].append(value)
+    return index
+
+
+def _walk(node):
+    """Yields all key/value-pairs of dicts below a node in document order
+
+    Dicts in lists are walked as well.
+    """
+    stack = [iter(_items(node))]
+    while stack:
+        for key, value in stack[-1]:
+            if key is not _LIST_ITEM:
+                yield key, value
+            if isinstance(value, (dict,) + SEQUENCE_TYPES):
+                stack.append(iter(_items(value)))
+                break
+        else:
+            stack.pop()
+
+
+def _items(node):
+    if isinstance(node, dict):
+        return node.items()
+    if isinstance(node, SEQUENCE_TYPES):
+        return ((_LIST_ITEM, item) for item in node)
+    return ()
+
+
+class _Key:
+    """Looks up a key in dicts or an index in lists"""
+    def __init__(self, key):
+        self.key = key
+        self.position = int(key) if re.match(r"^-?\d+$", key) else None
+
+    def __call__(self, nodes, index):
+        values = []
+        for node in nodes:
+            if isinstance(node, dict):
+                if self.key in node:
+                    values.append(node[self.key])
+            elif isinstance(node, SEQUENCE_TYPES) \
+                    and self.position is not None:
+                if -len(node) <= self.position < len(node):
+                    values.append(node[self.position])
+        return values
+
+
+class _Wildcard:
+    """Matches all values of dicts and all items of lists"""
+    def __call__(self, nodes, index):
+        values = []
+        for node in nodes:
+            if isinstance(node, dict):
+                values.extend(node.values())
+            elif isinstance(node, SEQUENCE_TYPES):
+                values.extend(node)
+        return values
+
+
+class _Descendants:
+    """Matches a key (or all keys) at any depth"""
+    def __init__(self, key):
+        self.key = key
+
+    def __call__(self, nodes, index):
+        if index is not None and len(nodes) == 1:
+            return index.find(self.key, nodes[0])
+        values = []
+        for node in nodes:
+            if index is not None:
+                values.extend(index.find(self.key, node))
+            else:
+                values.extend(value for key, value in _walk(node)
+                              if self.key is None or key == self.key)
+        return values
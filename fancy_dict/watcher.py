@@ -0,0 +1,211 @@
+"""Watches the files of loaded FancyDicts for changes
+
+The Watcher loads FancyDicts from files (with includes)
+and keeps them up to date when a file in their include tree changes.
+
+The files get polled by their modification time, size and inode,
+the standard library offers no file system notifications.
+On a change only the FancyDicts which depend on the changed file
+get loaded again. Snapshots of the merged content of every file
+are kept, so only the changed file and the files including it
+get parsed and merged again.
+The differences to the previous snapshot are applied
+as Patch to the FancyDict returned by load()
+and passed to the subscribed callbacks.
+"""
+import os
+import threading
+
+from fancy_dict.fancy_dict import FancyDict
+from fancy_dict.loader import FileLoader
+
+
+class Watcher:
+    """Loads FancyDicts from files and updates them on changes
+
+    poll() checks all files once,
+    start() polls every interval seconds in a background thread.
+
+    The watched FancyDicts are changed with FancyDict.apply_patch(),
+    so their finalized keys and conditions apply to the changes.
+
+    Args:
+        output_type: FancyDict type to load
+        annotations_decoder: Decoder used for annotations
+        interval: seconds between two polls of the background thread
+        **loader_kwargs: Arguments for the FileLoader
+    """
+    # pylint: disable=too-many-instance-attributes
+    INTERVAL = 1.0
+
+    def __init__(self, output_type=FancyDict, annotations_decoder=None,
+                 interval=INTERVAL, **loader_kwargs):
+        self._snapshots = {}
+        self._loader = FileLoader(output_type, snapshots=self._snapshots,
+                                  **loader_kwargs)
+        self._annotations_decoder = annotations_decoder
+        self._interval = interval
+        self._watched = []
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def load(self, source):
+        """Loads a FancyDict from a file and watches its include tree
+
+        Args:
+            source: path of the file
+        Returns:
+            FancyDict which gets updated on changes
+        """
+        with self._lock:
+            snapshot = self._loader.load(
+                source, annotations_decoder=self._annotations_decoder
+            )
+            watched = _WatchedFile(str(source), snapshot.thaw(), snapshot)
+            watched.signatures = {path: _signature(path)
+                                  for path in self._files(watched.source)}
+            self._watched.append(watched)
+        return watched.fancy_dict
+
+    def subscribe(self, callback):
+        """Calls a callback for every change of a watched FancyDict
+
+        Args:
+            callback: called with the changed FancyDict and the applied Patch
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stops calling a subscribed callback"""
+        self._subscribers.remove(callback)
+
+    def poll(self, on_error=None):
+        """Checks all watched files once and updates changed FancyDicts
+
+        A FancyDict which fails to load keeps its content
+        and gets loaded again by the next poll,
+        the other FancyDicts are updated anyway.
+
+        Args:
+            on_error: called with every exception raised while loading,
+                by default the first one is raised after all other
+                FancyDicts were updated
+        Returns:
+            list of tuples of changed FancyDict and applied Patch
+        """
+        with self._lock:
+            current = {path: _signature(path) for watched in self._watched
+                       for path in watched.signatures}
+            invalidated = set()
+            changes, errors = [], []
+            for watched in self._watched:
+                changed = {path for path, signature
+                           in watched.signatures.items()
+                           if current[path] != signature}
+                if not changed:
+                    continue
+                self._invalidate(changed - invalidated)
+                invalidated.update(changed)
+                try:
+                    snapshot = self._loader.load(
+                        watched.source,
+                        annotations_decoder=self._annotations_decoder
+                    )
+                except Exception as error:  # pylint: disable=broad-except
+                    errors.append(error)
+                    continue
+                files = self._files(watched.source)
+                for path in files.difference(current):
+                    current[path] = _signature(path)
+                watched.signatures = {path: current[path] for path in files}
+                patch = watched.snapshot.diff(snapshot)
+                watched.snapshot = snapshot
+                if patch:
+                    watched.fancy_dict.apply_patch(patch)
+                    changes.append((watched.fancy_dict, patch))
+        for fancy_dict, patch in changes:
+            for callback in list(self._subscribers):
+                callback(fancy_dict, patch)
+        if errors and on_error is None:
+            raise errors[0]
+        for error in errors:
+            on_error(error)
+        return changes
+
+    def start(self, on_error=None):
+        """Polls in a background thread until stop() gets called
+
+        Args:
+            on_error: called with exceptions raised while polling,
+                by default they are ignored and polling continues
+        """
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(on_error,),
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the background thread"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, on_error):
+        while not self._stopped.wait(self._interval):
+            try:
+                self.poll(on_error=on_error)
+            except Exception as error:  # pylint: disable=broad-except
+                if on_error is not None:
+                    on_error(error)
+
+    def _files(self, source):
+        """Paths of a file and all files it includes"""
+        files = set()
+        pending = [source]
+        while pending:
+            path = pending.pop()
+            if path not in files:
+                files.add(path)
+                pending.extend(self._loader.dependencies.get(path, ()))
+        return files
+
+    def _invalidate(self, changed):
+        """Removes the snapshots of changed files and files including them"""
+        including = {}
+        for path, includes in self._loader.dependencies.items():
+            for include in includes:
+                including.setdefault(include, []).append(path)
+        invalidated = set()
+        pending = list(changed)
+        while pending:
+            path = pending.pop()
+            if path not in invalidated:
+                invalidated.add(path)
+                self._snapshots.pop(path, None)
+                pending.extend(including.get(path, ()))
+
+
+class _WatchedFile:
+    """Watched FancyDict with the snapshot of its last load
+
+    signatures are the signatures of its files at the last load.
+    """
+    def __init__(self, source, fancy_dict, snapshot):
+        self.source = source
+        self.fancy_dict = fancy_dict
+        self.snapshot = snapshot
+        self.signatures = {}
+
+
+def _signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import pytest
 
 from fancy_dict.merger import add, overwrite
@@ -20,29 +23,26 @@ class TestAnnotations:
         annotations = Annotations(condition=None)
         assert always == annotations.condition
 
-    def test_update_merge_method(self):
+    def test_merge_merge_method(self):
         annotations = Annotations(
             merge_method=add, finalized=True, condition=if_existing
-        )
-        annotations.update(Annotations(merge_method=overwrite))
+        ).merge(Annotations(merge_method=overwrite))
         assert overwrite == annotations.merge_method
         assert annotations.finalized
         assert if_existing == annotations.condition
 
-    def test_update_finalized(self):
+    def test_merge_finalized(self):
         annotations = Annotations(
             merge_method=add, finalized=False, condition=if_existing
-        )
-        annotations.update(Annotations(finalized=True))
+        ).merge(Annotations(finalized=True))
         assert add == annotations.merge_method
         assert annotations.finalized
         assert if_existing == annotations.condition
 
-    def test_update_condition(self):
+    def test_merge_condition(self):
         annotations = Annotations(
             merge_method=add, finalized=False, condition=if_existing
-        )
-        annotations.update(Annotations(condition=always))
+        ).merge(Annotations(condition=always))
         assert add == annotations.merge_method
         assert not annotations.finalized
         assert always == annotations.condition
@@ -50,3 +50,37 @@ class TestAnnotations:
     def test_attribute_error_if_not_in_defaults(self):
         with pytest.raises(AttributeError):
             assert not Annotations().no_attribute
+
+    def test_merge_keeps_original(self):
+        annotations = Annotations(merge_method=add)
+        annotations.merge(Annotations(finalized=True))
+        assert not annotations.finalized
+
+    def test_interned(self):
+        assert Annotations(merge_method=add, finalized=True) \
+            is Annotations(finalized=True, merge_method=add)
+        assert Annotations() is Annotations(condition=None)
+        assert Annotations(finalized=False) is not Annotations()
+
+    def test_unhashable_values_not_interned(self):
+        annotations = Annotations(condition=[])
+        assert [] == annotations.condition
+        assert annotations is not Annotations(condition=[])
+
+    def test_immutable(self):
+        annotations = Annotations()
+        with pytest.raises(AttributeError):
+            annotations.finalized = True
+        with pytest.raises(AttributeError):
+            del annotations.finalized
+        assert not annotations.finalized
+
+    def test_copy_and_pickle_keep_instance(self):
+        annotations = Annotations(merge_method=add)
+        assert annotations is copy.copy(annotations)
+        assert annotations is copy.deepcopy(annotations)
+        assert annotations is pickle.loads(pickle.dumps(annotations))
+
+    def test_repr(self):
+        assert "Annotations(finalized=True)" \
+            == repr(Annotations(finalized=True))
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from io import StringIO
+from unittest import mock
+
+import pytest
+
+from fancy_dict import FancyDict, LazyFancyDict
+from fancy_dict.async_loader import AsyncCompositeLoader, AsyncFileLoader, \
+    AsyncHttpLoader
+from fancy_dict.connection import HttpClient
+from fancy_dict.errors import NoLoaderForSourceAvailable
+from fancy_dict.loader import FileLoader, KeyAnnotationsConverter
+
+from test_loader import file_structure, INCLUDE_TREE
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class TestAload:
+    def test_load_dict(self):
+        assert {"a": {"b": 1}} == run(FancyDict.aload({"a": {"b": 1}}))
+
+    def test_return_fancy_dict_unchanged(self):
+        fancy_dict = FancyDict(a=1)
+        assert fancy_dict is run(FancyDict.aload(fancy_dict))
+
+    def test_load_io_object(self):
+        assert {"a": 1} == run(FancyDict.aload(StringIO("a: 1")))
+
+    def test_load_multiple_documents(self):
+        data = StringIO("a: 1\n---\nb: 2\n")
+        assert {"a": 1, "b": 2} == run(FancyDict.aload(data))
+
+    def test_load_file(self, tmpdir):
+        with file_structure({"file.yml": {"a": 1}}, tmpdir):
+            assert {"a": 1} == run(FancyDict.aload("file.yml"))
+
+    def test_load_file_with_multiple_documents(self, tmpdir):
+        tmpdir.join("file.yml").write("a: 1\n---\nb: 2\n")
+        with file_structure({}, tmpdir):
+            assert {"a": 1, "b": 2} == run(FancyDict.aload("file.yml"))
+
+    def test_load_from_http(self, httpserver):
+        httpserver.serve_content("{'a': 1}")
+        assert {"a": 1} == run(FancyDict.aload(httpserver.url))
+
+    def test_load_multiple_documents_from_http(self, httpserver):
+        httpserver.serve_content("a: 1\n---\nb: 2\n")
+        loader = AsyncHttpLoader(FancyDict, http_client=HttpClient())
+        assert {"a": 1, "b": 2} == run(loader.load(httpserver.url))
+
+    def test_raise_when_no_loader_available(self):
+        with pytest.raises(NoLoaderForSourceAvailable):
+            run(FancyDict.aload("no_file"))
+
+    def test_pass_args_to_sub_loader(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "inc.yml": {"key": "value"}
+        }
+        with file_structure(structure, tmpdir):
+            assert {"key": "value"} == run(
+                FancyDict.aload("file.yml", include_key="include")
+            )
+
+    @pytest.mark.parametrize("source", [
+        lambda: {"a": {"b": 1}}, lambda: StringIO("a: {b: 1}")
+    ])
+    def test_lazy(self, source):
+        loaded = run(FancyDict.aload(source(), lazy=True))
+        assert isinstance(loaded["a"], LazyFancyDict)
+        assert FancyDict.load(source(), lazy=True) == loaded
+
+    def test_lazy_from_file(self, tmpdir):
+        with file_structure({"file.yml": {"a": {"b": 1}}}, tmpdir):
+            loaded = run(FancyDict.aload("file.yml", lazy=True))
+        assert isinstance(loaded["a"], LazyFancyDict)
+        assert {"a": {"b": 1}} == loaded
+
+    def test_lazy_from_http(self, httpserver):
+        httpserver.serve_content("a: {b: 1}")
+        loaded = run(FancyDict.aload(httpserver.url, lazy=True))
+        assert isinstance(loaded["a"], LazyFancyDict)
+        assert {"a": {"b": 1}} == loaded
+
+    def test_output_type(self):
+        class SubDict(FancyDict):
+            pass
+
+        assert isinstance(run(SubDict.aload({"a": 1})), SubDict)
+
+
+class TestAsyncFileLoader:
+    def load(self, tmpdir, structure, executor=None):
+        with file_structure(structure, tmpdir):
+            return run(AsyncFileLoader(FancyDict, include_key="include",
+                                       executor=executor).load(
+                "file.yml", annotations_decoder=KeyAnnotationsConverter
+            ))
+
+    @pytest.mark.parametrize("executor_type", [
+        None, ThreadPoolExecutor, ProcessPoolExecutor
+    ])
+    def test_same_result_as_sync_loader(self, tmpdir, executor_type):
+        with file_structure(INCLUDE_TREE, tmpdir):
+            expected = FileLoader(FancyDict, include_key="include").load(
+                "file.yml", annotations_decoder=KeyAnnotationsConverter
+            )
+        if executor_type is None:
+            loaded = self.load(tmpdir, INCLUDE_TREE)
+        else:
+            with executor_type(max_workers=2) as executor:
+                loaded = self.load(tmpdir, INCLUDE_TREE, executor=executor)
+        assert expected == loaded
+        assert list(expected) == list(loaded)
+        assert ["c", "a", "c", "d", "b", "file"] == loaded["order"]
+
+    def test_read_includes_concurrently(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["a.yml", "b.yml"]},
+            "a.yml": {"a": 1},
+            "b.yml": {"b": 2},
+        }
+        barrier = threading.Barrier(2, timeout=5)
+        read_file = FileLoader._read_file
+
+        def read_file_together(loader, full_path):
+            if str(full_path) != "file.yml":
+                barrier.wait()
+            return read_file(loader, full_path)
+
+        with mock.patch.object(FileLoader, "_read_file", read_file_together):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                loaded = self.load(tmpdir, structure, executor=executor)
+        assert {"a": 1, "b": 2} == loaded
+
+    def test_raise_include_file_not_found(self, tmpdir):
+        with pytest.raises(FileNotFoundError):
+            self.load(tmpdir, {"file.yml": {"include": ["inc.yml"]}})
+
+    def test_raise_if_file_includes_itself(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "inc.yml": {"include": ["file.yml"]},
+        }
+        with pytest.raises(RecursionError):
+            self.load(tmpdir, structure)
+
+    def test_raise_before_reading_a_file_again(self, tmpdir):
+        structure = {"file.yml": {"include": ["./file.yml"]}}
+        read_file = FileLoader._read_file
+        with mock.patch.object(FileLoader, "_read_file", autospec=True,
+                               side_effect=read_file) as read:
+            with pytest.raises(RecursionError):
+                self.load(tmpdir, structure)
+        assert 1 == read.call_count
+
+
+class TestAsyncHttpLoader:
+    def test_load_with_http_client(self):
+        http_client = mock.Mock()
+        http_client.get.return_value = [{"a[add]": [1]}]
+        loader = AsyncHttpLoader(FancyDict, http_client=http_client)
+        loaded = run(loader.load("http://config",
+                                 annotations_decoder=KeyAnnotationsConverter))
+        assert {"a": [1]} == loaded
+        assert [1, 1] == loaded.get_annotations("a").merge_method([1], [1])
+        http_client.get.assert_called_once_with("http://config",
+                                                loader._parse_documents)
+
+    def test_load_urls_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+        http_client = mock.Mock()
+        http_client.get.side_effect = lambda url, parse: (
+            barrier.wait(), [{"url": url}]
+        )[1]
+
+        async def load_all():
+            loader = AsyncCompositeLoader(FancyDict, http_client=http_client)
+            return await asyncio.gather(loader.load("http://a"),
+                                        loader.load("http://b"))
+
+        assert [{"url": "http://a"}, {"url": "http://b"}] == run(load_all())
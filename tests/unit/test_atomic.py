@@ -0,0 +1,147 @@
+import sys
+import threading
+
+import pytest
+
+from fancy_dict import AtomicFancyDict, FancyDict, FrozenFancyDict, Patch
+
+
+@pytest.fixture()
+def atomic():
+    return AtomicFancyDict({"a": {"b": 1, "c": {"d": 1}}, "e": [1]})
+
+
+class TestAtomicFancyDict:
+    def test_snapshot(self, atomic):
+        snapshot = atomic.snapshot()
+        assert isinstance(snapshot, FrozenFancyDict)
+        assert {"a": {"b": 1, "c": {"d": 1}}, "e": [1]} == snapshot
+
+    def test_update_publishes_new_version(self, atomic):
+        old = atomic.snapshot()
+        atomic.update({"a": {"b": 2}})
+        assert {"b": 1, "c": {"d": 1}} == old["a"]
+        assert {"b": 2, "c": {"d": 1}} == atomic.snapshot()["a"]
+        assert 1 == atomic.version
+
+    def test_share_unchanged_subtrees(self, atomic):
+        old = atomic.snapshot()
+        atomic.update({"a": {"b": 2}})
+        assert old["a"]["c"] is atomic.snapshot()["a"]["c"]
+        assert old["e"] is atomic.snapshot()["e"]
+
+    def test_update_many(self, atomic):
+        atomic.update_many([{"a": {"b": 2}}, {"a": {"b": 3}}])
+        assert 3 == atomic.snapshot()["a"]["b"]
+
+    def test_update_with_snapshot(self, atomic):
+        other = AtomicFancyDict({"a": {"b": 2}, "f": 1})
+        atomic.update(other.snapshot())
+        atomic.update_many([other.snapshot()])
+        assert {"a": {"b": 2, "c": {"d": 1}}, "e": [1], "f": 1} \
+            == atomic.snapshot()
+
+    def test_apply_patch(self, atomic):
+        atomic.apply_patch(Patch(changed=[(("a", "c", "d"), 2)]))
+        assert 2 == atomic.snapshot()["a"]["c"]["d"]
+
+    def test_edit(self, atomic):
+        with atomic.edit() as next_version:
+            next_version["new"] = 1
+            assert "new" not in atomic.snapshot()
+        assert 1 == atomic.snapshot()["new"]
+
+    def test_failed_edit_not_published(self, atomic):
+        old = atomic.snapshot()
+        with pytest.raises(ValueError):
+            with atomic.edit() as next_version:
+                next_version.update({"a": {"b": 2}})
+                raise ValueError()
+        assert old is atomic.snapshot()
+        assert 0 == atomic.version
+
+    def test_keep_annotations(self):
+        fancy_dict = FancyDict(a=1)
+        fancy_dict.annotate("a", finalized=True)
+        atomic = AtomicFancyDict(fancy_dict)
+        atomic.update(a=2)
+        assert 1 == atomic.snapshot()["a"]
+
+    def test_output_type(self):
+        class CustomFancyDict(FancyDict):
+            pass
+
+        atomic = AtomicFancyDict({"a": {}}, output_type=CustomFancyDict)
+        atomic.update({"a": {"b": 1}})
+        assert isinstance(atomic.snapshot(), CustomFancyDict)
+        assert isinstance(atomic.snapshot()["a"], CustomFancyDict)
+
+
+class TestConcurrency:
+    WRITES = 300
+    READERS = 4
+
+    @pytest.fixture(autouse=True)
+    def switch_often(self):
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(interval)
+
+    @staticmethod
+    def version(value):
+        return {"a": {"x": value, "nested": {"y": value}},
+                "b": {"z": [value]}, "c": value}
+
+    @staticmethod
+    def values(snapshot):
+        return {snapshot["a"]["x"], snapshot["a"]["nested"]["y"],
+                snapshot["b"]["z"][0], snapshot["c"]}
+
+    def test_readers_see_consistent_versions(self):
+        atomic = AtomicFancyDict(self.version(0))
+        done = threading.Event()
+        errors = []
+        seen = []
+
+        def read():
+            last = 0
+            while not done.is_set():
+                values = self.values(atomic.snapshot())
+                if len(values) != 1 or min(values) < last:
+                    errors.append(values)
+                last = min(values)
+                seen.append(last)
+
+        def write():
+            for value in range(1, self.WRITES + 1):
+                atomic.update(self.version(value))
+            done.set()
+
+        threads = [threading.Thread(target=read)
+                   for _ in range(self.READERS)]
+        threads.append(threading.Thread(target=write))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        assert [] == errors
+        assert len(set(seen)) > 1
+        assert self.version(self.WRITES) == atomic.snapshot()
+        assert self.WRITES == atomic.version
+
+    def test_concurrent_writers(self):
+        atomic = AtomicFancyDict({"counter": 0})
+        writers = 4
+
+        def write():
+            for _ in range(100):
+                with atomic.edit() as next_version:
+                    next_version["counter"] += 1
+
+        threads = [threading.Thread(target=write) for _ in range(writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+        assert 400 == atomic.snapshot()["counter"]
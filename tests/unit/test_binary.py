@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import stat
+import threading
+from io import BytesIO
+
+import pytest
+
+from fancy_dict import FancyDict, LazyFancyDict
+from fancy_dict.async_loader import AsyncCompositeLoader
+from fancy_dict.binary import BinaryDumper, MappedFile, compile_binary
+from fancy_dict.loader import KeyAnnotationsConverter, BinaryLoader, \
+    CompositeLoader
+
+from test_dumper import TREE, annotation_values
+
+
+@pytest.fixture()
+def tree():
+    return FancyDict.load(TREE, annotations_decoder=KeyAnnotationsConverter)
+
+
+@pytest.fixture()
+def binary_file(tmpdir, tree):
+    path = str(tmpdir.join("tree.fdb"))
+    compile_binary(tree, path, annotations_encoder=KeyAnnotationsConverter)
+    return path
+
+
+def is_decoded(fancy_dict):
+    return not isinstance(fancy_dict, LazyFancyDict)
+
+
+class TestCompileBinary:
+    def test_same_as_dumped(self, binary_file, tree):
+        target = BytesIO()
+        BinaryDumper().dump(tree, target,
+                            annotations_encoder=KeyAnnotationsConverter)
+        with open(binary_file, "rb") as written:
+            assert written.read() == target.getvalue()
+
+    def test_strings_are_written_once(self, tmpdir):
+        path = str(tmpdir.join("strings.fdb"))
+        compile_binary(FancyDict({"key": {"key": "key"}}), path)
+        with open(path, "rb") as written:
+            assert written.read().count(b"key") == 1
+
+    def test_replaces_file(self, tmpdir):
+        path = str(tmpdir.join("replaced.fdb"))
+        compile_binary(FancyDict(a=1), path)
+        compile_binary(FancyDict(a=2), path)
+        assert MappedFile(path, FancyDict).root() == {"a": 2}
+        assert tmpdir.listdir() == [tmpdir.join("replaced.fdb")]
+
+    def test_permissions_of_new_file(self, tmpdir, monkeypatch):
+        path = str(tmpdir.join("shared.fdb"))
+        monkeypatch.setattr("fancy_dict.binary._UMASK", 0o027)
+        compile_binary(FancyDict(a=1), path)
+        assert 0o640 == stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_unsupported_value_keeps_file(self, tmpdir):
+        path = str(tmpdir.join("kept.fdb"))
+        compile_binary(FancyDict(a=1), path)
+        with pytest.raises(TypeError):
+            compile_binary(FancyDict(a={1, 2}), path)
+        assert MappedFile(path, FancyDict).root() == {"a": 1}
+        assert tmpdir.listdir() == [tmpdir.join("kept.fdb")]
+
+
+class TestMappedFile:
+    def test_round_trip(self, binary_file, tree):
+        loaded = MappedFile(binary_file, FancyDict,
+                            annotations_decoder=KeyAnnotationsConverter).root()
+        assert tree == loaded
+        assert annotation_values(tree) == annotation_values(loaded)
+
+    def test_without_decoder_annotations_are_skipped(self, binary_file,
+                                                     tree):
+        loaded = MappedFile(binary_file, FancyDict).root()
+        assert tree == loaded
+        assert annotation_values(loaded) == {
+            "nested/": {"existing/": {}, "empty/": {}}
+        }
+
+    @pytest.mark.parametrize("value", [
+        None, True, False, 0, -1, 2**63 - 1, -2**63, 2**80, -2**80,
+        1.5, float("inf"), "", "ä☃", b"\x00bytes", [], [[1], {"a": 1}],
+    ])
+    def test_values(self, tmpdir, value):
+        path = str(tmpdir.join("value.fdb"))
+        compile_binary(FancyDict(value=value), path)
+        loaded = MappedFile(path, FancyDict).root()["value"]
+        assert loaded == value
+        assert type(loaded) is type(value)
+
+    def test_scalar_keys(self, tmpdir):
+        path = str(tmpdir.join("keys.fdb"))
+        data = FancyDict({1: "int", 1.5: "float", True: "bool", None: "none"})
+        compile_binary(data, path)
+        loaded = MappedFile(path, FancyDict).root()
+        assert list(loaded.items()) == list(data.items())
+
+    def test_tuples_are_lists(self, tmpdir, tree):
+        path = str(tmpdir.join("frozen.fdb"))
+        compile_binary(tree.freeze(), path)
+        loaded = MappedFile(path, FancyDict).root()
+        assert loaded == tree
+        assert isinstance(loaded["nested"]["list"], list)
+
+    def test_not_a_binary_file(self, tmpdir):
+        path = tmpdir.join("text.fdb")
+        path.write("a: 1")
+        with pytest.raises(ValueError):
+            MappedFile(str(path), FancyDict)
+
+    def test_decodes_on_first_access(self, binary_file):
+        root = MappedFile(binary_file, FancyDict).root()
+        assert not is_decoded(root)
+        nested = root["nested"]
+        assert is_decoded(root)
+        assert type(root) is FancyDict
+        assert not is_decoded(nested)
+        assert "list" in nested
+        assert is_decoded(nested)
+        assert not is_decoded(dict.__getitem__(nested, "empty"))
+
+    @pytest.mark.parametrize("access", [
+        len, list, repr, dict, lambda d: d.get("nested"),
+        lambda d: d.get_annotations("counter"), lambda d: d.query("unicode"),
+        lambda d: d.nested, lambda d: d.freeze(), lambda d: d == {},
+    ])
+    def test_every_access_decodes(self, binary_file, access):
+        root = MappedFile(binary_file, FancyDict).root()
+        access(root)
+        assert is_decoded(root)
+
+    def test_decoded_type(self, binary_file):
+        class CustomFancyDict(FancyDict):
+            def custom(self):
+                return len(self)
+
+        root = MappedFile(binary_file, CustomFancyDict).root()
+        assert root.custom() == 5
+        assert type(root) is CustomFancyDict
+        empty = root["nested"]["empty"]
+        assert empty.custom() == 0
+        assert type(empty) is CustomFancyDict
+
+    def test_update_mapped(self, binary_file, tree):
+        loaded = MappedFile(binary_file, FancyDict,
+                            annotations_decoder=KeyAnnotationsConverter).root()
+        update = {"counter": 2, "final": "changed", "nested": {"new": 1}}
+        tree.update(update)
+        loaded.update(update)
+        assert loaded == tree
+        assert loaded["counter"] == 3
+        assert loaded["final"] == "value"
+
+    def test_update_with_mapped(self, binary_file, tree):
+        loaded = MappedFile(binary_file, FancyDict,
+                            annotations_decoder=KeyAnnotationsConverter).root()
+        expected = FancyDict(counter=1, nested={"new": 1})
+        expected.update(tree)
+        updated = FancyDict(counter=1, nested={"new": 1})
+        updated.update(loaded)
+        assert updated == expected
+        assert updated["counter"] == 2
+
+    def test_concurrent_first_access(self, binary_file, tree):
+        root = MappedFile(binary_file, FancyDict).root()
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(dict(root)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == [tree] * 8
+
+
+class TestBinaryLoader:
+    def test_can_load(self, binary_file, tmpdir):
+        assert BinaryLoader.can_load(binary_file)
+        assert not BinaryLoader.can_load(str(tmpdir.join("missing.fdb")))
+        assert not BinaryLoader.can_load({"a.fdb": 1})
+
+    def test_dispatched_by_composite_loader(self, binary_file, tree):
+        loaded = FancyDict.load(binary_file,
+                                annotations_decoder=KeyAnnotationsConverter,
+                                include_key="include")
+        assert not isinstance(loaded, LazyFancyDict)
+        assert CompositeLoader.can_load(binary_file)
+        assert loaded == tree
+        assert annotation_values(loaded) == annotation_values(tree)
+
+    def test_dispatched_by_async_composite_loader(self, binary_file, tree):
+        loaded = asyncio.run(FancyDict.aload(
+            binary_file, annotations_decoder=KeyAnnotationsConverter,
+            include_key="include"
+        ))
+        assert not isinstance(loaded, LazyFancyDict)
+        assert AsyncCompositeLoader.can_load(binary_file)
+        assert loaded == tree
+        assert annotation_values(loaded) == annotation_values(tree)
+
+    def test_json_dumps(self, binary_file, tree):
+        loaded = FancyDict.load(binary_file)
+        assert json.loads(json.dumps(tree)) == json.loads(json.dumps(loaded))
+
+    def test_lazy(self, binary_file, tree):
+        loaded = FancyDict.load(binary_file,
+                                annotations_decoder=KeyAnnotationsConverter,
+                                lazy=True)
+        assert isinstance(loaded, LazyFancyDict)
+        assert loaded == tree
+        assert annotation_values(loaded) == annotation_values(tree)
@@ -0,0 +1,157 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from fancy_dict.cache import ParsedFileCache, DirectoryIndex
+
+
+def read(data_file):
+    return data_file.read()
+
+
+@pytest.fixture()
+def data_file(tmpdir):
+    path = tmpdir.join("file.txt")
+    path.write("content")
+    return str(path)
+
+
+class TestParsedFileCache:
+    def test_parse_on_miss(self, data_file):
+        cache = ParsedFileCache()
+        assert "content" == cache.get(data_file, read)
+        assert {"hits": 0, "misses": 1, "size": 1, "maxsize": 256} \
+            == cache.stats()
+
+    def test_skip_parsing_on_hit(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        assert "content" == cache.get(data_file, read)
+        assert {"hits": 1, "misses": 1} == {
+            "hits": cache.stats()["hits"], "misses": cache.stats()["misses"]
+        }
+
+    def test_key_is_resolved_path(self, data_file, tmpdir):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        os.symlink(data_file, str(tmpdir.join("link.txt")))
+        assert "content" == cache.get(str(tmpdir.join("link.txt")), read)
+        assert 1 == cache.stats()["hits"]
+
+    def test_parse_again_if_modified(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        with open(data_file, "w") as modified_file:
+            modified_file.write("modified content")
+        assert "modified content" == cache.get(data_file, read)
+        assert 2 == cache.stats()["misses"]
+
+    def test_parse_again_if_mtime_changed(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        os.utime(data_file, ns=(0, 0))
+        cache.get(data_file, read)
+        assert 2 == cache.stats()["misses"]
+
+    def test_drop_least_recently_used(self, tmpdir):
+        cache = ParsedFileCache(maxsize=2)
+        for name in ("a", "b", "c"):
+            tmpdir.join(name).write(name)
+        for name in ("a", "b", "a", "c"):
+            cache.get(str(tmpdir.join(name)), read)
+        assert 2 == cache.stats()["size"]
+        cache.get(str(tmpdir.join("a")), read)
+        assert 3 == cache.stats()["misses"]
+        assert "b" == cache.get(str(tmpdir.join("b")), read)
+        assert 4 == cache.stats()["misses"]
+
+    def test_key_contains_parse_method(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        assert "CONTENT" == cache.get(data_file,
+                                      lambda data: data.read().upper())
+        assert "content" == cache.get(data_file, read)
+        assert {"hits": 1, "misses": 2, "size": 2, "maxsize": 256} \
+            == cache.stats()
+
+    def test_invalidate_file(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        cache.get(data_file, lambda data: data.read().upper())
+        cache.invalidate(data_file)
+        assert 0 == cache.stats()["size"]
+        cache.get(data_file, read)
+        assert 3 == cache.stats()["misses"]
+
+    def test_invalidate_all(self, data_file):
+        cache = ParsedFileCache()
+        cache.get(data_file, read)
+        cache.invalidate()
+        assert 0 == cache.stats()["size"]
+
+    def test_raise_file_not_found(self, tmpdir):
+        with pytest.raises(FileNotFoundError):
+            ParsedFileCache().get(str(tmpdir.join("no_file")), read)
+
+
+@pytest.fixture()
+def directories(tmpdir):
+    for directory, files in {"first": ["a", "b"],
+                             "second": ["b", "c", "sub"]}.items():
+        for filename in files:
+            tmpdir.join(directory).ensure(filename)
+    tmpdir.join("second", "sub").remove()
+    tmpdir.join("second", "sub", "d").ensure()
+    return [str(tmpdir.join("first")), str(tmpdir.join("second"))]
+
+
+class TestDirectoryIndex:
+    def test_find_file(self, directories):
+        index = DirectoryIndex(directories)
+        assert Path(directories[0], "a") == index.find("a")
+        assert Path(directories[1], "c") == index.find("c")
+
+    def test_first_match_wins(self, directories):
+        index = DirectoryIndex(directories)
+        assert Path(directories[0], "b") == index.find("b")
+
+    def test_find_in_sub_directory(self, directories):
+        index = DirectoryIndex(directories)
+        assert Path(directories[1], "sub", "d") == index.find("sub/d")
+
+    def test_raise_file_not_found(self, directories):
+        with pytest.raises(FileNotFoundError):
+            DirectoryIndex(directories).find("e")
+
+    def test_ignore_missing_directories(self, directories, tmpdir):
+        index = DirectoryIndex([str(tmpdir.join("missing"))] + directories)
+        assert Path(directories[0], "a") == index.find("a")
+
+    def test_list_directory_once(self, directories):
+        index = DirectoryIndex(directories)
+        index.find("a")
+        with mock.patch("os.listdir", side_effect=AssertionError), \
+                mock.patch("os.stat", side_effect=AssertionError):
+            assert Path(directories[0], "b") == index.find("b")
+
+    def test_keep_listing_without_refresh(self, directories, tmpdir):
+        index = DirectoryIndex(directories)
+        index.find("a")
+        tmpdir.join("first", "c").ensure()
+        assert Path(directories[1], "c") == index.find("c")
+
+    def test_list_changed_directory_after_refresh(self, directories, tmpdir):
+        index = DirectoryIndex(directories)
+        index.find("a")
+        tmpdir.join("first", "c").ensure()
+        index.refresh()
+        assert Path(directories[0], "c") == index.find("c")
+
+    def test_keep_unchanged_directory_after_refresh(self, directories):
+        index = DirectoryIndex(directories)
+        index.find("a")
+        index.refresh()
+        with mock.patch("os.listdir", side_effect=AssertionError):
+            assert Path(directories[0], "b") == index.find("b")
@@ -0,0 +1,224 @@
+import threading
+import urllib.error
+import urllib.parse
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from socketserver import ThreadingMixIn
+
+import pytest
+import yaml
+
+from fancy_dict import FancyDict
+from fancy_dict.connection import HttpClient, _proxy
+from fancy_dict.loader import HttpLoader
+
+
+class DocumentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.proxy_authorizations.append(
+            self.headers.get("Proxy-Authorization")
+        )
+        path = urllib.parse.urlsplit(self.path).path
+        if path == "/redirect":
+            self.respond(302, headers={"Location": "/document"})
+        elif path == "/document":
+            etag = self.server.etag
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.respond(304)
+            else:
+                self.respond(200, self.server.body,
+                             headers={"ETag": etag} if etag else {})
+        else:
+            self.respond(404, b"not found")
+
+    def respond(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.close_connection = self.server.drop_connections
+
+    def log_message(self, *args):
+        pass
+
+
+class DocumentServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), DocumentHandler)
+        self.connections = 0
+        self.requests = []
+        self.proxy_authorizations = []
+        self.body = b"a: 1"
+        self.etag = '"v1"'
+        self.drop_connections = False
+
+    def url(self, path):
+        return "http://127.0.0.1:{}{}".format(self.server_address[1], path)
+
+
+@pytest.fixture()
+def server():
+    document_server = DocumentServer()
+    thread = threading.Thread(target=document_server.serve_forever,
+                              kwargs={"poll_interval": 0.01})
+    thread.start()
+    yield document_server
+    document_server.shutdown()
+    document_server.server_close()
+    thread.join()
+
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch):
+    for name in ("http_proxy", "https_proxy", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+        monkeypatch.delenv(name.upper(), raising=False)
+    return monkeypatch
+
+
+@pytest.fixture()
+def client():
+    http_client = HttpClient(timeout=5)
+    yield http_client
+    http_client.close()
+
+
+def parse(body):
+    return {"body": body}
+
+
+class TestHttpClient:
+    def test_get(self, server, client):
+        assert {"body": b"a: 1"} == client.get(server.url("/document"), parse)
+
+    def test_reuse_connection(self, server, client):
+        for _ in range(3):
+            client.get(server.url("/document"), parse)
+            client.invalidate()
+        assert 1 == server.connections
+        assert 1 == client.stats()["idle_connections"]
+
+    def test_reconnect_if_server_closed_connection(self, server, client):
+        server.drop_connections = True
+        client.get(server.url("/document"), parse)
+        client.invalidate()
+        assert {"body": b"a: 1"} == client.get(server.url("/document"), parse)
+        assert 2 == server.connections
+
+    def test_not_modified_from_cache(self, server, client):
+        parsed = []
+
+        def parse_once(body):
+            parsed.append(body)
+            return parse(body)
+
+        content = client.get(server.url("/document"), parse_once)
+        assert content is client.get(server.url("/document"), parse_once)
+        assert [b"a: 1"] == parsed
+        assert {"hits": 1, "misses": 1, "size": 1, "idle_connections": 1} \
+            == client.stats()
+
+    def test_cache_per_parse_method(self, server, client):
+        client.get(server.url("/document"), parse)
+        assert b"a: 1" == client.get(server.url("/document"), bytes)
+        assert {"hits": 0, "misses": 2, "size": 2} == {
+            key: value for key, value in client.stats().items()
+            if key != "idle_connections"
+        }
+
+    def test_loaders_with_different_parsers(self, server, client):
+        class StringHttpLoader(HttpLoader):
+            YAML_LOADER = yaml.BaseLoader
+
+        assert {"a": 1} == HttpLoader(FancyDict, http_client=client).load(
+            server.url("/document")
+        )
+        assert {"a": "1"} == StringHttpLoader(
+            FancyDict, http_client=client
+        ).load(server.url("/document"))
+
+    def test_invalidate_url_for_all_parse_methods(self, server, client):
+        client.get(server.url("/document"), parse)
+        client.get(server.url("/document"), bytes)
+        client.get(server.url("/redirect"), parse)
+        client.invalidate(server.url("/document"))
+        assert 1 == client.stats()["size"]
+
+    def test_modified_parsed_again(self, server, client):
+        client.get(server.url("/document"), parse)
+        server.body, server.etag = b"a: 2", '"v2"'
+        assert {"body": b"a: 2"} == client.get(server.url("/document"), parse)
+
+    def test_not_cached_without_validator(self, server, client):
+        server.etag = None
+        client.get(server.url("/document"), parse)
+        client.get(server.url("/document"), parse)
+        assert {"hits": 0, "misses": 2, "size": 0} == {
+            key: value for key, value in client.stats().items()
+            if key != "idle_connections"
+        }
+
+    def test_follow_redirect(self, server, client):
+        assert {"body": b"a: 1"} == client.get(server.url("/redirect"), parse)
+        assert ["/redirect", "/document"] == server.requests
+
+    def test_raise_http_error(self, server, client):
+        with pytest.raises(urllib.error.HTTPError) as error:
+            client.get(server.url("/missing"), parse)
+        assert 404 == error.value.code
+
+    def test_drop_least_recently_used(self, server):
+        client = HttpClient(maxsize=1)
+        client.get(server.url("/document"), parse)
+        client.get(server.url("/redirect"), parse)
+        assert 1 == client.stats()["size"]
+        client.get(server.url("/document"), parse)
+        assert 0 == client.stats()["hits"]
+        client.close()
+
+    def test_timeout(self, client):
+        client.timeout = 2
+        connection = client._connect(("http", "127.0.0.1", 1, None))
+        assert 2 == connection.timeout
+
+
+class TestProxy:
+    def test_send_to_http_proxy(self, server, client, environment):
+        environment.setenv("http_proxy", server.url(""))
+        assert {"body": b"a: 1"} == client.get(
+            "http://config.invalid/document", parse
+        )
+        assert ["http://config.invalid/document"] == server.requests
+        assert [None] == server.proxy_authorizations
+
+    def test_proxy_credentials(self, server, client, environment):
+        environment.setenv("http_proxy", server.url("").replace(
+            "http://", "http://user:p%40ss@"
+        ))
+        client.get("http://config.invalid/document", parse)
+        assert ["Basic dXNlcjpwQHNz"] == server.proxy_authorizations
+
+    def test_no_proxy(self, server, client, environment):
+        environment.setenv("http_proxy", "http://127.0.0.1:1")
+        environment.setenv("no_proxy", "127.0.0.1")
+        assert {"body": b"a: 1"} == client.get(server.url("/document"),
+                                               parse)
+
+    def test_tunnel_https(self, client, environment):
+        environment.setenv("https_proxy", "proxy.invalid:3128")
+        parsed_url = urllib.parse.urlsplit("https://config.invalid/")
+        connection = client._connect(
+            ("https", "config.invalid", None, _proxy(parsed_url))
+        )
+        assert ("proxy.invalid", 3128) == (connection.host, connection.port)
+        assert "config.invalid" == connection._tunnel_host
@@ -0,0 +1,153 @@
+import json
+from io import StringIO
+
+import pytest
+import yaml
+
+from fancy_dict import FancyDict
+from fancy_dict.conditions import if_existing
+from fancy_dict.dumper import YamlDumper, JsonDumper
+from fancy_dict.loader import KeyAnnotationsConverter
+from fancy_dict.merger import add
+
+TREE = {
+    "counter[add]": 1,
+    "(final)": "value",
+    "+default": True,
+    "nested": {
+        "?existing[overwrite]": {"a": None},
+        "list[add]": [1, 1.5, 1e16, "", "1", "true", "multi\nline",
+                      {"item": {"#always": 2}}, [False]],
+        "(empty)": {},
+        "empty_list": [],
+    },
+    "unicode": "ä☃",
+}
+
+
+def annotation_values(fancy_dict):
+    values = {}
+    for key, value in fancy_dict.items():
+        annotations = fancy_dict.get_annotations(key)
+        if annotations is not None:
+            values[key] = tuple(annotations.get(name) for name
+                                in ("merge_method", "condition", "finalized"))
+        if isinstance(value, FancyDict):
+            values[key + "/"] = annotation_values(value)
+    return values
+
+
+@pytest.fixture()
+def tree():
+    return FancyDict.load(TREE, annotations_decoder=KeyAnnotationsConverter)
+
+
+@pytest.fixture()
+def annotated_list():
+    item = FancyDict(b=[1])
+    item.annotate("b", condition=if_existing, finalized=True,
+                  merge_method=add)
+    fancy_dict = FancyDict()
+    fancy_dict["a"] = [item]
+    return fancy_dict
+
+
+class TestYamlDumper:
+    def dump(self, data, annotations_encoder=None):
+        stream = StringIO()
+        YamlDumper().dump(data, stream,
+                          annotations_encoder=annotations_encoder)
+        return stream.getvalue()
+
+    def test_same_as_safe_dump(self, tree):
+        plain = yaml.safe_load(self.dump(tree))
+        assert yaml.safe_dump(plain, sort_keys=False) == self.dump(tree)
+
+    def test_round_trip(self, tree):
+        loaded = FancyDict.load(
+            StringIO(self.dump(tree, KeyAnnotationsConverter)),
+            annotations_decoder=KeyAnnotationsConverter
+        )
+        assert tree == loaded
+        assert annotation_values(tree) == annotation_values(loaded)
+
+    def test_encode_annotations(self, tree):
+        assert TREE == yaml.safe_load(self.dump(tree, KeyAnnotationsConverter))
+
+    def test_round_trip_annotated_dict_in_list(self, annotated_list):
+        loaded = FancyDict.load(
+            StringIO(self.dump(annotated_list, KeyAnnotationsConverter)),
+            annotations_decoder=KeyAnnotationsConverter
+        )
+        assert {"a": [{"b": [1]}]} == loaded
+
+    def test_without_annotations_encoder(self, tree):
+        assert tree == yaml.safe_load(self.dump(tree))
+
+    def test_pure_python_emitter(self, tree):
+        class PureYamlDumper(YamlDumper):
+            YAML_DUMPER = yaml.SafeDumper
+
+        stream = StringIO()
+        PureYamlDumper().dump(tree, stream)
+        assert self.dump(tree) == stream.getvalue()
+
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason="needs libyaml")
+    def test_use_libyaml_if_available(self):
+        assert yaml.CSafeDumper is YamlDumper.YAML_DUMPER
+
+    def test_raise_on_unsupported_value(self):
+        with pytest.raises(yaml.YAMLError):
+            self.dump(FancyDict(a=object()))
+
+
+class TestJsonDumper:
+    def dump(self, data, annotations_encoder=None):
+        stream = StringIO()
+        JsonDumper().dump(data, stream,
+                          annotations_encoder=annotations_encoder)
+        return stream.getvalue()
+
+    def test_same_as_json_dump(self, tree):
+        assert json.dumps(tree) == self.dump(tree)
+
+    def test_round_trip(self, tree, tmpdir):
+        path = str(tmpdir.join("tree.json"))
+        with open(path, "w") as json_file:
+            tree.dump(json_file, annotations_encoder=KeyAnnotationsConverter,
+                      dumper=JsonDumper)
+        loaded = FancyDict.load(path,
+                                annotations_decoder=KeyAnnotationsConverter)
+        assert tree == loaded
+        assert annotation_values(tree) == annotation_values(loaded)
+
+    def test_round_trip_annotated_dict_in_list(self, annotated_list):
+        loaded = FancyDict.load(
+            StringIO(self.dump(annotated_list, KeyAnnotationsConverter)),
+            annotations_decoder=KeyAnnotationsConverter
+        )
+        assert {"a": [{"b": [1]}]} == loaded
+
+    def test_write_in_chunks(self, tree):
+        class SmallChunksJsonDumper(JsonDumper):
+            CHUNK_SIZE = 1
+
+        stream = StringIO()
+        SmallChunksJsonDumper().dump(tree, stream)
+        assert self.dump(tree) == stream.getvalue()
+
+    def test_keys_converted_to_strings(self):
+        data = FancyDict({1: "int", True: "bool", None: "none", 1.5: "float"})
+        assert {"1": "bool", "null": "none", "1.5": "float"} \
+            == yaml.safe_load(self.dump(data))
+
+    def test_raise_on_invalid_key(self):
+        with pytest.raises(TypeError):
+            self.dump(FancyDict({(1, 2): 1}))
+
+
+class TestFancyDictDump:
+    def test_dump_yaml_by_default(self):
+        stream = StringIO()
+        FancyDict(a=1).dump(stream)
+        assert "a: 1\n" == stream.getvalue()
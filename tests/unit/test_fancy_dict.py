@@ -1,7 +1,12 @@
+from unittest import mock
+
 import pytest
 
-from fancy_dict import FancyDict
+from fancy_dict import FancyDict, FilterView, FrozenFancyDict, FrozenList, \
+    LazyFancyDict, merger
+from fancy_dict.conditions import always, if_existing
 from fancy_dict.errors import NoMergeMethodApplies
+from fancy_dict.loader import KeyAnnotationsConverter
 from fancy_dict.merger import MergeMethod, add
 from fancy_dict.annotations import Annotations
 
@@ -138,13 +143,32 @@ class TestAnnotate:
         fancy_dict = FancyDict(key=1)
         fancy_dict.annotate("key", annotations)
         fancy_dict.annotate("key", finalized=False)
-        assert not annotations.finalized
+        assert not fancy_dict.get_annotations("key").finalized
+        assert annotations.finalized
 
     def test_dont_set_annotations_when_there_are_none(self):
         fancy_dict = FancyDict(key=1)
         fancy_dict.annotate("key", None)
         assert fancy_dict.get_annotations("key") is None
 
+    def test_no_annotations_storage_until_annotated(self):
+        fancy_dict = FancyDict({"key": {"sub": 1}})
+        fancy_dict.update({"key": {"sub": 2}, "other": 1})
+        fancy_dict.get_annotations("key")
+        fancy_dict.freeze().derive()
+        assert fancy_dict._annotations is None
+        assert fancy_dict["key"]._annotations is None
+        fancy_dict.annotate("key", finalized=True)
+        assert {"key": fancy_dict.get_annotations("key")} \
+            == fancy_dict._annotations
+
+    def test_annotations_storage_copied(self):
+        fancy_dict = FancyDict(key=1)
+        derived = fancy_dict.derive()
+        derived.annotate("key", finalized=True)
+        assert fancy_dict.get_annotations("key") is None
+        assert derived.freeze().get_annotations("key").finalized
+
 
 class TestUpdateWithDict:
     def test_updates_nested_dicts(self):
@@ -213,6 +237,468 @@ class TestUpdateWithFancyDict:
         assert 1 == fancy_dict["key"]
 
 
+class TestMergeMethodLookup:
+    def test_no_annotations_created_for_unannotated_keys(self):
+        fancy_dict = FancyDict(a=1, b={"c": 1})
+        with mock.patch("fancy_dict.fancy_dict.Annotations",
+                        side_effect=AssertionError):
+            fancy_dict.update(FancyDict(a=2, b={"d": 2}))
+        assert {"a": 2, "b": {"c": 1, "d": 2}} == fancy_dict
+
+    def test_lookup_depends_on_source_type(self):
+        adding_dict = fancy_dict_with_merge_methods(MergeMethod(add))
+        adding_dict["counter"] = 1
+        fancy_dict = FancyDict(counter=1)
+        fancy_dict.update(adding_dict)
+        fancy_dict.update(FancyDict(counter=1))
+        fancy_dict.update(adding_dict)
+        assert 2 == fancy_dict["counter"]
+
+    def test_lookup_depends_on_value_types(self):
+        fancy_dict = fancy_dict_with_merge_methods(
+            MergeMethod(add, from_types=int, to_types=int),
+            extend=True
+        )
+        fancy_dict.update(counter=1, text="a")
+        fancy_dict.update(counter=1, text="b")
+        assert {"counter": 2, "text": "b"} == fancy_dict
+
+    def test_lookup_cached_per_class(self):
+        fancy_dict_with_merge_methods(MergeMethod(add)).update(counter=1)
+        fancy_dict = FancyDict(counter=1)
+        fancy_dict.update(counter=1)
+        assert 1 == fancy_dict["counter"]
+
+
+def annotation_values(fancy_dict, key):
+    annotations = fancy_dict.get_annotations(key)
+    if annotations is None:
+        return None
+    return tuple(annotations.get(name) for name
+                 in ("merge_method", "condition", "finalized"))
+
+
+class TestUpdateMany:
+    LAYERS = (
+        {"a": {"b": 1, "c": [1]}, "d": 1, "e": {"f": 1}, "g": [1]},
+        {"a": {"b": 2, "c[add]": [2]}, "d": {"x": 1}, "e": {"f": 2}},
+        {"?h": 1, "d": 3, "e": {"new": 1}, "g[add]": [2], "(i)": 1},
+        {"a": {"c[overwrite]": [3]}, "+h": 2, "i": 2, "e": {"f": 3}},
+        {"h": 3, "j": {"k": 1}, "?k": 1, "g[add]": [3]},
+    )
+
+    @staticmethod
+    def layers():
+        return [FancyDict.load(layer,
+                               annotations_decoder=KeyAnnotationsConverter)
+                for layer in TestUpdateMany.LAYERS]
+
+    @staticmethod
+    def sequential(base, layers):
+        for layer in layers:
+            base.update(layer)
+        return base
+
+    def test_same_as_sequential_updates(self):
+        expected = self.sequential(FancyDict(), self.layers())
+        result = FancyDict()
+        result.update_many(self.layers())
+        assert expected == result
+        assert list(expected) == list(result)
+        assert list(expected["e"]) == list(result["e"])
+        for key in expected:
+            assert annotation_values(expected, key) \
+                == annotation_values(result, key)
+
+    def test_same_as_sequential_updates_into_existing(self):
+        def base():
+            base = FancyDict({"h": 0, "a": {"b": 0}, "z": 0})
+            base.annotate("h", merge_method=add)
+            base.annotate("d", finalized=True)
+            return base
+
+        expected = self.sequential(base(), self.layers())
+        result = base()
+        result.update_many(self.layers())
+        assert expected == result
+        assert list(expected) == list(result)
+
+    def test_key_inserted_by_accepted_source(self):
+        def layers():
+            first = FancyDict(b=1)
+            first.annotate("b", condition=if_existing)
+            second = FancyDict(a=1, b=2)
+            second.annotate("b", condition=always)
+            return [first, second]
+
+        expected = self.sequential(FancyDict(), layers())
+        result = FancyDict()
+        result.update_many(layers())
+        assert ["a", "b"] == list(expected) == list(result)
+
+    def test_skip_overwritten_values(self):
+        layers = [FancyDict(a={"b": 1}), FancyDict(a={"b": 2}),
+                  FancyDict(a=3), FancyDict(a={"c": 4}), FancyDict(a={"d": 5})]
+        result = FancyDict()
+        with mock.patch.object(FancyDict, "_find_merge_method",
+                               wraps=result._find_merge_method) as lookup:
+            result.update_many(layers)
+        assert {"a": {"c": 4, "d": 5}} == result
+        assert all(call[0][0] is not layers[0] and call[0][0] is not layers[1]
+                   for call in lookup.call_args_list)
+        assert layers[:2] == [{"a": {"b": 1}}, {"a": {"b": 2}}]
+
+    def test_sources_not_changed(self):
+        layers = [{"a": {"b": 1}}, {"a": {"b": 2}}, {"a": {"b": 3}}]
+        FancyDict().update_many(layers)
+        assert [{"a": {"b": 1}}, {"a": {"b": 2}}, {"a": {"b": 3}}] == layers
+
+    def test_merge_methods_need_all_values(self):
+        result = FancyDict()
+        result.update_many(
+            FancyDict.load(layer, annotations_decoder=KeyAnnotationsConverter)
+            for layer in ({"a": [1]}, {"a[add]": [2]}, {"a[add]": [3]})
+        )
+        assert [1, 2, 3] == result["a"]
+
+    def test_custom_merge_methods(self):
+        result = fancy_dict_with_merge_methods(
+            MergeMethod(add, from_types=int, to_types=int), extend=True
+        )
+        result.update(counter=1)
+        result.update_many([{"counter": 1}, {"counter": 2}])
+        assert 4 == result["counter"]
+
+    def test_raise_if_no_merge_method_applies(self):
+        fancy_dict = fancy_dict_with_merge_methods(
+            MergeMethod(merger.overwrite, to_types=int)
+        )
+        with pytest.raises(NoMergeMethodApplies):
+            fancy_dict.update_many([{"val": 1}, {"val": "a"}])
+
+    def test_derived_copy_on_write(self):
+        base = FancyDict({"a": {"b": {"c": 1}}})
+        derived = base.derive()
+        derived.update_many([{"a": {"b": {"c": 2}}}, {"a": {"b": {"d": 3}}}])
+        assert {"a": {"b": {"c": 1}}} == base
+        assert {"a": {"b": {"c": 2, "d": 3}}} == derived
+
+    def test_frozen_immutable(self):
+        with pytest.raises(TypeError):
+            FancyDict(a=1).freeze().update_many([{"a": 2}])
+
+
+class TestDerive:
+    @pytest.fixture()
+    def base(self):
+        base = FancyDict({"a": {"b": {"c": 1}, "d": {"e": 1}}, "f": [1]})
+        base["a"].annotate("d", finalized=True)
+        return base
+
+    def test_shares_all_values(self, base):
+        derived = base.derive()
+        assert base == derived
+        assert base is not derived
+        assert base["a"] is derived["a"]
+        assert base["f"] is derived["f"]
+
+    def test_copy_only_updated_path(self, base):
+        derived = base.derive()
+        derived.update({"a": {"b": {"c": 2}}})
+        assert {"c": 1} == base["a"]["b"]
+        assert {"c": 2} == derived["a"]["b"]
+        assert base["a"] is not derived["a"]
+        assert base["a"]["d"] is derived["a"]["d"]
+
+    def test_update_base_after_derive(self, base):
+        derived = base.derive()
+        base.update({"a": {"b": {"c": 2}}})
+        assert {"c": 1} == derived["a"]["b"]
+        assert {"c": 2} == base["a"]["b"]
+
+    def test_copied_dict_updated_in_place(self, base):
+        derived = base.derive()
+        derived.update({"a": {"b": {"c": 2}}})
+        copied = derived["a"]
+        derived.update({"a": {"b": {"c": 3}}})
+        assert copied is derived["a"]
+        assert 3 == copied["b"]["c"]
+
+    def test_annotations_copied(self, base):
+        derived = base.derive()
+        derived.update({"a": {"b": {"c": 2}}})
+        derived["a"].annotate("d", finalized=False)
+        derived.update({"a": {"d": 2}})
+        assert 2 == derived["a"]["d"]
+        assert base["a"].get_annotations("d").finalized
+
+    def test_overwrite_without_copy(self, base):
+        derived = base.derive()
+        derived.annotate("a", merge_method=merger.overwrite)
+        with mock.patch.object(FancyDict, "_copy",
+                               side_effect=AssertionError):
+            derived.update({"a": {"x": 1}})
+        assert {"x": 1} == derived["a"]
+        assert {"c": 1} == base["a"]["b"]
+
+    def test_derive_derived(self, base):
+        first = base.derive()
+        second = first.derive()
+        second.update({"a": {"b": {"c": 2}}})
+        first.update({"a": {"b": {"c": 3}}})
+        assert [1, 3, 2] == [base["a"]["b"]["c"], first["a"]["b"]["c"],
+                             second["a"]["b"]["c"]]
+
+    def test_values_merged_from_derived_stay_shared(self, base):
+        derived = base.derive()
+        derived.update({"a": {"b": {"c": 2}}})
+        tenant = FancyDict().derive()
+        tenant.update(derived)
+        derived.update({"a": {"b": {"c": 3}}})
+        assert 2 == tenant["a"]["b"]["c"]
+
+    def test_update_in_place_without_derive(self, base):
+        sub_dict = base["a"]
+        base.update({"a": {"b": {"c": 2}}})
+        assert sub_dict is base["a"]
+        assert 2 == sub_dict["b"]["c"]
+
+
+def lazy(dct, fancy_dict_type=FancyDict, loaded=None):
+    """Creates a LazyFancyDict of a dict with lazy sub-dicts"""
+    def load(source):
+        if loaded is not None:
+            loaded.append(source)
+        return [(key, lazy(value, fancy_dict_type, loaded)
+                 if isinstance(value, dict) else value)
+                for key, value in source.items()], None
+    return fancy_dict_type.lazy(load, dct)
+
+
+class TestLazy:
+    def test_loaded_on_first_access(self):
+        loaded = []
+        lazy_fancy_dict = lazy({"a": 1}, loaded=loaded)
+        assert isinstance(lazy_fancy_dict, LazyFancyDict)
+        assert isinstance(lazy_fancy_dict, FancyDict)
+        assert not loaded
+        assert 1 == lazy_fancy_dict["a"]
+        assert 2 == lazy_fancy_dict.get("b", 2)
+        assert [{"a": 1}] == loaded
+        assert type(lazy_fancy_dict) is FancyDict
+
+    def test_sub_dicts_stay_lazy(self):
+        loaded = []
+        lazy_fancy_dict = lazy({"a": {"b": {"c": 1}}, "d": {"e": 1}},
+                               loaded=loaded)
+        assert 1 == lazy_fancy_dict["a"]["b"]["c"]
+        assert 3 == len(loaded)
+        assert isinstance(dict.__getitem__(lazy_fancy_dict, "d"),
+                          LazyFancyDict)
+
+    @pytest.mark.parametrize("access", [
+        len, list, repr, dict, reversed, lambda d: "a" in d,
+        lambda d: d.keys(), lambda d: d.items(), lambda d: d == {},
+        lambda d: d != {}, lambda d: d.get_annotations("a"),
+        lambda d: d.query("a"), lambda d: d.filter(lambda k, v: True),
+        lambda d: d.freeze(), lambda d: d.derive(), lambda d: d.diff({}),
+        lambda d: d.update(b=1), lambda d: d.annotate("a", finalized=True),
+        lambda d: d.pop("a"), lambda d: d.a, lambda d: d.copy(),
+    ])
+    def test_every_method_loads(self, access):
+        loaded = []
+        access(lazy({"a": 1}, loaded=loaded))
+        assert [{"a": 1}] == loaded
+
+    def test_custom_type(self):
+        class CustomFancyDict(FancyDict):
+            def custom(self):
+                return len(self)
+
+        lazy_fancy_dict = lazy({"a": {"b": 1}}, CustomFancyDict)
+        assert 1 == lazy_fancy_dict.custom()
+        assert type(lazy_fancy_dict) is CustomFancyDict
+        assert type(lazy_fancy_dict["a"]).__name__ == "LazyCustomFancyDict"
+        assert isinstance(lazy_fancy_dict["a"], CustomFancyDict)
+
+    def test_loaded_annotations(self):
+        annotations = {"a": Annotations(finalized=True)}
+        lazy_fancy_dict = FancyDict.lazy(
+            lambda source: (source.items(), annotations), {"a": 1}
+        )
+        lazy_fancy_dict.update(a=2)
+        assert 1 == lazy_fancy_dict["a"]
+        assert lazy_fancy_dict.get_annotations("a").finalized
+
+    def test_equal(self):
+        data = {"a": {"b": [1, {"c": 2}]}, "d": None}
+        assert lazy(data) == data
+        assert data == lazy(data)
+        assert FancyDict(data) == lazy(data)
+        assert lazy(data) == lazy(data)
+        assert lazy(data) != lazy({"a": {"b": [1]}, "d": None})
+        assert FancyDict({"x": data}) == FancyDict({"x": lazy(data)})
+
+    def test_update_same_as_eager(self):
+        data = {"a": {"b": {"c": 1}}, "d": {"e": 1}}
+        update = {"a": {"b": {"f": 2}}, "g": 3}
+        eager = FancyDict(data)
+        eager.update(update)
+        lazy_fancy_dict = lazy(data)
+        lazy_fancy_dict.update(update)
+        assert isinstance(dict.__getitem__(lazy_fancy_dict, "d"),
+                          LazyFancyDict)
+        assert eager == lazy_fancy_dict
+
+    def test_update_with_lazy_same_as_eager(self):
+        base = {"a": {"b": {"c": 1}}, "d": [1]}
+        data = {"a": {"b": {"f": 2}, "h": {"i": 1}}, "d": [2]}
+        eager = FancyDict(base)
+        eager.update(data)
+        updated = FancyDict(base)
+        updated.update(lazy(data))
+        assert isinstance(dict.__getitem__(updated["a"], "h"), LazyFancyDict)
+        assert eager == updated
+
+    def test_filter_same_as_eager(self):
+        data = {"a": {"key": 1, "b": {"key": 2}}, "key": 3}
+        for kwargs in ({}, {"recursive": True},
+                       {"recursive": True, "flat": True}):
+            assert FancyDict(data).filter(lambda k, v: k == "key", **kwargs) \
+                == lazy(data).filter(lambda k, v: k == "key", **kwargs)
+
+    def test_shared_lazy_dict_loaded_once(self):
+        loaded = []
+        base = FancyDict(a=lazy({"b": 1}, loaded=loaded))
+        derived = base.derive()
+        derived.update({"a": {"b": 2}})
+        assert 1 == base["a"]["b"]
+        assert 2 == derived["a"]["b"]
+        assert 1 == len(loaded)
+
+
+class TestFreeze:
+    @pytest.fixture()
+    def frozen(self):
+        fancy_dict = FancyDict({"a": {"b": [1, {"c": 1}]}, "d": 1})
+        fancy_dict.annotate("d", merge_method=add)
+        return fancy_dict.freeze()
+
+    def test_equal_to_source(self, frozen):
+        assert {"a": {"b": [1, {"c": 1}]}, "d": 1} == frozen
+        assert isinstance(frozen, FrozenFancyDict)
+        assert isinstance(frozen["a"], FrozenFancyDict)
+        assert isinstance(frozen["a"]["b"], FrozenList)
+        assert isinstance(frozen["a"]["b"][1], FrozenFancyDict)
+
+    def test_hashable(self, frozen):
+        same = FancyDict({"d": 1, "a": {"b": [1, {"c": 1}]}}).freeze()
+        assert hash(same) == hash(frozen)
+        assert {frozen: "cached"}[same] == "cached"
+
+    def test_unhashable_values_raise(self):
+        with pytest.raises(TypeError):
+            FancyDict(a=bytearray()).freeze()
+
+    @pytest.mark.parametrize("mutate", [
+        lambda frozen: frozen.__setitem__("a", 1),
+        lambda frozen: frozen.__delitem__("a"),
+        lambda frozen: setattr(frozen, "x", 1),
+        lambda frozen: frozen.update({"a": 1}),
+        lambda frozen: frozen.pop("a"),
+        lambda frozen: frozen.popitem(),
+        lambda frozen: frozen.setdefault("x", 1),
+        lambda frozen: frozen.clear(),
+        lambda frozen: frozen.annotate("a", finalized=True),
+        lambda frozen: frozen["a"].update({"x": 1}),
+    ])
+    def test_immutable(self, frozen, mutate):
+        with pytest.raises(TypeError):
+            mutate(frozen)
+        assert {"a": {"b": [1, {"c": 1}]}, "d": 1} == frozen
+
+    def test_missing_attribute_not_added(self, frozen):
+        assert {"b": [1, {"c": 1}]} == frozen.a
+        with pytest.raises(AttributeError):
+            frozen.missing
+        assert "missing" not in frozen
+
+    def test_keeps_annotations(self, frozen):
+        assert add == frozen.get_annotations("d").merge_method
+
+    def test_annotations_not_shared_with_source(self):
+        fancy_dict = FancyDict(a=1)
+        fancy_dict.annotate("a", finalized=True)
+        frozen = fancy_dict.freeze()
+        fancy_dict.annotate("a", finalized=False)
+        assert frozen.get_annotations("a").finalized
+
+    def test_update_with_frozen(self, frozen):
+        fancy_dict = FancyDict(d=1)
+        fancy_dict.update(frozen)
+        assert 2 == fancy_dict["d"]
+        assert frozen["a"] is fancy_dict["a"]
+
+    def test_update_derived_with_frozen(self, frozen):
+        derived = FancyDict({"a": {"e": 1}, "d": 1}).derive()
+        derived.update(frozen)
+        assert {"a": {"e": 1, "b": [1, {"c": 1}]}, "d": 2} == derived
+        derived.update_many([frozen])
+        assert 3 == derived["d"]
+        assert {"b": [1, {"c": 1}]} == frozen["a"]
+
+    def test_thaw_on_merge(self, frozen):
+        fancy_dict = FancyDict(frozen)
+        fancy_dict.update({"a": {"b": [2], "e": 1}})
+        assert {"b": [2], "e": 1} == fancy_dict["a"]
+        assert not isinstance(fancy_dict["a"], FrozenFancyDict)
+        assert {"b": [1, {"c": 1}]} == frozen["a"]
+
+    def test_add_frozen_list(self, frozen):
+        fancy_dict = FancyDict(frozen)
+        source = FancyDict(a={"b": [2]})
+        source["a"].annotate("b", merge_method=add)
+        fancy_dict.update(source)
+        assert [1, {"c": 1}, 2] == fancy_dict["a"]["b"]
+
+    def test_thaw(self, frozen):
+        thawed = frozen.thaw()
+        thawed["a"]["b"][1]["c"] = 2
+        thawed["a"]["b"].append(3)
+        assert [1, {"c": 2}, 3] == thawed["a"]["b"]
+        assert add == thawed.get_annotations("d").merge_method
+        assert not isinstance(thawed, FrozenFancyDict)
+
+    def test_freeze_subclass(self):
+        class SubDict(FancyDict):
+            MERGE_METHODS = (MergeMethod(add),)
+
+        frozen = SubDict(counter=1).freeze()
+        assert isinstance(frozen, SubDict)
+        assert isinstance(frozen.thaw(), SubDict)
+        assert frozen.freeze() is frozen
+        fancy_dict = FancyDict(counter=1)
+        fancy_dict.update(frozen)
+        assert 2 == fancy_dict["counter"]
+
+    def test_freeze_slotted_subclass(self):
+        class SlottedDict(FancyDict):
+            __slots__ = ["extra"]
+
+        frozen = SlottedDict(a={"b": 1}).freeze()
+        assert isinstance(frozen, SlottedDict)
+        assert isinstance(frozen, FrozenFancyDict)
+        assert hash(FancyDict(a={"b": 1}).freeze()) == hash(frozen)
+        assert isinstance(frozen.thaw(), SlottedDict)
+        with pytest.raises(TypeError):
+            frozen["a"] = 1
+
+    def test_create_frozen_directly(self):
+        frozen = FrozenFancyDict({"a": {"b": 1}})
+        assert type(FancyDict().freeze()) is type(frozen)
+        assert hash(FancyDict(a={"b": 1}).freeze()) == hash(frozen)
+
+
 class TestFilter:
     def test_filter_by_key(self):
         fancy_dict = FancyDict(filter_key=1, another_key=0)
@@ -249,3 +735,59 @@ class TestFilter:
             lambda k, v: k is "filter_key",
             recursive=True, flat=True
         )
+
+    def test_filter_flat_last_match_wins(self):
+        fancy_dict = FancyDict(a=FancyDict(key=1), b=FancyDict(key=[2]))
+        assert {"key": [2]} == fancy_dict.filter(
+            lambda k, v: k == "key", recursive=True, flat=True
+        )
+
+    def test_iter_filter(self):
+        fancy_dict = FancyDict(a=FancyDict(key=1, b=FancyDict(key=2)), key=3)
+        assert [(("a",), "key", 1), (("a", "b"), "key", 2), ((), "key", 3)] \
+            == list(fancy_dict.iter_filter(lambda k, v: k == "key",
+                                           recursive=True))
+
+    def test_iter_filter_not_recursive(self):
+        fancy_dict = FancyDict(a=FancyDict(key=1), key=3)
+        assert [((), "a", {"key": 1})] == list(fancy_dict.iter_filter(
+            lambda k, v: isinstance(v, dict)
+        ))
+
+    def test_filter_view_same_as_filter(self):
+        fancy_dict = FancyDict(a=FancyDict(key=1, other=0), key=3, other=0)
+        for kwargs in ({}, {"recursive": True},
+                       {"recursive": True, "flat": True}):
+            view = fancy_dict.filter_view(lambda k, v: k == "key", **kwargs)
+            expected = fancy_dict.filter(lambda k, v: k == "key", **kwargs)
+            assert expected == view
+            assert expected == view.materialize()
+            assert isinstance(view.materialize(), FancyDict)
+            assert len(expected) == len(view)
+
+    def test_filter_view_is_lazy(self):
+        calls = []
+        fancy_dict = FancyDict(a=1, b=2)
+        view = fancy_dict.filter_view(lambda k, v: calls.append(k) or True)
+        assert not calls
+        assert 2 == view["b"]
+        assert ["b"] == calls
+
+    def test_filter_view_nested_views(self):
+        fancy_dict = FancyDict(a=FancyDict(key=1, other=0))
+        view = fancy_dict.filter_view(lambda k, v: k == "key", recursive=True)
+        assert isinstance(view["a"], FilterView)
+        assert 1 == view["a"]["key"]
+        with pytest.raises(KeyError):
+            view["a"]["other"]
+
+    def test_filter_view_reflects_changes(self):
+        fancy_dict = FancyDict(key=1)
+        view = fancy_dict.filter_view(lambda k, v: k == "key")
+        fancy_dict["key"] = 2
+        assert {"key": 2} == view
+
+    def test_filter_view_read_only(self):
+        view = FancyDict(key=1).filter_view(lambda k, v: True)
+        with pytest.raises(TypeError):
+            view["key"] = 2
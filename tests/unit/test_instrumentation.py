@@ -0,0 +1,152 @@
+import json
+import os
+
+import pytest
+
+from fancy_dict import FancyDict, instrumentation
+from fancy_dict.instrumentation import Metrics
+from fancy_dict.loader import KeyAnnotationsConverter
+from fancy_dict.merger import add, MergeMethod
+
+from test_loader import file_structure, INCLUDE_TREE
+
+
+@pytest.fixture()
+def metrics():
+    with instrumentation.enabled() as enabled_metrics:
+        yield enabled_metrics
+
+
+class RecordingHook:
+    def __init__(self):
+        self.reports = []
+
+    def add_timing(self, name, key, seconds):
+        self.reports.append((name, key))
+
+    def increment(self, name, key):
+        self.reports.append((name, key))
+
+
+class TestMetrics:
+    def test_add_timing(self):
+        metrics = Metrics()
+        metrics.add_timing("load", "a.yml", 1.0)
+        metrics.add_timing("load", "a.yml", 0.5)
+        assert {"timings": {"load": {"a.yml": {"count": 2, "seconds": 1.5}}},
+                "counters": {}} == metrics.to_dict()
+
+    def test_increment(self):
+        metrics = Metrics()
+        metrics.increment("merge_method", "add")
+        metrics.increment("merge_method", "add")
+        metrics.increment("merge_method", "update")
+        assert {"merge_method": {"add": 2, "update": 1}} \
+            == metrics.to_dict()["counters"]
+
+    def test_reset(self):
+        metrics = Metrics()
+        metrics.increment("merge_method", "add")
+        metrics.reset()
+        assert {"timings": {}, "counters": {}} == metrics.to_dict()
+
+    def test_export_is_a_copy(self):
+        metrics = Metrics()
+        metrics.increment("merge_method", "add")
+        metrics.to_dict()["counters"]["merge_method"]["add"] = 10
+        assert 1 == metrics.to_dict()["counters"]["merge_method"]["add"]
+
+
+class TestInstrumentation:
+    def test_disabled_by_default(self):
+        instrumentation.METRICS.reset()
+        FancyDict.load({"a[add]": 1},
+                       annotations_decoder=KeyAnnotationsConverter)
+        assert not instrumentation.ENABLED
+        assert {"timings": {}, "counters": {}} \
+            == instrumentation.METRICS.to_dict()
+
+    def test_enabled_restores_disabled(self):
+        with instrumentation.enabled():
+            assert instrumentation.ENABLED
+        assert not instrumentation.ENABLED
+
+    def test_merge_methods(self, metrics):
+        fancy_dict = FancyDict({"a": {"b": 1}, "c": [1]})
+        fancy_dict.annotate("c", merge_method=add)
+        source = FancyDict({"a": {"b": 2}, "c": [2]})
+        metrics.reset()
+        fancy_dict.update(source)
+        assert {"update": 1, "overwrite": 1, "add": 1} \
+            == metrics.to_dict()["counters"]["merge_method"]
+
+    def test_condition_rejected(self, metrics):
+        FancyDict.load({"?a": 1, "+b": 1},
+                       annotations_decoder=KeyAnnotationsConverter)
+        assert {"if_existing": 1} \
+            == metrics.to_dict()["counters"]["condition_rejected"]
+
+    def test_finalized_skipped(self, metrics):
+        fancy_dict = FancyDict(a=1, b=[1], c=[1])
+        fancy_dict.annotate("a", finalized=True)
+        fancy_dict.annotate("b", finalized=True, merge_method=add)
+        fancy_dict.annotate("c", finalized=True)
+        fancy_dict.update(a=2, b=[2], c=[2])
+        fancy_dict.update(a=3)
+        assert {"overwrite": 3, "add": 1} \
+            == metrics.to_dict()["counters"]["finalized_skipped"]
+
+    def test_finalized_skipped_without_applying_merge_method(self, metrics):
+        class IntFancyDict(FancyDict):
+            MERGE_METHODS = [MergeMethod(add, from_types=int, to_types=int)]
+
+        fancy_dict, from_dict = IntFancyDict(), IntFancyDict()
+        fancy_dict["a"], from_dict["a"] = "x", "y"
+        fancy_dict.annotate("a", finalized=True)
+        fancy_dict.update(from_dict)
+        assert {"a": "x"} == fancy_dict
+        assert {"none": 1} \
+            == metrics.to_dict()["counters"]["finalized_skipped"]
+
+    def test_decode(self, metrics):
+        FancyDict.load({"a": 1, "b": {"c": 1}},
+                       annotations_decoder=KeyAnnotationsConverter)
+        decode = metrics.to_dict()["timings"]["decode"]
+        assert ["KeyAnnotationsConverter"] == list(decode)
+        assert 3 == decode["KeyAnnotationsConverter"]["count"]
+
+    def test_load_files(self, metrics, tmpdir):
+        with file_structure(INCLUDE_TREE, tmpdir):
+            FancyDict.load("file.yml", include_key="include",
+                           annotations_decoder=KeyAnnotationsConverter)
+            timings = metrics.to_dict()["timings"]
+        assert {"FileLoader"} == set(timings["dispatch"])
+        assert 1 == timings["load"]["file.yml"]["count"]
+        read = {os.path.basename(path): timing["count"]
+                for path, timing in timings["read"].items()}
+        assert {"file.yml": 1, "a.yml": 1, "b.yml": 1, "c.yml": 2,
+                "d.yml": 1} == read
+        merge = {os.path.basename(path): timing["count"]
+                 for path, timing in timings["merge"].items()}
+        assert {"file.yml": 1, "a.yml": 2, "b.yml": 2, "c.yml": 4,
+                "d.yml": 2} == merge
+
+    def test_export_as_json(self, metrics, tmpdir):
+        with file_structure(INCLUDE_TREE, tmpdir):
+            FancyDict.load("file.yml", include_key="include",
+                           annotations_decoder=KeyAnnotationsConverter)
+        exported = metrics.to_dict()
+        assert exported == json.loads(json.dumps(exported))
+
+    def test_hooks(self, metrics):
+        fancy_dict, source = FancyDict(a=1), FancyDict(a=2)
+        metrics.reset()
+        hook = RecordingHook()
+        instrumentation.add_hook(hook)
+        try:
+            fancy_dict.update(source)
+        finally:
+            instrumentation.remove_hook(hook)
+        fancy_dict.update(source)
+        assert [("merge_method", "overwrite")] == hook.reports
+        assert 2 == metrics.to_dict()["counters"]["merge_method"]["overwrite"]
@@ -1,16 +1,20 @@
 import os
 import json
 from unittest import mock
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from pathlib import Path
 from contextlib import contextmanager
 from io import StringIO, IOBase
 
 import pytest
+import yaml
 
 from fancy_dict.loader import CompositeLoader, FileLoader, DictLoader, \
     KeyAnnotationsConverter, HttpLoader, IoLoader
 from fancy_dict.errors import NoLoaderForSourceAvailable
-from fancy_dict import conditions, FancyDict
+from fancy_dict.cache import ParsedFileCache
+from fancy_dict.connection import HttpClient
+from fancy_dict import conditions, FancyDict, LazyFancyDict
 
 
 @contextmanager
@@ -23,7 +27,7 @@ def chdir(new_dir):
 
 def create_file_structure(base, structure):
     for file_or_folder, content in structure.items():
-        if file_or_folder.endswith(".yml"):
+        if file_or_folder.endswith((".yml", ".json")):
             base.join(file_or_folder).write(json.dumps(content, indent=2))
         else:
             create_file_structure(base.mkdir(file_or_folder), content)
@@ -122,6 +126,163 @@ class TestFileLoader:
                                  annotations_decoder=KeyAnnotationsConverter)
             assert result == loaded
 
+    def test_include_first_match_in_include_paths(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "first": {"inc.yml": {"key": "first"}},
+            "second": {"inc.yml": {"key": "second"}}
+        }
+        with file_structure(structure, tmpdir):
+            loader = FileLoader(FancyDict, include_key="include",
+                                include_paths=("missing", "first", "second"))
+            assert {"key": "first"} == loader.load("file.yml")
+
+    def test_resolve_includes_without_stat(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml", "inc.yml"]},
+            "inc.yml": {"key": "value"}
+        }
+        with file_structure(structure, tmpdir):
+            loader = FileLoader(FancyDict, include_key="include")
+            with mock.patch("pathlib.Path.exists",
+                            side_effect=AssertionError):
+                assert {"key": "value"} == loader.load("file.yml")
+
+    def test_refresh_index_on_load(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "first": {"other.yml": {}},
+            "second": {"inc.yml": {"key": "second"}}
+        }
+        with file_structure(structure, tmpdir):
+            loader = FileLoader(FancyDict, include_key="include",
+                                include_paths=("first", "second"))
+            loader.load("file.yml")
+            tmpdir.join("first", "inc.yml").write('{"key": "first"}')
+            assert {"key": "first"} == loader.load("file.yml")
+
+    def test_keep_index_without_refresh(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "first": {"other.yml": {}},
+            "second": {"inc.yml": {"key": "second"}}
+        }
+        with file_structure(structure, tmpdir):
+            loader = FileLoader(FancyDict, include_key="include",
+                                include_paths=("first", "second"),
+                                refresh_index=False)
+            loader.load("file.yml")
+            tmpdir.join("first", "inc.yml").write('{"key": "first"}')
+            assert {"key": "second"} == loader.load("file.yml")
+
+    def test_cache_parsed_includes(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml", "inc.yml"]},
+            "inc.yml": {"key": "value"}
+        }
+        cache = ParsedFileCache()
+        with file_structure(structure, tmpdir):
+            loader = FileLoader(FancyDict, include_key="include", cache=cache)
+            assert {"key": "value"} == loader.load("file.yml")
+            assert {"key": "value"} == loader.load("file.yml")
+        assert {"hits": 4, "misses": 2} == {
+            "hits": cache.stats()["hits"], "misses": cache.stats()["misses"]
+        }
+
+    def test_reload_modified_file(self, tmpdir):
+        cache = ParsedFileCache()
+        with file_structure({"file.yml": {"a": 1}}, tmpdir):
+            FileLoader(FancyDict, cache=cache).load("file.yml")
+            tmpdir.join("file.yml").write('{"a": 22}')
+            assert {"a": 22} == FileLoader(FancyDict, cache=cache).load(
+                "file.yml"
+            )
+
+    def test_loaded_data_not_shared_with_cache(self, tmpdir):
+        cache = ParsedFileCache()
+        with file_structure({"file.yml": {"a": [[1], {"b": 1}]}}, tmpdir):
+            loaded = FileLoader(FancyDict, cache=cache).load("file.yml")
+            loaded["a"][0].append(2)
+            loaded["a"][1]["b"] = 2
+            loaded["a"].append(3)
+            assert {"a": [[1], {"b": 1}]} == FileLoader(
+                FancyDict, cache=cache
+            ).load("file.yml")
+        assert 1 == cache.stats()["hits"]
+
+    def test_cache_per_parser(self, tmpdir):
+        class BaseLoader(FileLoader):
+            YAML_LOADER = yaml.BaseLoader
+
+        cache = ParsedFileCache()
+        with file_structure({"file.yml": {"a": 1}}, tmpdir):
+            assert {"a": 1} == FileLoader(FancyDict, cache=cache).load(
+                "file.yml"
+            )
+            assert {"a": "1"} == BaseLoader(FancyDict, cache=cache).load(
+                "file.yml"
+            )
+            assert {"a": 1} == FileLoader(FancyDict, cache=cache).load(
+                "file.yml"
+            )
+
+    def test_without_cache(self, tmpdir):
+        with file_structure({"file.yml": {"a": 1}}, tmpdir):
+            assert {"a": 1} == FileLoader(FancyDict, cache=None).load(
+                "file.yml"
+            )
+
+    def test_json_file(self, tmpdir):
+        with file_structure({"file.json": {"a": 1e3}}, tmpdir):
+            assert {"a": 1000.0} == FileLoader(FancyDict).load("file.json")
+
+    @pytest.mark.parametrize("cache", [ParsedFileCache(), None])
+    def test_merge_documents_in_sequence(self, tmpdir, cache):
+        structure = {"inc.yml": {"a": 0, "c": [0]}}
+        with file_structure(structure, tmpdir):
+            Path("file.yml").write_text(
+                "include: [inc.yml]\na: 1\nb: 1\n---\nb: 2\n"
+                "c[add]: [1]\n---\n---\nc[add]: [2]\n"
+            )
+            loaded = FileLoader(FancyDict, include_key="include",
+                                cache=cache).load(
+                "file.yml", annotations_decoder=KeyAnnotationsConverter
+            )
+        assert {"a": 1, "b": 2, "c": [0, 1, 2]} == loaded
+
+    def test_merge_includes_before_their_document(self, tmpdir):
+        structure = {"inc.yml": {"a": 0, "b": 0}}
+        with file_structure(structure, tmpdir):
+            Path("file.yml").write_text(
+                "a: 1\nb: 1\n---\ninclude: [inc.yml]\nb: 2\n"
+            )
+            loaded = FileLoader(FancyDict, include_key="include").load(
+                "file.yml"
+            )
+        assert {"a": 0, "b": 2} == loaded
+
+    def test_stream_documents_without_cache(self, tmpdir):
+        class RecordingFileLoader(FileLoader):
+            @classmethod
+            def _load_documents(cls, source):
+                for document in super()._load_documents(source):
+                    calls.append("parse")
+                    yield document
+
+            @staticmethod
+            def _merge(base_dict, dct, source):
+                calls.append("merge")
+                base_dict.update(dct)
+
+        calls = []
+        with file_structure({}, tmpdir):
+            Path("file.yml").write_text("a: 1\n---\nb: 2\n")
+            loaded = RecordingFileLoader(FancyDict, cache=None).load(
+                "file.yml"
+            )
+        assert {"a": 1, "b": 2} == loaded
+        assert ["parse", "merge", "parse", "merge"] == calls
+
     def test_can_load(self, tmpdir):
         structure = {
             "base": {"file.yml": {"key": "value"}}
@@ -138,6 +299,92 @@ class TestFileLoader:
             assert not FileLoader.can_load("os_error")
 
 
+INCLUDE_TREE = {
+    "file.yml": {"include": ["a.yml", "b.yml"],
+                 "counter[add]": 1, "order": ["file"]},
+    "a.yml": {"include": ["c.yml"], "counter": 10, "order[add]": ["a"],
+              "sub": {"?a": "A", "b": "B"}},
+    "b.yml": {"include": ["c.yml", "d.yml"], "counter[add]": 100,
+              "order[add]": ["b"], "sub": {"?a": "overwritten"}},
+    "c.yml": {"order": ["c"], "sub": {"c": "C"}, "(final)": "c"},
+    "d.yml": {"final": "d", "order[add]": ["d"]},
+}
+
+
+class TestLazyFileLoader:
+    def test_same_result_as_eager(self, tmpdir):
+        with file_structure(INCLUDE_TREE, tmpdir):
+            eager, lazy = (
+                FileLoader(FancyDict, include_key="include",
+                           lazy=lazy).load(
+                    "file.yml", annotations_decoder=KeyAnnotationsConverter
+                )
+                for lazy in (False, True)
+            )
+        assert eager == lazy
+        assert list(eager) == list(lazy)
+        assert {"b": "B", "c": "C"} == lazy["sub"]
+        assert lazy.get_annotations("final").finalized
+
+
+class TestConcurrentFileLoader:
+    def load(self, tmpdir, structure, executor=None, source="file.yml"):
+        with file_structure(structure, tmpdir):
+            return FileLoader(FancyDict, include_key="include",
+                              executor=executor).load(
+                source, annotations_decoder=KeyAnnotationsConverter
+            )
+
+    @pytest.mark.parametrize("executor_type", [
+        ThreadPoolExecutor, ProcessPoolExecutor
+    ])
+    def test_same_result_as_sequential(self, tmpdir, executor_type):
+        sequential = self.load(tmpdir, INCLUDE_TREE)
+        with executor_type(max_workers=4) as executor:
+            concurrent = self.load(tmpdir, INCLUDE_TREE, executor=executor)
+        assert sequential == concurrent
+        assert list(sequential) == list(concurrent)
+        assert {"b": "B", "c": "C"} == concurrent["sub"]
+        assert ["c", "a", "c", "d", "b", "file"] == concurrent["order"]
+        assert "c" == concurrent["final"]
+
+    @pytest.mark.parametrize("executor_type", [
+        ThreadPoolExecutor, ProcessPoolExecutor
+    ])
+    def test_merge_documents_in_sequence(self, tmpdir, executor_type):
+        tmpdir.join("file.yml").write("a: 1\n---\ninclude: [inc.yml]\n"
+                                      "b[add]: [1]\n")
+        structure = {"inc.yml": {"a": 0, "b": [0]}}
+        with executor_type(max_workers=2) as executor:
+            loaded = self.load(tmpdir, structure, executor=executor)
+        assert {"a": 0, "b": [0, 1]} == loaded
+
+    def test_raise_include_file_not_found(self, tmpdir):
+        structure = {"file.yml": {"include": ["inc.yml"]}}
+        with ThreadPoolExecutor() as executor:
+            with pytest.raises(FileNotFoundError):
+                self.load(tmpdir, structure, executor=executor)
+
+    def test_raise_if_file_includes_itself(self, tmpdir):
+        structure = {
+            "file.yml": {"include": ["inc.yml"]},
+            "inc.yml": {"include": ["file.yml"]},
+        }
+        with ThreadPoolExecutor() as executor:
+            with pytest.raises(RecursionError):
+                self.load(tmpdir, structure, executor=executor)
+
+    def test_raise_before_reading_a_file_again(self, tmpdir):
+        structure = {"file.yml": {"include": ["./file.yml"]}}
+        read_file = FileLoader._read_file
+        with mock.patch.object(FileLoader, "_read_file", autospec=True,
+                               side_effect=read_file) as read:
+            with ThreadPoolExecutor() as executor:
+                with pytest.raises(RecursionError):
+                    self.load(tmpdir, structure, executor=executor)
+        assert 1 == read.call_count
+
+
 class TestDictLoader:
     def test_load(self):
         loader = DictLoader(FancyDict)
@@ -148,6 +395,19 @@ class TestDictLoader:
         assert isinstance(fancy_dict["a"][0], FancyDict)
         assert "NO_DICT" == fancy_dict["a"][1]
 
+    def test_dict_in_lists_loaded_without_composite_loader(self):
+        with mock.patch.object(CompositeLoader, "load",
+                               side_effect=AssertionError):
+            fancy_dict = DictLoader(FancyDict).load({"a": [{"b": {"c": 1}}]})
+        assert {"a": [{"b": {"c": 1}}]} == fancy_dict
+        assert isinstance(fancy_dict["a"][0]["b"], FancyDict)
+
+    def test_annotations_in_lists_not_decoded(self):
+        fancy_dict = DictLoader(FancyDict).load(
+            {"a": [{"?b": 1}]}, annotations_decoder=KeyAnnotationsConverter
+        )
+        assert {"a": [{"?b": 1}]} == fancy_dict
+
     def test_parse_annotations(self):
         loader = DictLoader(FancyDict)
         assert {"a": 1} == loader.load(
@@ -159,6 +419,73 @@ class TestDictLoader:
         assert not DictLoader.can_load("no")
 
 
+class TestLazyDictLoader:
+    DATA = {
+        "a": {"?b": 1, "c[add]": [1], "(d)": {"e": {"f": 1}}},
+        "g": [{"h": {"i": 1}}, [{"j": 1}]],
+        "+k": {"l": 1},
+    }
+
+    def load(self, lazy):
+        return DictLoader(FancyDict, lazy=lazy).load(
+            self.DATA, annotations_decoder=KeyAnnotationsConverter
+        )
+
+    def test_sub_dicts_loaded_lazily(self):
+        loaded = self.load(lazy=True)
+        assert isinstance(dict.__getitem__(loaded, "a"), LazyFancyDict)
+        assert isinstance(dict.__getitem__(loaded, "k"), LazyFancyDict)
+        with mock.patch.object(KeyAnnotationsConverter, "decode",
+                               wraps=KeyAnnotationsConverter.decode) as decode:
+            assert {"f": 1} == loaded["a"]["d"]["e"]
+        assert ["?b", "c[add]", "(d)", "e", "f"] \
+            == [call[1]["key"] for call in decode.call_args_list]
+        assert isinstance(dict.__getitem__(loaded, "k"), LazyFancyDict)
+
+    def test_same_as_eager(self):
+        eager, lazy = self.load(lazy=False), self.load(lazy=True)
+        assert eager == lazy
+        assert lazy == eager
+        assert isinstance(lazy["g"][0], FancyDict)
+        assert isinstance(lazy["g"][1][0], dict)
+
+    def test_same_annotations_as_eager(self):
+        eager, lazy = self.load(lazy=False), self.load(lazy=True)
+        for key in ("b", "c", "d"):
+            assert eager["a"].get_annotations(key) \
+                is lazy["a"].get_annotations(key)
+        assert eager.get_annotations("k") is lazy.get_annotations("k")
+
+    def test_update_same_as_eager(self):
+        update = {"a": {"b": 2, "c": [2], "d": 2, "m": 1}, "k": {"n": 1}}
+        eager, lazy = self.load(lazy=False), self.load(lazy=True)
+        eager.update(update)
+        lazy.update(update)
+        assert eager == lazy
+        assert {"b": 2, "c": [1, 2], "d": {"e": {"f": 1}}, "m": 1} \
+            == lazy["a"]
+
+    def test_update_with_lazy_same_as_eager(self):
+        base = {"a": {"b": 0, "c": [0], "x": 1}, "k": {"n": 1}}
+        eager, lazy = FancyDict(base), FancyDict(base)
+        eager.update(self.load(lazy=False))
+        lazy.update(self.load(lazy=True))
+        assert eager == lazy
+        assert {"b": 1, "c": [0, 1], "d": {"e": {"f": 1}}, "x": 1} \
+            == lazy["a"]
+
+    def test_filter_same_as_eager(self):
+        eager, lazy = self.load(lazy=False), self.load(lazy=True)
+        for kwargs in ({}, {"recursive": True},
+                       {"recursive": True, "flat": True}):
+            assert eager.filter(lambda k, v: k != "b", **kwargs) \
+                == lazy.filter(lambda k, v: k != "b", **kwargs)
+
+    def test_passed_by_composite_loader(self):
+        loaded = FancyDict.load(self.DATA, lazy=True)
+        assert isinstance(dict.__getitem__(loaded, "a"), LazyFancyDict)
+
+
 class TestHttpLoader:
     def test_load(self, httpserver):
         httpserver.serve_content("{'a': 1}")
@@ -168,6 +495,23 @@ class TestHttpLoader:
         httpserver.serve_content("{'a': 1}")
         assert HttpLoader.can_load(httpserver.url)
 
+    def test_merge_documents_in_sequence(self, httpserver):
+        httpserver.serve_content("a: 1\nb[add]: [1]\n---\nb[add]: [2]\n")
+        loaded = HttpLoader(FancyDict, http_client=HttpClient()).load(
+            httpserver.url, annotations_decoder=KeyAnnotationsConverter
+        )
+        assert {"a": 1, "b": [1, 2]} == loaded
+
+    def test_load_with_http_client(self):
+        http_client = mock.Mock()
+        http_client.get.return_value = [{"a": [1]}]
+        loader = HttpLoader(FancyDict, http_client=http_client)
+        loaded = loader.load("http://config")
+        loaded["a"].append(2)
+        assert {"a": [1]} == loader.load("http://config")
+        http_client.get.assert_called_with("http://config",
+                                           HttpLoader._parse_documents)
+
     def test_can_load_https(self):
         assert HttpLoader.can_load("https://www.google.de")
 
@@ -179,6 +523,74 @@ class TestIoLoader:
     def test_load(self):
         assert {"a": 1} == IoLoader(FancyDict).load(StringIO('{"a": 1}'))
 
+    @pytest.mark.skipif(not yaml.__with_libyaml__, reason="needs libyaml")
+    def test_use_libyaml_if_available(self):
+        assert yaml.CSafeLoader is IoLoader.YAML_LOADER
+
+    def test_pure_python_yaml_loader(self):
+        class PureIoLoader(IoLoader):
+            YAML_LOADER = yaml.SafeLoader
+
+        data = StringIO("a: 1\nb: [1, {c: 2}]")
+        assert {"a": 1, "b": [1, {"c": 2}]} == PureIoLoader(FancyDict).load(
+            data
+        )
+
+    def test_load_safe(self):
+        data = StringIO("a: !!python/object/apply:os.getcwd []")
+        with pytest.raises(yaml.YAMLError):
+            IoLoader(FancyDict).load(data)
+
+    def test_load_json_content(self):
+        assert {"a": 1000.0} == IoLoader(FancyDict).load(b' {"a": 1e3}')
+
+    def test_load_yaml_flow_content(self):
+        assert {"a": 1} == IoLoader(FancyDict).load(b"{'a': 1}")
+
+    def test_load_yaml_content(self):
+        assert {"a": 1} == IoLoader(FancyDict).load("a: 1")
+
+    @pytest.mark.parametrize("content", [
+        "a: 1\nb: 1\n---\nb: 2\n", b"a: 1\nb: 1\n---\nb: 2\n"
+    ])
+    def test_merge_documents_of_content(self, content):
+        assert {"a": 1, "b": 2} == IoLoader(FancyDict).load(content)
+
+    def test_load_json_file(self, tmpdir):
+        with file_structure({"file.json": {"a": 1e3}}, tmpdir):
+            with open("file.json") as json_file:
+                assert {"a": 1000.0} == IoLoader(FancyDict).load(json_file)
+
+    def test_merge_documents_in_sequence(self):
+        data = StringIO("a: 1\nb: 1\n---\nb: 2\nc[add]: [1]\n"
+                        "---\nc[add]: [2]\n")
+        loaded = IoLoader(FancyDict).load(
+            data, annotations_decoder=KeyAnnotationsConverter
+        )
+        assert {"a": 1, "b": 2, "c": [1, 2]} == loaded
+
+    def test_documents_parsed_one_at_a_time(self):
+        class RecordingIoLoader(IoLoader):
+            def _load_without_running_annotations(self, dct, **kwargs):
+                parsed.append(dict(dct))
+                return super()._load_without_running_annotations(dct,
+                                                                 **kwargs)
+
+        parsed = []
+        documents = RecordingIoLoader._load_documents(
+            StringIO("a: 1\n---\na: 2\n")
+        )
+        assert not isinstance(documents, (list, tuple))
+        RecordingIoLoader(FancyDict).load(StringIO("a: 1\n---\na: 2\n"))
+        assert [{"a": 1}, {"a": 2}] == parsed
+
+    def test_skip_empty_documents(self):
+        data = StringIO("---\na: 1\n---\n---\nb: 2\n")
+        assert {"a": 1, "b": 2} == IoLoader(FancyDict).load(data)
+
+    def test_load_empty_stream(self):
+        assert {} == IoLoader(FancyDict).load(StringIO(""))
+
 
 class TestCompositeLoader:
     def test_load_dict(self):
@@ -245,6 +657,41 @@ class TestKeyAnnotationsConverter:
         assert 2 == annotations.merge_method(1, 1)
         assert annotations.finalized
 
+    def test_finalized_key_with_regex_characters(self):
+        decoded = KeyAnnotationsConverter.decode(key="(a+b.c)")
+        assert "a+b.c" == decoded["key"]
+        assert decoded["annotations"].finalized
+
+    def test_not_finalized_without_closing_bracket(self):
+        decoded = KeyAnnotationsConverter.decode(key="(key")
+        assert "key" == decoded["key"]
+        assert not decoded["annotations"].finalized
+
+    def test_raise_if_key_cannot_be_decoded(self):
+        with pytest.raises(ValueError):
+            KeyAnnotationsConverter.decode(key="[add]")
+
+    def test_decoded_keys_are_memorized(self):
+        KeyAnnotationsConverter.decode(key="?(memorized)[add]")
+        hits = KeyAnnotationsConverter._parse.cache_info().hits
+        KeyAnnotationsConverter.decode(key="?(memorized)[add]")
+        assert hits + 1 == KeyAnnotationsConverter._parse.cache_info().hits
+
+    def test_annotations_are_shared(self):
+        first = KeyAnnotationsConverter.decode(key="(shared)")
+        second = KeyAnnotationsConverter.decode(key="(shared)")
+        assert first["annotations"] is second["annotations"]
+
+    def test_subclass_with_custom_conditions(self):
+        class Converter(KeyAnnotationsConverter):
+            CONDITIONS = {"!": conditions.if_existing}
+
+        decoded = Converter.decode(key="!key")
+        assert "key" == decoded["key"]
+        assert conditions.if_existing == decoded["annotations"].condition
+        assert "!key" == Converter.encode(decoded["annotations"],
+                                          key="key")["key"]
+
     @pytest.mark.parametrize("key", [
         "key",
         "(key)",
@@ -256,3 +703,7 @@ class TestKeyAnnotationsConverter:
         annotations = KeyAnnotationsConverter.decode(key=key)["annotations"]
         result = KeyAnnotationsConverter.encode(annotations, key="key")
         assert key == result["key"]
+
+    def test_encoder_keeps_keys_without_annotations(self):
+        annotations = KeyAnnotationsConverter.decode(key="key")["annotations"]
+        assert 1 == KeyAnnotationsConverter.encode(annotations, key=1)["key"]
@@ -0,0 +1,150 @@
+import json
+from unittest import mock
+
+import pytest
+
+from fancy_dict import FancyDict, Patch
+from fancy_dict.conditions import if_existing
+from fancy_dict.merger import add
+from fancy_dict.patch import diff
+
+OLD = {
+    "a": {"b": 1, "c": [1, 2], "d": {"e": True}},
+    "removed": {"x": 1},
+    "same": {"deep": {"deeper": 1}},
+}
+NEW = {
+    "a": {"b": 2, "c": [1, 2], "d": {"e": 1}, "f": {"g": 1}},
+    "same": {"deep": {"deeper": 1}},
+    "added": [1],
+}
+
+
+@pytest.fixture()
+def old():
+    return FancyDict(OLD)
+
+
+@pytest.fixture()
+def new():
+    return FancyDict(NEW)
+
+
+class TestDiff:
+    def test_diff(self, old, new):
+        assert Patch(
+            removed=[("removed",)],
+            added=[(("a", "f"), {"g": 1}), (("added",), [1])],
+            changed=[(("a", "b"), 2), (("a", "d", "e"), 1)],
+        ) == old.diff(new)
+
+    def test_no_differences(self, old):
+        assert not old.diff(FancyDict(OLD))
+
+    def test_value_changed_to_dict(self):
+        assert [(("a",), {"b": 1})] == diff({"a": 1}, {"a": {"b": 1}}).changed
+
+    def test_lists_equal_to_frozen_lists(self, old):
+        assert not old.freeze().diff(old)
+
+    def test_skip_identical_dicts(self, old):
+        new = old.derive()
+        new.update({"a": {"b": 2}})
+        with mock.patch("fancy_dict.patch._diff",
+                        wraps=diff.__globals__["_diff"]) as walked:
+            patch = old.diff(new)
+        assert [(("a", "b"), 2)] == patch.changed
+        assert [(), ("a",)] == [call[0][0] for call in walked.call_args_list]
+
+    def test_skip_equal_frozen_dicts(self, old):
+        new = FancyDict(OLD)
+        new.update({"a": {"b": 2}})
+        with mock.patch("fancy_dict.patch._diff",
+                        wraps=diff.__globals__["_diff"]) as walked:
+            old.freeze().diff(new.freeze())
+        assert [(), ("a",)] == [call[0][0] for call in walked.call_args_list]
+
+
+class TestApplyPatch:
+    def test_apply_patch(self, old, new):
+        old.apply_patch(old.diff(new))
+        assert new == old
+        assert list(new) == list(old)
+
+    def test_keep_annotations(self, old, new):
+        old["a"].annotate("b", merge_method=add)
+        old.apply_patch(old.diff(new))
+        assert 2 == old["a"]["b"]
+        assert add is old["a"].get_annotations("b").merge_method
+        assert old["a"].get_annotations("f") is None
+
+    def test_skip_finalized(self, old, new):
+        old.annotate("removed", finalized=True)
+        old["a"].annotate("b", finalized=True)
+        old.annotate("same", finalized=True)
+        old.apply_patch(Patch(removed=[("removed",)],
+                              changed=[(("a", "b"), 2),
+                                       (("same", "deep"), 2)]))
+        assert OLD == old
+
+    def test_respect_conditions(self, old):
+        old.annotate("new", condition=if_existing)
+        old.apply_patch(Patch(added=[(("new",), 1)]))
+        assert "new" not in old
+
+    def test_create_missing_parents(self):
+        fancy_dict = FancyDict()
+        fancy_dict.apply_patch(Patch(changed=[(("a", "b"), 1)]))
+        assert {"a": {"b": 1}} == fancy_dict
+        assert isinstance(fancy_dict["a"], FancyDict)
+
+    def test_skip_missing_removed(self):
+        fancy_dict = FancyDict(a=1)
+        fancy_dict.apply_patch(Patch(removed=[("a", "b"), ("c",)]))
+        assert {"a": 1} == fancy_dict
+
+    def test_values_copied(self, old, new):
+        patch = old.diff(new)
+        old.apply_patch(patch)
+        old["a"]["f"]["g"] = 2
+        assert 1 == new["a"]["f"]["g"]
+
+    def test_sets_copied(self, old):
+        values = {1, 2}
+        old.apply_patch(Patch(added=[(("set",), values),
+                                     (("nested",), {"set": values})]))
+        assert isinstance(old["set"], set)
+        assert isinstance(old["nested"]["set"], set)
+        old["set"].add(3)
+        assert {1, 2} == values
+
+    def test_unhashable_values_copied(self, old):
+        value = bytearray(b"a")
+        old.apply_patch(Patch(added=[(("nested",), {"bytes": [value]})]))
+        assert [bytearray(b"a")] == old["nested"]["bytes"]
+        old["nested"]["bytes"][0].append(ord("b"))
+        assert bytearray(b"a") == value
+
+    def test_copy_on_write(self, old, new):
+        derived = old.derive()
+        derived.apply_patch(old.diff(new))
+        assert OLD == old
+        assert NEW == derived
+
+    def test_apply_frozen_patch(self, old, new):
+        old.apply_patch(old.freeze().diff(new.freeze()))
+        assert new == old
+        old["added"].append(2)
+        old["a"]["f"]["g"] = 2
+
+
+class TestPatch:
+    def test_len(self, old, new):
+        assert 5 == len(old.diff(new))
+
+    def test_json_round_trip(self, old, new):
+        patch = old.diff(new)
+        loaded = Patch.from_dict(json.loads(json.dumps(patch.to_dict())))
+        assert patch == loaded
+        old.apply_patch(loaded)
+        assert new == old
@@ -0,0 +1,87 @@
+import pytest
+
+from fancy_dict import FancyDict
+from fancy_dict.errors import InvalidQuery
+from fancy_dict.query import Query, KeyIndex, compile_query
+
+DATA = {
+    "a": {"b": {"c": 1}, "list": [{"c": 2}, [{"c": 3}]]},
+    "c": 0,
+}
+
+
+@pytest.fixture()
+def data():
+    return FancyDict(DATA)
+
+
+class TestQuery:
+    @pytest.mark.parametrize("query, result", [
+        ("a.b.c", [1]),
+        ("c", [0]),
+        ("a.list.0.c", [2]),
+        ("a.list.-1.0.c", [3]),
+        ("a.*", [{"c": 1}, [{"c": 2}, [{"c": 3}]]]),
+        ("*.b", [{"c": 1}]),
+        ("a.list.*.c", [2]),
+        ("..c", [1, 2, 3, 0]),
+        ("a..c", [1, 2, 3]),
+        ("a.list..c", [2, 3]),
+        ("a..*", [{"c": 1}, 1, [{"c": 2}, [{"c": 3}]], 2, 3]),
+        ("..b.c", [1]),
+    ])
+    def test_find(self, data, query, result):
+        assert result == Query(query).find(data)
+        assert result == Query(query).find(data, index=KeyIndex(data))
+
+    @pytest.mark.parametrize("query", [
+        "missing", "a.missing.c", "a.b.c.d", "a.list.5", "a.list.c", "..x",
+    ])
+    def test_no_match(self, data, query):
+        assert [] == Query(query).find(data)
+
+    @pytest.mark.parametrize("query", [
+        "", ".a", "a.", "a...b", "a..", "..", "a..b.",
+    ])
+    def test_raise_invalid_query(self, query):
+        with pytest.raises(InvalidQuery):
+            Query(query)
+
+    def test_compiled_queries_are_memorized(self):
+        assert compile_query("a.b") is compile_query("a.b")
+
+    def test_query_frozen(self, data):
+        frozen = data.freeze()
+        assert [3] == frozen.query("a.list.1.0.c")
+        assert [1, 2, 3, 0] == frozen.query("..c", index=KeyIndex(frozen))
+
+
+class TestKeyIndex:
+    def test_find_key(self, data):
+        assert [1, 2, 3, 0] == KeyIndex(data).find("c")
+
+    def test_find_all(self, data):
+        assert 7 == len(KeyIndex(data).find())
+
+    def test_find_below_node(self, data):
+        assert [2, 3] == KeyIndex(data).find("c", data["a"]["list"])
+
+    def test_returned_values_do_not_change_index(self, data):
+        index = KeyIndex(data)
+        index.find("c").clear()
+        assert [1, 2, 3, 0] == index.find("c")
+
+    def test_index_built_once(self, data):
+        index = KeyIndex(data)
+        index.find("c")
+        data["a"]["b"]["c"] = 5
+        assert [1, 2, 3, 0] == index.find("c")
+        assert [5, 2, 3, 0] == KeyIndex(data).find("c")
+
+
+class TestFancyDictQuery:
+    def test_query(self, data):
+        assert [1] == data.query("a.b.c")
+
+    def test_query_with_index(self, data):
+        assert [1, 2, 3] == data.query("a..c", index=KeyIndex(data))
@@ -0,0 +1,177 @@
+import json
+import threading
+from pathlib import Path
+
+import pytest
+import yaml
+
+from fancy_dict import FancyDict
+from fancy_dict.loader import FileLoader, KeyAnnotationsConverter
+from fancy_dict.watcher import Watcher
+
+from test_loader import file_structure, INCLUDE_TREE
+
+
+def write(path, content):
+    with open(path, "w") as data_file:
+        json.dump(content, data_file, indent=4)
+
+
+@pytest.fixture()
+def include_tree(tmpdir):
+    with file_structure(INCLUDE_TREE, tmpdir):
+        yield
+
+
+@pytest.fixture()
+def watcher():
+    watcher = Watcher(include_key="include",
+                      annotations_decoder=KeyAnnotationsConverter)
+    yield watcher
+    watcher.stop()
+
+
+def load(source="file.yml"):
+    return FileLoader(FancyDict, include_key="include").load(
+        source, annotations_decoder=KeyAnnotationsConverter
+    )
+
+
+class TestDependencies:
+    def test_record_include_graph(self, include_tree):
+        loader = FileLoader(FancyDict, include_key="include")
+        loader.load("file.yml", annotations_decoder=KeyAnnotationsConverter)
+        assert {
+            "file.yml": ("a.yml", "b.yml"),
+            "a.yml": ("c.yml",),
+            "b.yml": ("c.yml", "d.yml"),
+            "c.yml": (),
+            "d.yml": (),
+        } == loader.dependencies
+
+    def test_snapshots_same_result(self, include_tree):
+        snapshots = {}
+        loader = FileLoader(FancyDict, include_key="include",
+                            snapshots=snapshots)
+        snapshot = loader.load("file.yml",
+                               annotations_decoder=KeyAnnotationsConverter)
+        assert load() == snapshot
+        assert {"file.yml", "a.yml", "b.yml", "c.yml", "d.yml"} \
+            == set(snapshots)
+        assert snapshot is loader.load("file.yml")
+
+
+class TestWatcher:
+    def test_load(self, include_tree, watcher):
+        assert load() == watcher.load("file.yml")
+
+    def test_no_changes(self, include_tree, watcher):
+        watcher.load("file.yml")
+        assert [] == watcher.poll()
+
+    def test_update_on_change_of_included_file(self, include_tree, watcher):
+        fancy_dict = watcher.load("file.yml")
+        write("c.yml", {"order": ["changed"], "sub": {"c": "C2"},
+                        "(final)": "c"})
+        changes = watcher.poll()
+        assert load() == fancy_dict
+        assert "C2" == fancy_dict["sub"]["c"]
+        assert [(fancy_dict, changes[0][1])] == changes
+        assert [(("sub", "c"), "C2")] == changes[0][1].changed[-1:]
+
+    def test_reload_only_changed_files(self, include_tree, watcher):
+        watcher.load("file.yml")
+        write("d.yml", {"final": "d", "order[add]": ["d2"]})
+        read = []
+        loader = watcher._loader
+        original = loader._read_file
+        loader._read_file = lambda path: read.append(str(path)) \
+            or original(path)
+        watcher.poll()
+        assert {"file.yml", "b.yml", "d.yml"} == set(read)
+
+    def test_only_dependent_fancy_dicts(self, include_tree, watcher):
+        file_dict = watcher.load("file.yml")
+        a_dict = watcher.load("a.yml")
+        write("d.yml", {"final": "d", "order[add]": ["d2"]})
+        changes = watcher.poll()
+        assert [file_dict] == [fancy_dict for fancy_dict, _ in changes]
+        assert load("a.yml") == a_dict
+
+    def test_watch_new_includes(self, include_tree, watcher):
+        fancy_dict = watcher.load("file.yml")
+        write("e.yml", {"new": 1})
+        write("d.yml", {"include": ["e.yml"], "final": "d"})
+        watcher.poll()
+        assert 1 == fancy_dict["new"]
+        write("e.yml", {"new": 22})
+        watcher.poll()
+        assert 22 == fancy_dict["new"]
+
+    def test_subscribe(self, include_tree, watcher):
+        calls = []
+        fancy_dict = watcher.load("file.yml")
+        watcher.subscribe(lambda *args: calls.append(args))
+        write("file.yml", {"include": ["a.yml", "b.yml"], "new": 1})
+        changes = watcher.poll()
+        assert changes == calls
+        assert 1 == fancy_dict["new"]
+
+    def test_unsubscribe(self, include_tree, watcher):
+        calls = []
+        watcher.load("file.yml")
+        watcher.subscribe(calls.append)
+        watcher.unsubscribe(calls.append)
+        write("file.yml", {"new": 1})
+        watcher.poll()
+        assert [] == calls
+
+    def test_retry_fancy_dict_which_failed_to_load(self, tmpdir, watcher):
+        structure = {
+            "base.yml": {"x": 1},
+            "a.yml": {"include": ["base.yml"]},
+            "b.yml": {"include": ["base.yml"]},
+        }
+        with file_structure(structure, tmpdir):
+            a_dict, b_dict = watcher.load("a.yml"), watcher.load("b.yml")
+            Path("a.yml").write_text("include: [base.yml")
+            write("base.yml", {"x": 2})
+            with pytest.raises(yaml.YAMLError):
+                watcher.poll()
+            assert {"x": 1} == a_dict
+            assert {"x": 2} == b_dict
+            errors = []
+            assert [] == watcher.poll(on_error=errors.append)
+            assert isinstance(errors[0], yaml.YAMLError)
+            write("a.yml", {"include": ["base.yml"], "y": 1})
+            assert [a_dict] == [fancy_dict
+                                for fancy_dict, _ in watcher.poll()]
+        assert {"x": 2, "y": 1} == a_dict
+
+    def test_background_polling(self, include_tree):
+        watcher = Watcher(include_key="include", interval=0.01,
+                          annotations_decoder=KeyAnnotationsConverter)
+        changed = threading.Event()
+        fancy_dict = watcher.load("file.yml")
+        watcher.subscribe(lambda *_: changed.set())
+        watcher.start()
+        try:
+            write("file.yml", {"include": ["a.yml", "b.yml"], "new": 1})
+            assert changed.wait(5)
+        finally:
+            watcher.stop()
+        assert 1 == fancy_dict["new"]
+
+    def test_report_errors(self, include_tree):
+        watcher = Watcher(include_key="include", interval=0.01)
+        errors = []
+        failed = threading.Event()
+        watcher.load("file.yml")
+        watcher.start(on_error=lambda error: errors.append(error)
+                      or failed.set())
+        try:
+            write("file.yml", {"include": ["missing.yml"]})
+            assert failed.wait(5)
+        finally:
+            watcher.stop()
+        assert isinstance(errors[0], FileNotFoundError)